@@ -17,6 +17,7 @@ project = AwsCdkPythonApp(
     dev_deps=[
         "autopep8==2.0.1",
         "aws-lambda-powertools==2.6.0",
+        "aws-xray-sdk==2.11.0",
         "bandit==1.7.4",
         "botocore==1.29.53",
         "boto3==1.26.53",
@@ -48,6 +49,15 @@ bandit = project.add_task(
     exec="bandit --configfile pyproject.toml --recursive .",
     name="bandit",
 )
+benchmark = project.add_task(
+    description="Runs benchmarks",
+    env={
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "TABLE_NAME": "jobs",
+    },
+    exec="python -m benchmark.main run",
+    name="benchmark",
+)
 bootstrap = project.add_task(
     description="Bootstraps CDK",
     exec="cdk bootstrap",
@@ -68,6 +78,15 @@ checkov = project.add_task(
     exec="checkov --config-file .checkov.yaml --directory .",
     name="checkov",
 )
+emulate = project.add_task(
+    description="Emulates the jobs pipeline under load",
+    env={
+        "AWS_DEFAULT_REGION": "us-east-1",
+        "TABLE_NAME": "jobs",
+    },
+    exec="python -m emulator.main",
+    name="emulate",
+)
 lint = project.add_task(
     description="Lints code",
     name="lint",
@@ -76,6 +95,11 @@ release = project.add_task(
     description="Releases version",
     name="release",
 )
+replay = project.add_task(
+    description="Replays failed jobs",
+    exec="python -m replay.main",
+    name="replay",
+)
 scan = project.add_task(
     description="Scans code",
     name="scan",
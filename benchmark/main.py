@@ -0,0 +1,453 @@
+from argparse import (
+    ArgumentParser,
+)
+from aws_lambda_powertools.utilities.typing import (
+    LambdaContext,
+)
+from botocore.awsrequest import (
+    AWSResponse,
+)
+from botocore.client import (
+    BaseClient,
+)
+from contextlib import (
+    contextmanager,
+    redirect_stdout,
+)
+from hashlib import (
+    sha256,
+)
+from importlib import (
+    import_module,
+)
+from job_items.main import (
+    decode_item,
+    encode_item,
+)
+from json import (
+    dump,
+    dumps,
+    load,
+)
+from math import (
+    ceil,
+)
+from os import (
+    devnull,
+    environ,
+)
+from pathlib import (
+    Path,
+)
+from statistics import (
+    median,
+)
+from subprocess import (  # nosec
+    check_output,
+)
+from sys import (
+    executable,
+)
+from time import (
+    perf_counter,
+    time,
+)
+from typing import (
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+)
+
+COLD_INIT_MODULES = [
+    "error_handling.main",
+    "event_processing.main",
+]
+ENVIRONMENT = {
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "TABLE_NAME": "jobs",
+}
+FULL_CPU_MEMORY_SIZE = 1769
+GB_SECOND_PRICES = {
+    "arm64": 0.0000133334,
+    "x86_64": 0.0000166667,
+}
+REQUEST_PRICE = 0.0000002
+STUB_ID = "benchmark"
+
+
+class VirtualClock:
+    def __init__(self, now: Optional[float] = None) -> None:
+        self.now = time() if now is None else now
+        self.sleeps = list()
+
+    def sleep(self, seconds: float) -> None:
+        if seconds < 0:
+            raise ValueError("sleep length must be non-negative")
+
+        self.now += seconds
+        self.sleeps.append(seconds)
+
+    def time(self) -> float:
+        return self.now
+
+
+def measure(function: Callable[[], object], repeat: int = 1000) -> float:
+    timings = list()
+
+    for _ in range(repeat):
+        start = perf_counter()
+
+        function()
+        timings.append(perf_counter() - start)
+
+    return median(timings)
+
+
+def calibrate(repeat: int = 1000) -> float:
+    return measure(
+        lambda: sha256(dumps(list(range(1000))).encode()).hexdigest(),
+        repeat,
+    )
+
+
+def stub_response(**kwargs) -> tuple:
+    return AWSResponse("", 200, dict(), None), dict()
+
+
+@contextmanager
+def stubbed(clients: List[BaseClient]) -> Iterator[None]:
+    for client in clients:
+        client.meta.events.register(
+            "before-call.*.*",
+            stub_response,
+            unique_id=STUB_ID,
+        )
+
+    try:
+        yield
+    finally:
+        for client in clients:
+            client.meta.events.unregister(
+                "before-call.*.*",
+                unique_id=STUB_ID,
+            )
+
+
+def cold_init(module: str, repeat: int = 5) -> float:
+    code = "\n".join([
+        "from time import perf_counter",
+        "start = perf_counter()",
+        f"import {module}",
+        "print(perf_counter() - start)",
+    ])
+
+    return median(
+        float(check_output(  # nosec
+            [
+                executable,
+                "-c",
+                code,
+            ],
+            env={
+                **ENVIRONMENT,
+                **environ,
+            },
+        ))
+        for _ in range(repeat)
+    )
+
+
+def handler_benchmarks(repeat: int = 1000) -> Dict[str, float]:
+    for name, value in ENVIRONMENT.items():
+        environ.setdefault(name, value)
+
+    error_handling = import_module("error_handling.main")
+    event_processing = import_module("event_processing.main")
+    context = LambdaContext()
+    context._invoked_function_arn = ("arn:aws:lambda:us-east-1:"
+                                     "123456789012:function:"
+                                     "event_processing")
+    context.get_remaining_time_in_millis = lambda: 300000
+    event = {
+        "id": "1",
+        "parameters": {
+            "seconds": 60,
+        },
+    }
+    records = {
+        "Records": [
+            {
+                "body": dumps(event["parameters"]),
+                "eventSource": "aws:sqs",
+                "messageAttributes": {
+                    "id": {
+                        "dataType": "String",
+                        "stringValue": str(id),
+                    },
+                },
+                "messageId": str(id),
+            }
+            for id in range(10)
+        ],
+    }
+    failure = {
+        "requestPayload": event,
+        "responsePayload": {
+            "errorMessage": "Task timed out after 300.00 seconds",
+        },
+    }
+    benchmarks = {
+        "error_handling.handler": lambda: error_handling.handler(
+            failure, context),
+        "event_processing.handler": lambda: event_processing.handler(
+            event, context),
+        "event_processing.handler.records": lambda: event_processing.handler(
+            records, context),
+    }
+    clock = event_processing.clock
+    event_processing.clock = VirtualClock()
+
+    try:
+        with stubbed([
+            error_handling.dynamodb,
+            event_processing.dynamodb,
+            event_processing.lambda_,
+            event_processing.s3,
+            event_processing.sqs,
+        ]), open(devnull, "w") as output, redirect_stdout(output):
+            return {
+                name: measure(function, repeat)
+                for name, function in benchmarks.items()
+            }
+    finally:
+        event_processing.clock = clock
+
+
+def regressions(
+    results: Dict[str, float],
+    baseline: Dict[str, float],
+    tolerance: float = 0.5,
+) -> List[str]:
+    return [
+        (f"{name}: {results[name]:.2f}x calibration, "
+         f"baseline {baseline[name]:.2f}x calibration")
+        for name in sorted(results)
+        if name in baseline and results[name] > baseline[name] * (
+            1 + tolerance)
+    ]
+
+
+def workloads(results_size: int = 1024) -> Dict[str, Callable[[], object]]:
+    parameters = {
+        "seconds": 1,
+    }
+    results = dumps({
+        "message": "I slept for 1 seconds " * (results_size // 22 + 1),
+    })
+    item = encode_item(
+        id="1",
+        parameters=parameters,
+        results=results,
+        status="Success",
+    )
+
+    return {
+        "decode_item": lambda: decode_item(item),
+        "encode_item": lambda: encode_item(
+            id="1",
+            parameters=parameters,
+            results=results,
+            status="Success",
+        ),
+        "results_cache_key": lambda: sha256(
+            dumps(
+                parameters,
+                separators=(",", ":"),
+                sort_keys=True,
+            ).encode()
+        ).hexdigest(),
+    }
+
+
+def duration(
+    cpu_seconds: float,
+    memory_size: int,
+    io_seconds: float = 0.0,
+) -> float:
+    return (cpu_seconds * max(1.0, FULL_CPU_MEMORY_SIZE / memory_size) +
+            io_seconds)
+
+
+def price_per_job(
+    duration: float,
+    memory_size: int,
+    architecture: str,
+) -> float:
+    billed_seconds = ceil(duration * 1000) / 1000
+
+    return (billed_seconds * memory_size / 1024 *
+            GB_SECOND_PRICES[architecture] + REQUEST_PRICE)
+
+
+def run(arguments) -> int:
+    calibration = calibrate(arguments.repeat)
+    results = {
+        f"{name}.workload": timing
+        for name, timing in {
+            name: measure(function, arguments.repeat)
+            for name, function in workloads().items()
+        }.items()
+    }
+
+    results.update(handler_benchmarks(arguments.repeat))
+
+    if arguments.cold_repeat > 0:
+        for module in COLD_INIT_MODULES:
+            results[f"{module}.import"] = cold_init(
+                module, arguments.cold_repeat)
+
+    results = {
+        name: timing / calibration
+        for name, timing in results.items()
+    }
+    baseline_path = Path(arguments.baseline)
+
+    if arguments.update_baseline or not baseline_path.exists():
+        with baseline_path.open("w") as baseline_file:
+            dump(results, baseline_file, indent=2, sort_keys=True)
+            baseline_file.write("\n")
+
+        print(dumps(results, indent=2, sort_keys=True))
+
+        return 0
+
+    with baseline_path.open() as baseline_file:
+        baseline = load(baseline_file)
+
+    print(dumps(results, indent=2, sort_keys=True))
+
+    failures = regressions(results, baseline, arguments.tolerance)
+
+    for failure in failures:
+        print(f"Regression: {failure}")
+
+    return 1 if failures else 0
+
+
+def tune(arguments) -> int:
+    timings = {
+        name: measure(function, arguments.repeat)
+        for name, function in workloads(arguments.results_size).items()
+    }
+
+    for name, timing in sorted(timings.items()):
+        print(f"{name:<20} {timing * 1000000:>10.1f} us")
+
+    print(f"{'architecture':<12} {'memory':>6} {'duration':>12} "
+          f"{'price per 1M jobs':>18}")
+
+    for architecture in arguments.architectures:
+        speedup = arguments.arm64_speedup if architecture == "arm64" else 1.0
+
+        for memory_size in arguments.memory_sizes:
+            job_duration = duration(
+                sum(timings.values()) / speedup,
+                memory_size,
+                arguments.io_seconds,
+            )
+            job_price = price_per_job(job_duration, memory_size, architecture)
+
+            print(f"{architecture:<12} {memory_size:>6} "
+                  f"{job_duration * 1000:>9.3f} ms "
+                  f"{job_price * 1000000:>16.4f} $")
+
+    return 0
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    parser = ArgumentParser(
+        description="Benchmarks the handlers",
+    )
+    subparsers = parser.add_subparsers(
+        dest="command",
+        required=True,
+    )
+    run_parser = subparsers.add_parser(
+        "run",
+        help="Runs the benchmarks and compares them with a baseline",
+    )
+    tune_parser = subparsers.add_parser(
+        "tune",
+        help="Estimates the price per job of the CPU-bound paths",
+    )
+
+    run_parser.add_argument(
+        "--baseline",
+        default=str(Path(__file__).parent.joinpath("baseline.json")),
+    )
+    run_parser.add_argument(
+        "--cold-repeat",
+        default=5,
+        type=int,
+    )
+    run_parser.add_argument(
+        "--repeat",
+        default=1000,
+        type=int,
+    )
+    run_parser.add_argument(
+        "--tolerance",
+        default=0.5,
+        help="allowed slowdown over the baseline, as a fraction",
+        type=float,
+    )
+    run_parser.add_argument(
+        "--update-baseline",
+        action="store_true",
+    )
+    run_parser.set_defaults(command=run)
+    tune_parser.add_argument(
+        "--architectures",
+        choices=sorted(GB_SECOND_PRICES),
+        default=sorted(GB_SECOND_PRICES),
+        nargs="+",
+    )
+    tune_parser.add_argument(
+        "--arm64-speedup",
+        default=1.0,
+        help="arm64 over local CPU speed ratio, measured on Lambda",
+        type=float,
+    )
+    tune_parser.add_argument(
+        "--io-seconds",
+        default=0.0,
+        help="seconds per job not bound to the CPU, such as job processing",
+        type=float,
+    )
+    tune_parser.add_argument(
+        "--memory-sizes",
+        default=[128, 256, 512, 1024, 1769],
+        nargs="+",
+        type=int,
+    )
+    tune_parser.add_argument(
+        "--repeat",
+        default=1000,
+        type=int,
+    )
+    tune_parser.add_argument(
+        "--results-size",
+        default=1024,
+        type=int,
+    )
+    tune_parser.set_defaults(command=tune)
+
+    arguments = parser.parse_args(arguments)
+
+    return arguments.command(arguments)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
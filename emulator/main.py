@@ -0,0 +1,903 @@
+from argparse import (
+    ArgumentParser,
+)
+from aws_cdk import (
+    App,
+)
+from aws_cdk.assertions import (
+    Template,
+)
+from aws_lambda_powertools.utilities.typing import (
+    LambdaContext,
+)
+from collections import (
+    Counter,
+)
+from concurrent.futures import (
+    ThreadPoolExecutor,
+)
+from contextlib import (
+    redirect_stdout,
+)
+from copy import (
+    deepcopy,
+)
+from importlib.util import (
+    find_spec,
+    module_from_spec,
+)
+from infrastructure.main import (
+    InfrastructureStack,
+)
+from job_items.main import (
+    TERMINAL_STATUSES,
+)
+from json import (
+    dumps,
+    loads,
+)
+from math import (
+    ceil,
+)
+from os import (
+    devnull,
+    environ,
+)
+from random import (
+    Random,
+)
+from re import (
+    compile,
+    escape,
+    fullmatch,
+    sub,
+)
+from threading import (
+    Condition,
+    Lock,
+)
+from time import (
+    sleep,
+    time,
+)
+from types import (
+    SimpleNamespace,
+)
+from typing import (
+    Any,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+ACCOUNT = "123456789012"
+ARGUMENT = compile(r"\('(?P<argument>[^']*)'\)")
+ENVIRONMENT = {
+    "AWS_DEFAULT_REGION": "us-east-1",
+    "FUNCTION_NAME": "EventProcessingFunction",
+    "TABLE_NAME": "jobs",
+}
+FUNCTION = compile(r"^EventProcessing(?P<name>\w+Function)[0-9A-F]{8}$")
+FUNCTION_MODULES = {
+    "ErrorHandlingFunction": "error_handling.main",
+    "EventProcessingFunction": "event_processing.main",
+    "JobLookupFunction": "job_lookup.main",
+    "JobSubmissionFunction": "job_submission.main",
+}
+JSON_PATH = compile(r"\.(?P<name>\w+)|\[(?P<index>\d+)\]")
+LOAD_WORKERS = 64
+REFERENCE = compile(
+    r"\$(?P<name>context\.identity\.caller|input\.body|input\.params"
+    r"|input\.path|util\.escapeJavaScript)")
+STACK_NAME = "AsynchronousEventProcessingAPIGatewayLambda"
+SUBSTRING = compile(r"\.substring\((?P<start>\d+)\)")
+UNRESERVED_CONCURRENCY = 1000
+
+
+class ScaledClock:
+    def __init__(self, scale: float = 1.0) -> None:
+        self.scale = scale
+        self.start = time()
+
+    def sleep(self, seconds: float) -> None:
+        sleep(seconds * self.scale)
+
+    def time(self) -> float:
+        return self.start + (time() - self.start) / self.scale
+
+
+class InMemoryDynamoDB:
+    def __init__(self) -> None:
+        self.exceptions = SimpleNamespace(
+            ConditionalCheckFailedException=type(
+                "ConditionalCheckFailedException",
+                (Exception,),
+                dict(),
+            ),
+        )
+        self.__items = dict()
+        self.__lock = Lock()
+
+    def batch_get_item(self, RequestItems: dict) -> dict:
+        return {
+            "Responses": {
+                table_name: [
+                    item
+                    for item in (
+                        self.get_item(
+                            Key=key,
+                            TableName=table_name,
+                            **{
+                                name: value
+                                for name, value in request.items()
+                                if name != "Keys"
+                            },
+                        ).get("Item")
+                        for key in request["Keys"]
+                    )
+                    if item is not None
+                ]
+                for table_name, request in RequestItems.items()
+            },
+            "UnprocessedKeys": dict(),
+        }
+
+    def batch_write_item(self, RequestItems: dict) -> dict:
+        for table_name, requests in RequestItems.items():
+            for request in requests:
+                if "PutRequest" in request:
+                    self.put_item(
+                        Item=request["PutRequest"]["Item"],
+                        TableName=table_name,
+                    )
+                else:
+                    self.delete_item(
+                        Key=request["DeleteRequest"]["Key"],
+                        TableName=table_name,
+                    )
+
+        return {
+            "UnprocessedItems": dict(),
+        }
+
+    def delete_item(self, Key: dict, TableName: str, **kwargs) -> dict:
+        with self.__lock:
+            self.__items.pop((TableName, Key["id"]["S"]), None)
+
+        return dict()
+
+    def get_item(
+        self,
+        Key: dict,
+        TableName: str,
+        ExpressionAttributeNames: Optional[dict] = None,
+        ProjectionExpression: Optional[str] = None,
+        **kwargs,
+    ) -> dict:
+        with self.__lock:
+            item = deepcopy(self.__items.get((TableName, Key["id"]["S"])))
+
+        if item is None:
+            return dict()
+
+        if ProjectionExpression is not None:
+            names = [
+                (ExpressionAttributeNames or dict()).get(
+                    name.strip(), name.strip())
+                for name in ProjectionExpression.split(",")
+            ]
+            item = {
+                name: value
+                for name, value in item.items()
+                if name in names
+            }
+
+        return {
+            "Item": item,
+        }
+
+    def put_item(
+        self,
+        Item: dict,
+        TableName: str,
+        ConditionExpression: Optional[str] = None,
+        ExpressionAttributeValues: Optional[dict] = None,
+        **kwargs,
+    ) -> dict:
+        key = (TableName, Item["id"]["S"])
+
+        with self.__lock:
+            item = self.__items.get(key)
+
+            if ConditionExpression is not None and item is not None and int(
+                item.get("ttl", {"N": "0"})["N"]
+            ) >= int(ExpressionAttributeValues[":now"]["N"]):
+                raise self.exceptions.ConditionalCheckFailedException(
+                    "The conditional request failed")
+
+            self.__items[key] = deepcopy(Item)
+
+        return dict()
+
+
+def escape_javascript(value: str) -> str:
+    return (value
+            .replace("\\", "\\\\")
+            .replace("\"", "\\\"")
+            .replace("'", "\\'")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r")
+            .replace("\t", "\\t"))
+
+
+def json_path(document: Any, path: str) -> Any:
+    if not path.startswith("$"):
+        raise ValueError(f"{path} is not a valid JSON path")
+
+    for match in JSON_PATH.finditer(path, 1):
+        try:
+            if match.group("name") is not None:
+                document = document[match.group("name")]
+            else:
+                document = document[int(match.group("index"))]
+        except (IndexError, KeyError, TypeError):
+            return ""
+
+    return document
+
+
+def evaluate(
+    template: str,
+    position: int,
+    variables: dict,
+) -> Tuple[Any, int]:
+    match = REFERENCE.match(template, position)
+
+    if match is None:
+        return "$", position + 1
+
+    name = match.group("name")
+    position = match.end()
+
+    if name == "util.escapeJavaScript":
+        if template[position] != "(":
+            raise ValueError(f"{name} without arguments at {position}")
+
+        value, position = evaluate(template, position + 1, variables)
+
+        if template[position] != ")":
+            raise ValueError(f"{name} not closed at {position}")
+
+        value = escape_javascript(stringify(value))
+        position += 1
+    elif name in ["input.params", "input.path"]:
+        argument = ARGUMENT.match(template, position)
+
+        if argument is None:
+            raise ValueError(f"{name} without arguments at {position}")
+
+        value = variables[name](argument.group("argument"))
+        position = argument.end()
+    else:
+        value = variables[name]
+
+    substring = SUBSTRING.match(template, position)
+
+    while substring is not None:
+        value = stringify(value)[int(substring.group("start")):]
+        position = substring.end()
+        substring = SUBSTRING.match(template, position)
+
+    return value, position
+
+
+def stringify(value: Any) -> str:
+    return value if isinstance(value, str) else dumps(value)
+
+
+def render(
+    template: str,
+    body: str = "",
+    caller: str = "",
+    parameters: Optional[Dict[str, Dict[str, str]]] = None,
+) -> str:
+    parameters = parameters or dict()
+    variables = {
+        "context.identity.caller": caller,
+        "input.body": body,
+        "input.params": lambda name: next(
+            (
+                parameters.get(location, dict())[name]
+                for location in ["path", "querystring", "header"]
+                if name in parameters.get(location, dict())
+            ),
+            "",
+        ),
+        "input.path": lambda path: json_path(loads(body or "{}"), path),
+    }
+    output = list()
+    position = 0
+
+    while True:
+        index = template.find("$", position)
+
+        if index < 0:
+            output.append(template[position:])
+
+            break
+
+        output.append(template[position:index])
+
+        value, position = evaluate(template, index, variables)
+
+        output.append(stringify(value))
+
+    return "".join(output)
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    values = sorted(values)
+
+    return {
+        f"p{percentile}": values[max(ceil(percentile / 100 * len(values)),
+                                     1) - 1] if values else None
+        for percentile in [50, 95, 99]
+    }
+
+
+def job_ids(event: Any) -> List[str]:
+    if isinstance(event, dict) and "requestPayload" in event:
+        event = event["requestPayload"]
+
+    return [job["id"] for job in (event if isinstance(event, list) else [
+        event,
+    ])]
+
+
+def function_module(name: str) -> Optional[str]:
+    if name.endswith("EventProcessingFunction"):
+        return FUNCTION_MODULES["EventProcessingFunction"]
+
+    return FUNCTION_MODULES.get(name)
+
+
+def load_module(name: str, environment: Dict[str, str]) -> Any:
+    spec = find_spec(name)
+    module = module_from_spec(spec)
+    originals = {
+        variable: environ.get(variable)
+        for variable in environment
+    }
+
+    environ.update(environment)
+
+    try:
+        spec.loader.exec_module(module)
+    finally:
+        for variable, value in originals.items():
+            if value is None:
+                environ.pop(variable)
+            else:
+                environ[variable] = value
+
+    return module
+
+
+def resolve(value: Any, names: Dict[str, str]) -> Optional[str]:
+    if isinstance(value, str):
+        return value
+
+    if "Ref" in value:
+        return names.get(value["Ref"])
+
+    if "Fn::Join" in value:
+        separator, values = value["Fn::Join"]
+        values = [resolve(value, names) for value in values]
+
+        return None if None in values else separator.join(values)
+
+    return None
+
+
+def synthesize(**kwargs) -> dict:
+    app = App(
+        context={
+            "aws:cdk:bundling-stacks": list(),
+        },
+    )
+    stack = InfrastructureStack(
+        app,
+        STACK_NAME,
+        **kwargs,
+    )
+
+    return Template.from_stack(stack).to_json()
+
+
+def functions(template: dict) -> Dict[str, dict]:
+    resources = template["Resources"]
+    names = {
+        logical_id: match.group("name")
+        for logical_id, match in (
+            (logical_id, FUNCTION.match(logical_id))
+            for logical_id, resource in resources.items()
+            if resource["Type"] == "AWS::Lambda::Function"
+        )
+        if match is not None and function_module(match.group("name"))
+    }
+    functions = {
+        names[logical_id]: {
+            "environment": {
+                variable: value
+                for variable, value in (
+                    (variable, resolve(value, names))
+                    for variable, value in resource["Properties"].get(
+                        "Environment", dict()).get(
+                        "Variables", dict()).items()
+                )
+                if value is not None
+            },
+            "logical_id": logical_id,
+            "module": function_module(names[logical_id]),
+            "reserved_concurrent_executions": resource["Properties"].get(
+                "ReservedConcurrentExecutions", UNRESERVED_CONCURRENCY),
+            "retry_attempts": 2,
+            "timeout": resource["Properties"].get("Timeout", 3),
+        }
+        for logical_id, resource in resources.items()
+        if logical_id in names
+    }
+
+    for resource in resources.values():
+        if resource["Type"] == "AWS::Lambda::EventInvokeConfig":
+            properties = resource["Properties"]
+            name = names.get(properties["FunctionName"]["Ref"])
+
+            if name is not None:
+                functions[name]["retry_attempts"] = properties.get(
+                    "MaximumRetryAttempts", 2)
+
+    return functions
+
+
+def routes(template: dict) -> Dict[Tuple[str, str], dict]:
+    resources = template["Resources"]
+    names = {
+        function["logical_id"]: name
+        for name, function in functions(template).items()
+    }
+
+    def path(resource_id: Any) -> str:
+        if not isinstance(resource_id, dict) or "Ref" not in resource_id:
+            return ""
+
+        properties = resources[resource_id["Ref"]]["Properties"]
+
+        return f"{path(properties['ParentId'])}/{properties['PathPart']}"
+
+    def function_name(uri: Any) -> Optional[str]:
+        if isinstance(uri, dict):
+            if "Fn::GetAtt" in uri and uri["Fn::GetAtt"][0] in names:
+                return names[uri["Fn::GetAtt"][0]]
+
+            uri = list(uri.values())
+
+        if isinstance(uri, list):
+            return next(
+                (
+                    name
+                    for name in map(function_name, uri)
+                    if name is not None
+                ),
+                None,
+            )
+
+        return None
+
+    return {
+        (properties["HttpMethod"], path(properties["ResourceId"]) or "/"): {
+            "function_name": function_name(properties["Integration"]["Uri"]),
+            "request_templates": properties["Integration"].get(
+                "RequestTemplates", dict()),
+            "responses": properties["Integration"].get(
+                "IntegrationResponses", list()),
+        }
+        for properties in (
+            resource["Properties"]
+            for resource in resources.values()
+            if resource["Type"] == "AWS::ApiGateway::Method"
+        )
+    }
+
+
+class Emulator:
+    def __init__(
+        self,
+        template: dict,
+        clock: Optional[ScaledClock] = None,
+    ) -> None:
+        for name, value in ENVIRONMENT.items():
+            environ.setdefault(name, value)
+
+        self.clock = ScaledClock() if clock is None else clock
+        self.dynamodb = InMemoryDynamoDB()
+        self.functions = functions(template)
+        self.invocations = Counter()
+        self.jobs = dict()
+        self.modules = {
+            name: load_module(function["module"], function["environment"])
+            for name, function in self.functions.items()
+        }
+        self.routes = routes(template)
+        self.__condition = Condition()
+        self.__executors = dict()
+        self.__originals = list()
+        self.__pending = 0
+
+    def __enter__(self) -> "Emulator":
+        self.__executors = {
+            name: ThreadPoolExecutor(
+                max_workers=function["reserved_concurrent_executions"],
+            )
+            for name, function in self.functions.items()
+            if function["module"] in [
+                FUNCTION_MODULES["ErrorHandlingFunction"],
+                FUNCTION_MODULES["EventProcessingFunction"],
+            ]
+        }
+
+        for name, module in self.modules.items():
+            self.__patch(module, "dynamodb", self.dynamodb)
+
+            if self.__processes_events(name):
+                self.__patch(module, "clock", self.clock)
+                self.__patch(module, "lambda_", self)
+
+        self.__patch(self.modules["JobSubmissionFunction"], "lambda_", self)
+
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.drain()
+
+        for executor in self.__executors.values():
+            executor.shutdown()
+
+        for module, name, value in reversed(self.__originals):
+            setattr(module, name, value)
+
+        self.__originals = list()
+
+    def __patch(self, module: Any, name: str, value: Any) -> None:
+        self.__originals.append((module, name, getattr(module, name)))
+
+        setattr(module, name, value)
+
+    def __processes_events(self, name: str) -> bool:
+        return self.functions[name]["module"] == FUNCTION_MODULES[
+            "EventProcessingFunction"]
+
+    def context(self, name: str) -> LambdaContext:
+        deadline = self.clock.time() + self.functions[name]["timeout"]
+        context = LambdaContext()
+        context._function_name = name
+        context._invoked_function_arn = (f"arn:aws:lambda:"
+                                         f"{environ['AWS_DEFAULT_REGION']}:"
+                                         f"{ACCOUNT}:function:{name}")
+        context.get_remaining_time_in_millis = lambda: int(
+            max(deadline - self.clock.time(), 0) * 1000)
+
+        return context
+
+    def drain(self) -> None:
+        with self.__condition:
+            self.__condition.wait_for(lambda: self.__pending == 0)
+
+    def invoke(self, FunctionName: str, Payload: str, **kwargs) -> dict:
+        self.submit(
+            FunctionName.split(":function:")[-1].split(":")[0],
+            loads(Payload),
+        )
+
+        return {
+            "StatusCode": 202,
+        }
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: str = "",
+        caller: str = "",
+        headers: Optional[Dict[str, str]] = None,
+        query: Optional[Dict[str, str]] = None,
+    ) -> Tuple[int, Dict[str, str], str]:
+        for (route_method, route_path), route in self.routes.items():
+            match = fullmatch(
+                sub(r"\\{(\w+)\\}", r"(?P<\1>[^/]+)", escape(route_path)),
+                path,
+            )
+
+            if route_method == method and match is not None:
+                break
+        else:
+            return 403, dict(), dumps({
+                "message": "Missing Authentication Token",
+            })
+
+        parameters = {
+            "header": headers or dict(),
+            "path": match.groupdict(),
+            "querystring": query or dict(),
+        }
+
+        try:
+            event = loads(render(
+                route["request_templates"]["application/json"],
+                body=body,
+                caller=caller,
+                parameters=parameters,
+            ))
+        except ValueError:
+            return 500, dict(), dumps({
+                "message": "Internal server error",
+            })
+
+        name = route["function_name"]
+        error_message = None
+
+        try:
+            payload = self.modules[name].handler(event, self.context(name))
+        except Exception as exception:
+            error_message = str(exception)
+            payload = {
+                "errorMessage": error_message,
+                "errorType": type(exception).__name__,
+            }
+
+        response = next(
+            (
+                response
+                for response in route["responses"]
+                if error_message is not None and
+                "SelectionPattern" in response and
+                fullmatch(response["SelectionPattern"], error_message)
+            ),
+            next(
+                response
+                for response in route["responses"]
+                if "SelectionPattern" not in response
+            ),
+        )
+        template = response.get("ResponseTemplates", dict()).get(
+            "application/json")
+
+        return int(response["StatusCode"]), {
+            parameter[len("method.response.header."):]: value.strip("'")
+            for parameter, value in response.get(
+                "ResponseParameters", dict()).items()
+        }, dumps(payload) if template is None else render(
+            template,
+            body=dumps(payload),
+            caller=caller,
+            parameters=parameters,
+        )
+
+    def submit(self, name: str, event: dict, attempt: int = 0) -> None:
+        enqueued = self.clock.time()
+        ids = job_ids(event)
+
+        with self.__condition:
+            self.__pending += 1
+            self.invocations[name] += 1
+
+            for id in ids:
+                self.jobs.setdefault(id, {
+                    "delays": list(),
+                    "finished": None,
+                    "status": "Pending",
+                    "submitted": enqueued,
+                })
+
+        self.__executors[name].submit(
+            self.__run, name, ids, event, enqueued, attempt)
+
+    def __run(
+        self,
+        name: str,
+        ids: List[str],
+        event: Any,
+        enqueued: float,
+        attempt: int,
+    ) -> None:
+        delay = self.clock.time() - enqueued
+        jobs = list()
+
+        try:
+            jobs = self.modules[name].handler(event, self.context(name))
+        except Exception as exception:
+            if attempt < self.functions[name]["retry_attempts"]:
+                self.submit(name, event, attempt + 1)
+            elif self.__processes_events(name):
+                self.submit("ErrorHandlingFunction", {
+                    "requestPayload": event,
+                    "responsePayload": {
+                        "errorMessage": str(exception),
+                        "errorType": type(exception).__name__,
+                    },
+                })
+        finally:
+            with self.__condition:
+                for id in ids:
+                    self.jobs[id]["delays"].append(delay)
+
+                for job in jobs if isinstance(jobs, list) else [jobs]:
+                    if (job is not None and job.get("id") in self.jobs and
+                            job["status"] in TERMINAL_STATUSES):
+                        self.jobs[job["id"]]["finished"] = self.clock.time()
+                        self.jobs[job["id"]]["status"] = job["status"]
+
+                self.__pending -= 1
+                self.__condition.notify_all()
+
+
+def generate_load(
+    template: dict,
+    rate: float,
+    duration: float,
+    seconds: int = 1,
+    clock: Optional[ScaledClock] = None,
+    seed: Optional[int] = None,
+) -> dict:
+    clock = ScaledClock() if clock is None else clock
+    random = Random(seed)
+    arrivals = list()
+    arrival = random.expovariate(rate)
+
+    while arrival < duration:
+        arrivals.append(arrival)
+
+        arrival += random.expovariate(rate)
+
+    with Emulator(template, clock) as emulator:
+        def post() -> Tuple[float, int, str]:
+            start = clock.time()
+            status_code, _, body = emulator.request(
+                "POST",
+                "/jobs",
+                body=dumps({
+                    "seconds": seconds,
+                }),
+            )
+
+            return clock.time() - start, status_code, body
+
+        start = clock.time()
+
+        with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as executor:
+            futures = list()
+
+            for arrival in arrivals:
+                clock.sleep(max(start + arrival - clock.time(), 0))
+                futures.append(executor.submit(post))
+
+            responses = [future.result() for future in futures]
+
+    ids = [
+        loads(body)["id"]
+        for _, status_code, body in responses
+        if status_code == 200
+    ]
+    jobs = [emulator.jobs[id] for id in ids]
+    finished = [job for job in jobs if job["finished"] is not None]
+    elapsed = max([job["finished"] for job in finished], default=start) - start
+
+    return {
+        "accepted": len(ids),
+        "api_latency": percentiles([latency for latency, _, _ in responses]),
+        "completed": len(finished),
+        "latency": percentiles([
+            job["finished"] - job["submitted"]
+            for job in finished
+        ]),
+        "queueing_delay": percentiles([
+            delay
+            for job in jobs
+            for delay in job["delays"]
+        ]),
+        "rate": rate,
+        "statuses": dict(Counter(job["status"] for job in jobs)),
+        "submitted": len(arrivals),
+        "throughput": len(finished) / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    parser = ArgumentParser(
+        description="Emulates the jobs pipeline under an open-loop load",
+    )
+
+    parser.add_argument(
+        "--duration",
+        default=60.0,
+        help="seconds of arrivals for each rate",
+        type=float,
+    )
+    parser.add_argument(
+        "--event-processing-timeout",
+        default=300,
+        type=int,
+    )
+    parser.add_argument(
+        "--rates",
+        default=[1.0, 5.0, 10.0],
+        help="arrival rates, in jobs per second",
+        nargs="+",
+        type=float,
+    )
+    parser.add_argument(
+        "--reserved-concurrent-executions",
+        default=100,
+        type=int,
+    )
+    parser.add_argument(
+        "--seconds",
+        default=1,
+        help="seconds of processing of each job",
+        type=int,
+    )
+    parser.add_argument(
+        "--seed",
+        default=None,
+        type=int,
+    )
+    parser.add_argument(
+        "--time-scale",
+        default=1.0,
+        help="real seconds for each emulated second",
+        type=float,
+    )
+
+    arguments = parser.parse_args(arguments)
+    template = synthesize(
+        function_settings={
+            "event_processing": {
+                "timeout": arguments.event_processing_timeout,
+            },
+        },
+        reserved_concurrent_executions=arguments.
+        reserved_concurrent_executions,
+    )
+
+    print(f"{'rate':>8} {'completed':>10} {'throughput':>10} "
+          f"{'queueing p50/p95/p99':>24} {'latency p50/p95/p99':>24}")
+
+    for rate in arguments.rates:
+        with open(devnull, "w") as output, redirect_stdout(output):
+            report = generate_load(
+                template,
+                rate,
+                arguments.duration,
+                seconds=arguments.seconds,
+                clock=ScaledClock(arguments.time_scale),
+                seed=arguments.seed,
+            )
+        queueing_delay = "/".join(
+            "-" if value is None else f"{value:.2f}"
+            for value in report["queueing_delay"].values()
+        )
+        latency = "/".join(
+            "-" if value is None else f"{value:.2f}"
+            for value in report["latency"].values()
+        )
+
+        print(f"{rate:>8.2f} {report['completed']:>10} "
+              f"{report['throughput']:>10.2f} "
+              f"{queueing_delay:>24} {latency:>24}")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,44 +1,153 @@
+from aws_lambda_powertools.utilities.batch import (
+    BatchProcessor,
+    EventType,
+    batch_processor,
+)
+from aws_lambda_powertools.utilities.data_classes.sqs_event import (
+    SQSRecord,
+)
 from aws_lambda_powertools.utilities.typing import (
     LambdaContext,
 )
 from aws_lambda_powertools import (
     Logger,
+    Metrics,
+    Tracer,
+)
+from aws_lambda_powertools.metrics import (
+    MetricUnit,
 )
 from boto3 import (
     client,
 )
+from job_items.main import (
+    encode_item,
+)
 from json import (
-    dumps,
+    loads,
 )
 from os import (
     getenv,
 )
+from time import (
+    perf_counter,
+)
+from typing import (
+    List,
+    Optional,
+    Union,
+)
 
+JOB_TTL = int(getenv("JOB_TTL", "0")) or None
+METRICS_DIMENSIONS = loads(getenv("METRICS_DIMENSIONS", "{}"))
 TABLE_NAME = getenv("TABLE_NAME")
 dynamodb = client("dynamodb")
 logger = Logger(
     level=getenv("LOG_LEVEL", "INFO"),
     service="error_handling",
 )
+metrics = Metrics(
+    namespace=getenv("METRICS_NAMESPACE", "AsynchronousEventProcessing"),
+    service="error_handling",
+)
+processor = BatchProcessor(event_type=EventType.SQS)
+tracer = Tracer(service="error_handling")
 
+metrics.set_default_dimensions(**METRICS_DIMENSIONS)
 
-def handler(event: dict, context: LambdaContext) -> None:
-    logger.debug(event)
 
-    id = event["requestPayload"]["id"]
-    parameters = event["requestPayload"]["parameters"]
+@tracer.capture_method
+def error_handling(
+    id: str,
+    parameters: dict,
+    status: str = "Failure",
+    created_at: Optional[int] = None,
+) -> None:
+    logger.set_correlation_id(id)
+    tracer.put_annotation(key="job_id", value=id)
+    tracer.put_annotation(key="status", value=status)
+    metrics.add_dimension(
+        name="JobType",
+        value=parameters.get("type") or "default",
+    )
+    metrics.add_dimension(
+        name="Priority",
+        value=parameters.get("priority") or "default",
+    )
+
+    start = perf_counter()
 
     dynamodb.put_item(
-        Item={
-            "id": {
-                "S": id,
-            },
-            "parameters": {
-                "S": dumps(parameters),
-            },
-            "status": {
-                "S": "Failure",
-            },
-        },
+        Item=encode_item(
+            created_at=created_at,
+            id=id,
+            parameters=parameters,
+            status=status,
+            ttl=JOB_TTL,
+        ),
         TableName=TABLE_NAME,
     )
+    metrics.add_metric(
+        name="WriteLatency",
+        unit=MetricUnit.Milliseconds,
+        value=(perf_counter() - start) * 1000,
+    )
+    metrics.add_metric(
+        name="JobsTimedOut" if status == "TimedOut" else "JobsFailed",
+        unit=MetricUnit.Count,
+        value=1,
+    )
+
+
+def record_handler(record: SQSRecord) -> None:
+    logger.debug(record.raw_event)
+
+    message_attributes = record.message_attributes
+    id = message_attributes["id"].string_value
+    parameters = loads(record.body)
+
+    error_handling(
+        id,
+        parameters,
+        created_at=int(message_attributes["submitted_at"].string_value)
+        if "submitted_at" in message_attributes
+        else None,
+    )
+
+
+@batch_processor(record_handler=record_handler, processor=processor)
+def records_handler(event: dict, context: LambdaContext) -> dict:
+    return processor.response()
+
+
+@tracer.capture_lambda_handler
+@metrics.log_metrics
+def handler(
+    event: dict,
+    context: LambdaContext,
+) -> Union[dict, List[dict], None]:
+    if "Records" in event:
+        return records_handler(event, context)
+
+    logger.debug(event)
+
+    request_payload = event["requestPayload"]
+    error_message = (event.get("responsePayload") or dict()).get(
+        "errorMessage") or ""
+    status = "TimedOut" if "Task timed out" in error_message else "Failure"
+    payloads = request_payload if isinstance(request_payload, list) else [
+        request_payload,
+    ]
+    jobs = [
+        {
+            "id": payload["id"],
+            "parameters": payload["parameters"],
+            "status": status,
+        }
+        for payload in payloads
+    ]
+
+    for job, payload in zip(jobs, payloads):
+        error_handling(**job, created_at=payload.get("submitted_at"))
+
+    return jobs if isinstance(request_payload, list) else jobs[0]
@@ -1,8 +1,22 @@
 from aws_lambda_powertools import (
     Logger,
+    Metrics,
+    Tracer,
+)
+from aws_lambda_powertools.metrics import (
+    MetricUnit,
+)
+from aws_lambda_powertools.utilities.batch import (
+    BatchProcessor,
+    EventType,
+    batch_processor,
+)
+from aws_lambda_powertools.utilities.data_classes.sqs_event import (
+    SQSRecord,
 )
 from aws_lambda_powertools.utilities.parser import (
     BaseModel,
+    Field,
     event_parser,
 )
 from aws_lambda_powertools.utilities.typing import (
@@ -11,63 +25,590 @@ from aws_lambda_powertools.utilities.typing import (
 from boto3 import (
     client,
 )
+from collections import (
+    OrderedDict,
+)
+from concurrent.futures import (
+    ThreadPoolExecutor,
+)
+from hashlib import (
+    sha256,
+)
+from job_items.main import (
+    encode_item,
+)
+from json import (
+    dumps,
+    loads,
+)
 from os import (
     getenv,
 )
+from threading import (
+    Lock,
+)
 from time import (
+    perf_counter,
     sleep,
+    time,
+)
+from typing import (
+    List,
+    Optional,
+    Tuple,
+    Union,
 )
 
 
 class Parameters(BaseModel):
-    seconds: int
+    priority: Optional[str]
+    seconds: int = Field(ge=0)
+    type: Optional[str]
 
 
 class Event(BaseModel):
+    elapsed: int = 0
     id: str
     parameters: Parameters
+    submitted_at: Optional[int]
+
+
+class Clock:
+    def sleep(self, seconds: float) -> None:
+        sleep(seconds)
+
+    def time(self) -> float:
+        return time()
+
+
+class Checkpoint(Exception):
+    def __init__(self, elapsed: int) -> None:
+        super().__init__(f"checkpoint after {elapsed} seconds")
 
+        self.elapsed = elapsed
 
+
+class ResultsCache:
+    def __init__(self, size: int, policy: str = "lru") -> None:
+        if policy not in ["fifo", "lru"]:
+            raise ValueError(f"{policy} is not a valid eviction policy")
+
+        self.evictions = 0
+        self.hits = 0
+        self.misses = 0
+        self.policy = policy
+        self.size = size
+        self.__lock = Lock()
+        self.__results = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        with self.__lock:
+            results = self.__results.get(key)
+
+            if results is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+
+                if self.policy == "lru":
+                    self.__results.move_to_end(key)
+
+            return results
+
+    def put(self, key: str, results: str) -> None:
+        if self.size <= 0:
+            return
+
+        with self.__lock:
+            self.__results[key] = results
+
+            while len(self.__results) > self.size:
+                self.__results.popitem(last=False)
+                self.evictions += 1
+
+
+BATCH_WRITE_SIZE = 25
+CHECKPOINT_MARGIN = int(getenv("CHECKPOINT_MARGIN", "10"))
+JOB_HANDLER = getenv("JOB_HANDLER", "sleep")
+JOB_TTL = int(getenv("JOB_TTL", "0")) or None
+JOB_TYPE = getenv("JOB_TYPE", "default")
+MAX_ATTEMPTS = int(getenv("MAX_ATTEMPTS", "5"))
+MAX_WORKERS = int(getenv("MAX_WORKERS", "8"))
+METRICS_DIMENSIONS = loads(getenv("METRICS_DIMENSIONS", "{}"))
+PRIORITY = getenv("PRIORITY", "default")
+QUEUE_URL = getenv("QUEUE_URL")
+RESULTS_BUCKET_NAME = getenv("RESULTS_BUCKET_NAME")
+RESULTS_CACHE_TABLE_NAME = getenv("RESULTS_CACHE_TABLE_NAME")
+RESULTS_CACHE_TTL = int(getenv("RESULTS_CACHE_TTL", "3600"))
+RESULTS_SIZE_THRESHOLD = int(getenv("RESULTS_SIZE_THRESHOLD", "4096"))
 TABLE_NAME = getenv("TABLE_NAME")
-TIMEOUT = int(getenv("TIMEOUT"))
+clock = Clock()
 dynamodb = client("dynamodb")
+lambda_ = client("lambda")
+s3 = client("s3")
+sqs = client("sqs")
 logger = Logger(
     level=getenv("LOG_LEVEL", "INFO"),
     service="event_processing",
 )
+metrics = Metrics(
+    namespace=getenv("METRICS_NAMESPACE", "AsynchronousEventProcessing"),
+    service="event_processing",
+)
+processor = BatchProcessor(event_type=EventType.SQS)
+tracer = Tracer(service="event_processing")
+results_cache = ResultsCache(
+    policy=getenv("RESULTS_CACHE_POLICY", "lru"),
+    size=int(getenv("RESULTS_CACHE_SIZE", "0")),
+)
+
+metrics.set_default_dimensions(
+    JobType=JOB_TYPE,
+    Priority=PRIORITY,
+    **METRICS_DIMENSIONS,
+)
 
 
-def event_processing(parameters: Parameters) -> str:
+@tracer.capture_method(capture_response=False)
+def event_processing(
+    parameters: Parameters,
+    elapsed: int = 0,
+    budget: Optional[float] = None,
+) -> str:
     seconds = parameters.seconds
     message = f"I slept for {seconds} seconds"
 
-    if seconds > TIMEOUT:
-        raise ValueError(f"{seconds} major then {TIMEOUT}")
+    if budget is not None and seconds - elapsed > budget:
+        step = max(int(budget), 0)
+
+        clock.sleep(step)
 
-    sleep(seconds)
+        raise Checkpoint(elapsed + step)
+
+    clock.sleep(seconds - elapsed)
 
     return f"{{\"message\": \"{message}\"}}"
 
 
-@event_parser(model=Event)
-def handler(event: Event, context: LambdaContext) -> None:
-    logger.debug(event)
+def get_cached_results(key: str) -> Optional[str]:
+    item = dynamodb.get_item(
+        Key={
+            "id": {
+                "S": key,
+            },
+        },
+        TableName=RESULTS_CACHE_TABLE_NAME,
+    ).get("Item")
+
+    if item is None or int(item["ttl"]["N"]) <= clock.time():
+        return None
+
+    return item["results"]["S"]
 
-    id = event.id
-    parameters = event.parameters
-    results = event_processing(parameters)
 
+def put_cached_results(key: str, results: str) -> None:
     dynamodb.put_item(
         Item={
             "id": {
-                "S": id,
+                "S": key,
             },
             "results": {
                 "S": results,
             },
-            "status": {
-                "S": "Success",
+            "ttl": {
+                "N": str(int(clock.time()) + RESULTS_CACHE_TTL),
             },
         },
+        TableName=RESULTS_CACHE_TABLE_NAME,
+    )
+
+
+JOB_HANDLERS = {
+    "sleep": event_processing,
+}
+
+
+def cached_event_processing(
+    parameters: Parameters,
+    elapsed: int = 0,
+    budget: Optional[float] = None,
+) -> str:
+    key = sha256(
+        dumps(
+            parameters.dict(
+                exclude={
+                    "priority",
+                },
+                exclude_none=True,
+            ),
+            separators=(",", ":"),
+            sort_keys=True,
+        ).encode()
+    ).hexdigest()
+    results = results_cache.get(key)
+
+    logger.debug({
+        "evictions": results_cache.evictions,
+        "hits": results_cache.hits,
+        "misses": results_cache.misses,
+    })
+
+    if results is not None:
+        return results
+
+    if RESULTS_CACHE_TABLE_NAME:
+        results = get_cached_results(key)
+
+    if results is None:
+        results = JOB_HANDLERS[JOB_HANDLER](parameters, elapsed, budget)
+
+        if (RESULTS_CACHE_TABLE_NAME and
+                len(results.encode()) <= RESULTS_SIZE_THRESHOLD):
+            put_cached_results(key, results)
+
+    results_cache.put(key, results)
+
+    return results
+
+
+@tracer.capture_method(capture_response=False)
+def put_item(item: dict) -> None:
+    start = perf_counter()
+
+    dynamodb.put_item(
+        Item=item,
         TableName=TABLE_NAME,
     )
+    metrics.add_metric(
+        name="WriteLatency",
+        unit=MetricUnit.Milliseconds,
+        value=(perf_counter() - start) * 1000,
+    )
+
+
+@tracer.capture_method(capture_response=False)
+def batch_write_items(items: List[dict]) -> List[dict]:
+    unprocessed_items = list()
+
+    for start in range(0, len(items), BATCH_WRITE_SIZE):
+        request_items = {
+            TABLE_NAME: [
+                {
+                    "PutRequest": {
+                        "Item": item,
+                    },
+                }
+                for item in items[start:start + BATCH_WRITE_SIZE]
+            ],
+        }
+        write_start = perf_counter()
+
+        try:
+            for attempt in range(MAX_ATTEMPTS):
+                response = dynamodb.batch_write_item(
+                    RequestItems=request_items)
+                request_items = response.get("UnprocessedItems", dict())
+
+                if not request_items:
+                    break
+
+                clock.sleep(0.05 * 2 ** attempt)
+        except Exception:
+            logger.exception("Batch write failed")
+
+        unprocessed_items.extend(
+            request["PutRequest"]["Item"]
+            for request in request_items.get(TABLE_NAME, list())
+        )
+        metrics.add_metric(
+            name="WriteLatency",
+            unit=MetricUnit.Milliseconds,
+            value=(perf_counter() - write_start) * 1000,
+        )
+
+    return unprocessed_items
+
+
+def continue_job(
+    id: str,
+    parameters: Parameters,
+    elapsed: int,
+    context: LambdaContext,
+    submitted_at: Optional[int] = None,
+) -> dict:
+    put_item(encode_item(
+        checkpoint=elapsed,
+        created_at=submitted_at,
+        id=id,
+        parameters=parameters.dict(exclude_none=True),
+        status="Running",
+    ))
+
+    if QUEUE_URL:
+        sqs.send_message(
+            MessageAttributes={
+                "elapsed": {
+                    "DataType": "Number",
+                    "StringValue": str(elapsed),
+                },
+                "id": {
+                    "DataType": "String",
+                    "StringValue": id,
+                },
+                **({
+                    "submitted_at": {
+                        "DataType": "Number",
+                        "StringValue": str(submitted_at),
+                    },
+                } if submitted_at is not None else dict()),
+            },
+            MessageBody=dumps(parameters.dict(exclude_none=True)),
+            QueueUrl=QUEUE_URL,
+        )
+    else:
+        lambda_.invoke(
+            FunctionName=context.invoked_function_arn,
+            InvocationType="Event",
+            Payload=dumps({
+                "elapsed": elapsed,
+                "id": id,
+                "parameters": parameters.dict(exclude_none=True),
+                "submitted_at": submitted_at,
+            }),
+        )
+
+    return {
+        "checkpoint": elapsed,
+        "id": id,
+        "status": "Running",
+    }
+
+
+def process_event(
+    event: Event,
+    context: LambdaContext,
+) -> Tuple[dict, Optional[dict]]:
+    id = event.id
+    parameters = event.parameters
+    budget = context.get_remaining_time_in_millis() / 1000 - CHECKPOINT_MARGIN
+    start = clock.time()
+
+    if event.elapsed == 0 and event.submitted_at is not None:
+        metrics.add_metric(
+            name="QueueTime",
+            unit=MetricUnit.Milliseconds,
+            value=max(start * 1000 - event.submitted_at, 0),
+        )
+
+    try:
+        results = cached_event_processing(parameters, event.elapsed, budget)
+    except Checkpoint as checkpoint:
+        metrics.add_metric(
+            name="JobsCheckpointed",
+            unit=MetricUnit.Count,
+            value=1,
+        )
+
+        return continue_job(
+            id,
+            parameters,
+            checkpoint.elapsed,
+            context,
+            event.submitted_at,
+        ), None
+    finally:
+        metrics.add_metric(
+            name="ProcessingDuration",
+            unit=MetricUnit.Milliseconds,
+            value=(clock.time() - start) * 1000,
+        )
+
+    job = {
+        "id": id,
+        "status": "Success",
+    }
+    item = encode_item(
+        created_at=event.submitted_at,
+        id=id,
+        results=results,
+        status="Success",
+        ttl=JOB_TTL,
+    )
+
+    if RESULTS_BUCKET_NAME and len(item["r"]["B"]) > RESULTS_SIZE_THRESHOLD:
+        results_location = f"results/{id}.json"
+
+        s3.put_object(
+            Body=results.encode(),
+            Bucket=RESULTS_BUCKET_NAME,
+            ContentType="application/json",
+            Key=results_location,
+        )
+
+        item = encode_item(
+            created_at=event.submitted_at,
+            id=id,
+            results_location=results_location,
+            status="Success",
+            ttl=JOB_TTL,
+        )
+    else:
+        job["results"] = loads(results)
+
+    return job, item
+
+
+@tracer.capture_method(capture_response=False)
+@event_parser(model=Event)
+def event_handler(event: Event, context: LambdaContext) -> dict:
+    logger.set_correlation_id(event.id)
+    logger.debug(event)
+    tracer.put_annotation(key="job_id", value=event.id)
+
+    job, item = process_event(event, context)
+
+    if item is not None:
+        put_item(item)
+        metrics.add_metric(
+            name="JobsSucceeded",
+            unit=MetricUnit.Count,
+            value=1,
+        )
+
+    return job
+
+
+@tracer.capture_method(capture_response=False)
+def batch_event_processing(
+    event: dict,
+    context: LambdaContext,
+) -> Tuple[dict, Optional[dict]]:
+    id = event.get("id") if isinstance(event, dict) else None
+    parsed_event = None
+
+    logger.debug(event, extra={
+        "correlation_id": id,
+    })
+
+    if id is not None:
+        tracer.put_annotation(key="job_id", value=id)
+
+    try:
+        parsed_event = Event.parse_obj(event)
+
+        return process_event(parsed_event, context)
+    except Exception as exception:
+        logger.exception(f"Job {id} failed", extra={
+            "correlation_id": id,
+        })
+        metrics.add_metric(
+            name="JobsFailed",
+            unit=MetricUnit.Count,
+            value=1,
+        )
+
+        job = {
+            "error": str(exception),
+            "errorType": type(exception).__name__,
+            "id": id,
+            "status": "Failure",
+        }
+
+        if parsed_event is None:
+            return job, None
+
+        return job, encode_item(
+            created_at=parsed_event.submitted_at,
+            id=parsed_event.id,
+            parameters=parsed_event.parameters.dict(exclude_none=True),
+            status="Failure",
+            ttl=JOB_TTL,
+        )
+
+
+@tracer.capture_method(capture_response=False)
+def events_handler(events: List[dict], context: LambdaContext) -> List[dict]:
+    logger.debug(events)
+
+    with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        outcomes = list(executor.map(
+            batch_event_processing,
+            events,
+            [context] * len(events),
+        ))
+
+    unwritten_ids = {
+        item["id"]["S"]
+        for item in batch_write_items([
+            item
+            for _, item in outcomes
+            if item is not None
+        ])
+    }
+    jobs = list()
+
+    for job, item in outcomes:
+        if item is not None and item["id"]["S"] in unwritten_ids:
+            logger.error(f"Job {job['id']} outcome not written", extra={
+                "correlation_id": job["id"],
+            })
+            metrics.add_metric(
+                name="JobsFailed",
+                unit=MetricUnit.Count,
+                value=1,
+            )
+            job = {
+                "error": f"{job['status']} outcome not written",
+                "errorType": "RuntimeError",
+                "id": job["id"],
+                "status": "Failure",
+            }
+        elif job["status"] == "Success":
+            metrics.add_metric(
+                name="JobsSucceeded",
+                unit=MetricUnit.Count,
+                value=1,
+            )
+
+        jobs.append(job)
+
+    return jobs
+
+
+def record_handler(record: SQSRecord, lambda_context: LambdaContext) -> None:
+    message_attributes = record.message_attributes
+
+    event_handler(
+        {
+            "elapsed": int(message_attributes["elapsed"].string_value)
+            if "elapsed" in message_attributes
+            else 0,
+            "id": message_attributes["id"].string_value,
+            "parameters": loads(record.body),
+            "submitted_at": int(
+                message_attributes["submitted_at"].string_value)
+            if "submitted_at" in message_attributes
+            else None,
+        },
+        lambda_context,
+    )
+
+
+@batch_processor(record_handler=record_handler, processor=processor)
+def records_handler(event: dict, context: LambdaContext) -> dict:
+    return processor.response()
+
+
+@tracer.capture_lambda_handler(capture_response=False)
+@metrics.log_metrics
+def handler(
+    event: Union[dict, List[dict]],
+    context: LambdaContext,
+) -> Union[dict, List[dict], None]:
+    if isinstance(event, list):
+        return events_handler(event, context)
+
+    if isinstance(event, dict) and "Records" in event:
+        return records_handler(event, context)
+
+    return event_handler(event, context)
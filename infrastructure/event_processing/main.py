@@ -2,36 +2,114 @@ from aws_cdk import (
     BundlingOptions,
     Duration,
     RemovalPolicy,
+    SecretValue,
+    Size,
+    Stack,
 )
 from aws_cdk.aws_dynamodb import (
     Attribute,
     AttributeType,
+    BillingMode,
+    ProjectionType,
+    StreamViewType,
     Table,
     TableEncryption,
 )
 from aws_cdk.aws_events import (
+    ApiDestination,
+    Authorization,
+    Connection,
     EventBus,
     EventPattern,
+    HttpMethod,
+    Rule,
+    RuleTargetInput,
+)
+from aws_cdk.aws_events_targets import (
+    ApiDestination as ApiDestinationTarget,
+    SqsQueue,
+)
+from aws_cdk.aws_glue import (
+    CfnDatabase,
+    CfnTable,
+)
+from aws_cdk.aws_iam import (
+    Policy,
+    PolicyStatement,
+    Role,
+    ServicePrincipal,
+)
+from aws_cdk.aws_kinesisfirehose import (
+    CfnDeliveryStream,
 )
 from aws_cdk.aws_kms import (
     Key,
 )
 from aws_cdk.aws_lambda import (
+    Architecture,
     Code,
+    EventSourceMapping,
+    FilterCriteria,
+    FilterRule,
     Function,
     LayerVersion,
     Runtime,
+    StartingPosition,
+    Tracing,
 )
 from aws_cdk.aws_lambda_destinations import (
     EventBridgeDestination,
     LambdaDestination,
 )
+from aws_cdk.aws_lambda_event_sources import (
+    SqsDlq,
+)
+from aws_cdk.aws_s3 import (
+    BlockPublicAccess,
+    Bucket,
+    BucketEncryption,
+    LifecycleRule,
+    StorageClass,
+    Transition,
+)
+from aws_cdk.aws_sqs import (
+    DeadLetterQueue,
+    Queue,
+    QueueEncryption,
+)
 from constructs import (
     Construct,
 )
+from json import (
+    dumps,
+)
 from pathlib import (
     Path,
 )
+from typing import (
+    Dict,
+    List,
+    Optional,
+)
+
+FUNCTION_SETTINGS = {
+    "architecture": Architecture.X86_64,
+    "ephemeral_storage_size": 512,
+    "memory_size": 128,
+    "timeout": 29,
+}
+FUNCTION_TIMEOUTS = {
+    "error_handling": 5,
+    "event_processing": 300,
+    "job_archival": 60,
+    "job_lookup": 29,
+    "job_replay": 60,
+    "job_stats": 29,
+    "job_submission": 29,
+}
+JOB_HANDLERS = [
+    "sleep",
+]
 
 
 class EventProcessingConstruct(Construct):
@@ -39,14 +117,49 @@ class EventProcessingConstruct(Construct):
         self,
         scope: Construct,
         construct_id: str,
-        error_handling_timeout: int = 5,
-        event_processing_timeout: int = 300,
+        account_concurrency_limit: int = 1000,
+        api_cache_enabled: bool = False,
+        archive_buffering_interval: int = 900,
+        archive_buffering_size: int = 64,
+        archive_transition: int = 90,
+        batch_size: int = 10,
+        billing_mode: BillingMode = BillingMode.PROVISIONED,
+        checkpoint_margin: int = 10,
+        event_processing_max_workers: int = 8,
+        function_settings: Optional[Dict[str, dict]] = None,
+        idempotency_window: int = 86400,
+        job_ttl: int = 2592000,
+        job_types: Optional[List[dict]] = None,
+        max_batching_window: int = 0,
+        max_concurrency: int = 100,
         max_event_age: int = 21600,
+        max_read_capacity: int = 100,
+        max_wait: int = 25,
+        max_write_capacity: int = 100,
+        metrics_dimensions: Optional[Dict[str, str]] = None,
+        metrics_namespace: str = "AsynchronousEventProcessing",
+        pack_size: int = 1,
         pending_window: int = 7,
+        priority_lanes: Optional[List[dict]] = None,
+        queue_enabled: bool = False,
         read_capacity: int = 5,
         removal_policy: RemovalPolicy = RemovalPolicy.DESTROY,
+        replay_batch_size: int = 10,
+        replay_enabled: bool = False,
+        replay_max_concurrency: int = 2,
+        replay_rate: float = 10,
         reserved_concurrent_executions: int = 100,
+        results_cache_enabled: bool = False,
+        results_cache_policy: str = "lru",
+        results_cache_size: int = 128,
+        results_cache_ttl: int = 3600,
+        results_size_threshold: int = 4096,
+        results_url_expiration: int = 3600,
         retry_attempts: int = 0,
+        stats_enabled: bool = False,
+        stats_ttl: int = 7776000,
+        target_utilization: int = 70,
+        webhooks: Optional[List[dict]] = None,
         write_capacity: int = 5,
     ) -> None:
         super().__init__(
@@ -54,10 +167,65 @@ class EventProcessingConstruct(Construct):
             construct_id,
         )
 
+        for name, settings in (function_settings or dict()).items():
+            if name not in FUNCTION_TIMEOUTS:
+                raise ValueError(f"{name} is not a valid function")
+
+            for key in settings:
+                if key not in FUNCTION_SETTINGS:
+                    raise ValueError(f"{key} is not a valid function setting")
+
+        __settings = {
+            name: {
+                **FUNCTION_SETTINGS,
+                "timeout": timeout,
+                **(function_settings or dict()).get(name, dict()),
+            }
+            for name, timeout in FUNCTION_TIMEOUTS.items()
+        }
+
+        if (job_types or priority_lanes) and queue_enabled:
+            raise ValueError(
+                "Job types and priority lanes are not supported "
+                "when the jobs queue is enabled")
+
+        if (webhooks or replay_enabled) and queue_enabled:
+            raise ValueError(
+                "Webhooks and job replay are not supported "
+                "when the jobs queue is enabled")
+
+        for job_type in job_types or list():
+            if job_type.get("handler", "sleep") not in JOB_HANDLERS:
+                raise ValueError(
+                    f"{job_type['handler']} is not a valid job handler")
+
+        if min(
+            job_type.get("timeout", __settings["event_processing"]["timeout"])
+            for job_type in [dict(), *(job_types or list())]
+        ) <= checkpoint_margin:
+            raise ValueError(
+                "The checkpoint margin must be shorter than the timeout of "
+                "each event processing function")
+
+        if replay_enabled and replay_max_concurrency < 2:
+            raise ValueError(
+                "The replay maximum concurrency must be at least 2")
+
+        if replay_enabled and (replay_batch_size * replay_max_concurrency /
+                               replay_rate + 5 >
+                               __settings["job_replay"]["timeout"]):
+            raise ValueError(
+                "A batch of replayed jobs must be resubmitted at the replay "
+                "rate within the job replay timeout")
+
         self.__failed_jobs_event_bus = EventBus(
             self,
             "FailedJobsEventBus",
         )
+        self.jobs_event_bus = EventBus(
+            self,
+            "JobsEventBus",
+        )
         self.__jobs_table_key = Key(
             self,
             "JobsTableKey",
@@ -66,160 +234,1099 @@ class EventProcessingConstruct(Construct):
             pending_window=Duration.days(pending_window),
             removal_policy=removal_policy,
         )
-        self.__powertools_layer = LayerVersion(
+        self.__job_items_layer = LayerVersion(
             self,
-            "PowertoolsLayer",
+            "JobItemsLayer",
             code=Code.from_asset(
                 str(
                     Path(__file__).
                     parent.
                     parent.
                     parent.
-                    joinpath("powertools").
+                    joinpath("job_items").
                     resolve()
                 ),
                 bundling=BundlingOptions(
                     command=[
                         "bash",
                         "-c",
-                        ("mkdir /asset-output/python && "
-                         "pip install "
-                         "--requirement /asset-input/requirements.txt "
-                         "--target /asset-output/python"),
+                        ("mkdir --parents /asset-output/python/job_items && "
+                         "cp /asset-input/*.py "
+                         "--target /asset-output/python/job_items "
+                         "--update"),
                     ],
                     image=Runtime.PYTHON_3_9.bundling_image,
                 ),
             ),
+            compatible_architectures=[
+                Architecture.ARM_64,
+                Architecture.X86_64,
+            ],
             compatible_runtimes=[
                 Runtime.PYTHON_3_9,
             ],
-            description="AWS Lambda Powertools for Python",
+            description="Jobs table item encoding",
             license="MIT-0",
         )
+        self.__powertools_layers: Dict[str, LayerVersion] = dict()
+        self.__results_bucket = Bucket(
+            self,
+            "ResultsBucket",
+            auto_delete_objects=removal_policy == RemovalPolicy.DESTROY,
+            block_public_access=BlockPublicAccess.BLOCK_ALL,
+            encryption=BucketEncryption.S3_MANAGED,
+            enforce_ssl=True,
+            lifecycle_rules=[
+                LifecycleRule(
+                    expiration=Duration.days(-(-job_ttl // 86400) + 7),
+                ),
+            ],
+            removal_policy=removal_policy,
+        )
+        self.__jobs_archive_bucket = Bucket(
+            self,
+            "JobsArchiveBucket",
+            auto_delete_objects=removal_policy == RemovalPolicy.DESTROY,
+            block_public_access=BlockPublicAccess.BLOCK_ALL,
+            encryption=BucketEncryption.S3_MANAGED,
+            enforce_ssl=True,
+            lifecycle_rules=[
+                LifecycleRule(
+                    transitions=[
+                        Transition(
+                            storage_class=StorageClass.
+                            GLACIER_INSTANT_RETRIEVAL,
+                            transition_after=Duration.days(
+                                archive_transition),
+                        ),
+                    ],
+                ),
+            ],
+            removal_policy=removal_policy,
+        )
+        self.__jobs_archive_database = CfnDatabase(
+            self,
+            "JobsArchiveDatabase",
+            catalog_id=Stack.of(self).account,
+            database_input=CfnDatabase.DatabaseInputProperty(
+                description="Jobs Archive Database",
+            ),
+        )
+        self.__jobs_archive_table = CfnTable(
+            self,
+            "JobsArchiveTable",
+            catalog_id=Stack.of(self).account,
+            database_name=self.__jobs_archive_database.ref,
+            table_input=CfnTable.TableInputProperty(
+                description="Jobs Archive Table",
+                parameters={
+                    "classification": "parquet",
+                },
+                partition_keys=[
+                    CfnTable.ColumnProperty(
+                        name="date",
+                        type="string",
+                    ),
+                ],
+                storage_descriptor=CfnTable.StorageDescriptorProperty(
+                    columns=[
+                        CfnTable.ColumnProperty(
+                            name=name,
+                            type=type,
+                        )
+                        for name, type in {
+                            "created_at": "bigint",
+                            "id": "string",
+                            "parameters": "string",
+                            "results": "string",
+                            "results_location": "string",
+                            "status": "string",
+                            "updated_at": "bigint",
+                        }.items()
+                    ],
+                    input_format=("org.apache.hadoop.hive.ql.io.parquet."
+                                  "MapredParquetInputFormat"),
+                    location=self.__jobs_archive_bucket.s3_url_for_object(
+                        "jobs/"),
+                    output_format=("org.apache.hadoop.hive.ql.io.parquet."
+                                   "MapredParquetOutputFormat"),
+                    serde_info=CfnTable.SerdeInfoProperty(
+                        serialization_library=("org.apache.hadoop.hive.ql."
+                                               "io.parquet.serde."
+                                               "ParquetHiveSerDe"),
+                    ),
+                ),
+                table_type="EXTERNAL_TABLE",
+            ),
+        )
+        self.__jobs_archive_delivery_stream_role = Role(
+            self,
+            "JobsArchiveDeliveryStreamRole",
+            assumed_by=ServicePrincipal("firehose.amazonaws.com"),
+        )
+        self.__jobs_archive_delivery_stream = CfnDeliveryStream(
+            self,
+            "JobsArchiveDeliveryStream",
+            delivery_stream_encryption_configuration_input=CfnDeliveryStream.
+            DeliveryStreamEncryptionConfigurationInputProperty(
+                key_type="AWS_OWNED_CMK",
+            ),
+            extended_s3_destination_configuration=CfnDeliveryStream.
+            ExtendedS3DestinationConfigurationProperty(
+                bucket_arn=self.__jobs_archive_bucket.bucket_arn,
+                buffering_hints=CfnDeliveryStream.BufferingHintsProperty(
+                    interval_in_seconds=archive_buffering_interval,
+                    size_in_m_bs=archive_buffering_size,
+                ),
+                data_format_conversion_configuration=CfnDeliveryStream.
+                DataFormatConversionConfigurationProperty(
+                    enabled=True,
+                    input_format_configuration=CfnDeliveryStream.
+                    InputFormatConfigurationProperty(
+                        deserializer=CfnDeliveryStream.DeserializerProperty(
+                            open_x_json_ser_de=CfnDeliveryStream.
+                            OpenXJsonSerDeProperty(),
+                        ),
+                    ),
+                    output_format_configuration=CfnDeliveryStream.
+                    OutputFormatConfigurationProperty(
+                        serializer=CfnDeliveryStream.SerializerProperty(
+                            parquet_ser_de=CfnDeliveryStream.
+                            ParquetSerDeProperty(),
+                        ),
+                    ),
+                    schema_configuration=CfnDeliveryStream.
+                    SchemaConfigurationProperty(
+                        database_name=self.__jobs_archive_database.ref,
+                        region=Stack.of(self).region,
+                        role_arn=self.
+                        __jobs_archive_delivery_stream_role.
+                        role_arn,
+                        table_name=self.__jobs_archive_table.ref,
+                    ),
+                ),
+                error_output_prefix=("errors/!{firehose:error-output-type}/"
+                                     "date=!{timestamp:yyyy-MM-dd}/"),
+                prefix="jobs/date=!{timestamp:yyyy-MM-dd}/",
+                role_arn=self.__jobs_archive_delivery_stream_role.role_arn,
+            ),
+        )
         self.jobs_table = Table(
             self,
             "JobsTable",
             encryption=TableEncryption.CUSTOMER_MANAGED,
             encryption_key=self.__jobs_table_key,
+            billing_mode=billing_mode,
             partition_key=Attribute(
                 name="id",
                 type=AttributeType.STRING,
             ),
             point_in_time_recovery=True,
-            read_capacity=read_capacity,
+            read_capacity=read_capacity
+            if billing_mode == BillingMode.PROVISIONED
+            else None,
             removal_policy=removal_policy,
-            write_capacity=write_capacity,
+            stream=StreamViewType.NEW_AND_OLD_IMAGES,
+            time_to_live_attribute="ttl",
+            write_capacity=write_capacity
+            if billing_mode == BillingMode.PROVISIONED
+            else None,
+        )
+
+        self.jobs_table.add_global_secondary_index(
+            index_name="StatusIndex",
+            non_key_attributes=[
+                "s",
+                "u",
+                "v",
+            ],
+            partition_key=Attribute(
+                name="g",
+                type=AttributeType.STRING,
+            ),
+            projection_type=ProjectionType.INCLUDE,
+            read_capacity=read_capacity
+            if billing_mode == BillingMode.PROVISIONED
+            else None,
+            sort_key=Attribute(
+                name="t",
+                type=AttributeType.NUMBER,
+            ),
+            write_capacity=write_capacity
+            if billing_mode == BillingMode.PROVISIONED
+            else None,
         )
+
+        if billing_mode == BillingMode.PROVISIONED:
+            self.jobs_table.auto_scale_global_secondary_index_read_capacity(
+                "StatusIndex",
+                max_capacity=max_read_capacity,
+                min_capacity=read_capacity,
+            ).scale_on_utilization(
+                target_utilization_percent=target_utilization,
+            )
+            self.jobs_table.auto_scale_global_secondary_index_write_capacity(
+                "StatusIndex",
+                max_capacity=max_write_capacity,
+                min_capacity=write_capacity,
+            ).scale_on_utilization(
+                target_utilization_percent=target_utilization,
+            )
+            self.jobs_table.auto_scale_read_capacity(
+                max_capacity=max_read_capacity,
+                min_capacity=read_capacity,
+            ).scale_on_utilization(
+                target_utilization_percent=target_utilization,
+            )
+            self.jobs_table.auto_scale_write_capacity(
+                max_capacity=max_write_capacity,
+                min_capacity=write_capacity,
+            ).scale_on_utilization(
+                target_utilization_percent=target_utilization,
+            )
+
         self.__error_handling_function = Function(
             self,
             "ErrorHandlingFunction",
-            code=Code.from_asset(
-                str(
-                    Path(__file__).
-                    parent.
-                    parent.
-                    parent.
-                    joinpath("error_handling").
-                    resolve()
-                ),
-                bundling=BundlingOptions(
-                    command=[
-                        "bash",
-                        "-c",
-                        ("cp /asset-input/main.py "
-                         "--target /asset-output "
-                         "--update"),
-                    ],
-                    image=Runtime.PYTHON_3_9.bundling_image,
-                ),
-            ),
+            code=self.__function_code("error_handling"),
             environment={
+                "JOB_TTL": str(job_ttl),
+                "METRICS_DIMENSIONS": dumps(metrics_dimensions or dict()),
+                "METRICS_NAMESPACE": metrics_namespace,
                 "TABLE_NAME": self.jobs_table.table_name,
             },
             handler="main.handler",
-            layers=[
-                self.__powertools_layer,
-            ],
             max_event_age=Duration.seconds(max_event_age),
             on_failure=EventBridgeDestination(self.__failed_jobs_event_bus),
+            on_success=EventBridgeDestination(self.jobs_event_bus),
             reserved_concurrent_executions=reserved_concurrent_executions,
             retry_attempts=retry_attempts,
             runtime=Runtime.PYTHON_3_9,
-            timeout=Duration.seconds(error_handling_timeout),
+            tracing=Tracing.ACTIVE,
+            **self.__function_settings(__settings["error_handling"]),
         )
+        __event_processing_environment = {
+            "CHECKPOINT_MARGIN": str(checkpoint_margin),
+            "JOB_TTL": str(job_ttl),
+            "MAX_WORKERS": str(event_processing_max_workers),
+            "METRICS_DIMENSIONS": dumps(metrics_dimensions or dict()),
+            "METRICS_NAMESPACE": metrics_namespace,
+            "RESULTS_BUCKET_NAME": self.__results_bucket.bucket_name,
+            "RESULTS_SIZE_THRESHOLD": str(results_size_threshold),
+            "TABLE_NAME": self.jobs_table.table_name,
+        }
         self.event_processing_function = Function(
             self,
             "EventProcessingFunction",
-            code=Code.from_asset(
-                str(
-                    Path(__file__).
-                    parent.
-                    parent.
-                    parent.
-                    joinpath("event_processing").
-                    resolve()
-                ),
-                bundling=BundlingOptions(
-                    command=[
-                        "bash",
-                        "-c",
-                        ("cp /asset-input/main.py "
-                         "--target /asset-output "
-                         "--update"),
-                    ],
-                    image=Runtime.PYTHON_3_9.bundling_image,
-                ),
-            ),
-            environment={
-                "TABLE_NAME": self.jobs_table.table_name,
-                "TIMEOUT": str(event_processing_timeout),
-            },
+            code=self.__function_code("event_processing"),
+            environment=__event_processing_environment,
             handler="main.handler",
-            layers=[
-                self.__powertools_layer,
-            ],
             max_event_age=Duration.seconds(max_event_age),
             on_failure=LambdaDestination(self.__error_handling_function),
+            on_success=EventBridgeDestination(self.jobs_event_bus),
             reserved_concurrent_executions=reserved_concurrent_executions,
             retry_attempts=retry_attempts,
             runtime=Runtime.PYTHON_3_9,
-            timeout=Duration.seconds(event_processing_timeout),
+            tracing=Tracing.ACTIVE,
+            **self.__function_settings(__settings["event_processing"]),
+        )
+        self.job_type_functions: Dict[str, Function] = dict()
+        self.priority_lane_functions: Dict[str, Dict[str, Function]] = dict()
+        __job_types_concurrency = sum(
+            job_type.get(
+                "reserved_concurrent_executions",
+                reserved_concurrent_executions,
+            )
+            for job_type in [dict(), *(job_types or list())]
+        )
+
+        for priority_lane in [dict(), *(priority_lanes or list())]:
+            __lane = priority_lane.get("name", "")
+
+            for job_type in [dict(), *(job_types or list())]:
+                __name = job_type.get("name", "")
+
+                if not __lane and not __name:
+                    continue
+
+                __concurrency = job_type.get(
+                    "reserved_concurrent_executions",
+                    reserved_concurrent_executions,
+                )
+
+                if "reserved_concurrent_executions" in priority_lane:
+                    __concurrency = max(
+                        priority_lane["reserved_concurrent_executions"] *
+                        __concurrency //
+                        __job_types_concurrency,
+                        1,
+                    )
+
+                __function = Function(
+                    self,
+                    f"{__name}{__lane}EventProcessingFunction",
+                    code=self.__function_code("event_processing"),
+                    environment={
+                        **__event_processing_environment,
+                        "JOB_HANDLER": job_type.get("handler", "sleep"),
+                        "JOB_TYPE": __name or "default",
+                        "PRIORITY": __lane or "default",
+                    },
+                    handler="main.handler",
+                    max_event_age=Duration.seconds(priority_lane.get(
+                        "max_event_age", max_event_age)),
+                    on_failure=LambdaDestination(
+                        self.__error_handling_function),
+                    on_success=EventBridgeDestination(self.jobs_event_bus),
+                    reserved_concurrent_executions=__concurrency,
+                    retry_attempts=retry_attempts,
+                    runtime=Runtime.PYTHON_3_9,
+                    tracing=Tracing.ACTIVE,
+                    **self.__function_settings({
+                        **__settings["event_processing"],
+                        **{
+                            key: value
+                            for key, value in job_type.items()
+                            if key in FUNCTION_SETTINGS
+                        },
+                    }),
+                )
+
+                if __lane:
+                    self.priority_lane_functions.setdefault(
+                        __lane, dict())[__name] = __function
+                else:
+                    self.job_type_functions[__name] = __function
+
+        __event_processing_functions = [
+            self.event_processing_function,
+            *self.job_type_functions.values(),
+            *(
+                function
+                for functions in self.priority_lane_functions.values()
+                for function in functions.values()
+            ),
+        ]
+        self.__job_archival_function = Function(
+            self,
+            "JobArchivalFunction",
+            code=self.__function_code("job_archival"),
+            environment={
+                "ARCHIVE_BUCKET_NAME": self.
+                __jobs_archive_bucket.
+                bucket_name,
+                "DELIVERY_STREAM_NAME": self.
+                __jobs_archive_delivery_stream.
+                ref,
+                "RESULTS_BUCKET_NAME": self.__results_bucket.bucket_name,
+            },
+            handler="main.handler",
+            reserved_concurrent_executions=1,
+            runtime=Runtime.PYTHON_3_9,
+            **self.__function_settings(__settings["job_archival"]),
+        )
+        __reserved_concurrency = sum(
+            function.node.default_child.reserved_concurrent_executions or 0
+            for function in [
+                self.__error_handling_function,
+                self.__job_archival_function,
+                *__event_processing_functions,
+            ]
+        )
+
+        if __reserved_concurrency > account_concurrency_limit - 100:
+            raise ValueError(
+                f"The reserved concurrency of {__reserved_concurrency} "
+                "exceeds the account concurrency limit "
+                f"of {account_concurrency_limit} "
+                "less 100 unreserved executions")
+
+        self.job_lookup_function = Function(
+            self,
+            "JobLookupFunction",
+            code=self.__function_code("job_lookup"),
+            environment={
+                "CACHE_ENABLED": str(api_cache_enabled).lower(),
+                "MAX_WAIT": str(max_wait),
+                "RESULTS_BUCKET_NAME": self.__results_bucket.bucket_name,
+                "RESULTS_URL_EXPIRATION": str(results_url_expiration),
+                "STATUS_INDEX_NAME": "StatusIndex",
+                "TABLE_NAME": self.jobs_table.table_name,
+            },
+            handler="main.handler",
+            runtime=Runtime.PYTHON_3_9,
+            **self.__function_settings(__settings["job_lookup"]),
+        )
+        self.job_submission_function = Function(
+            self,
+            "JobSubmissionFunction",
+            code=self.__function_code("job_submission"),
+            environment={
+                "FUNCTION_NAME": self.event_processing_function.function_name,
+                "IDEMPOTENCY_WINDOW": str(idempotency_window),
+                "LANES": dumps({
+                    lane: {
+                        name: function.function_name
+                        for name, function in functions.items()
+                    }
+                    for lane, functions in self.priority_lane_functions.items()
+                }),
+                "PACK_SIZE": str(pack_size),
+                "TABLE_NAME": self.jobs_table.table_name,
+                "TARGETS": dumps({
+                    name: function.function_name
+                    for name, function in self.job_type_functions.items()
+                }),
+            },
+            handler="main.handler",
+            runtime=Runtime.PYTHON_3_9,
+            tracing=Tracing.ACTIVE,
+            **self.__function_settings(__settings["job_submission"]),
+        )
+
+        self.__jobs_table_event_source_mapping = EventSourceMapping(
+            self,
+            "JobsTableEventSourceMapping",
+            batch_size=500,
+            bisect_batch_on_error=True,
+            event_source_arn=self.jobs_table.table_stream_arn,
+            filters=[
+                FilterCriteria.filter(
+                    {
+                        "eventName": FilterRule.is_equal("REMOVE"),
+                        "userIdentity": {
+                            "principalId": FilterRule.is_equal(
+                                "dynamodb.amazonaws.com"),
+                            "type": FilterRule.is_equal("Service"),
+                        },
+                    },
+                ),
+            ],
+            max_batching_window=Duration.seconds(60),
+            starting_position=StartingPosition.TRIM_HORIZON,
+            target=self.__job_archival_function,
+        )
+
+        self.jobs_queue = None
+
+        if queue_enabled:
+            self.__jobs_dead_letter_queue = Queue(
+                self,
+                "JobsDeadLetterQueue",
+                encryption=QueueEncryption.SQS_MANAGED,
+                enforce_ssl=True,
+                retention_period=Duration.days(14),
+                visibility_timeout=Duration.seconds(
+                    6 * __settings["error_handling"]["timeout"]),
+            )
+            self.jobs_queue = Queue(
+                self,
+                "JobsQueue",
+                dead_letter_queue=DeadLetterQueue(
+                    max_receive_count=retry_attempts + 1,
+                    queue=self.__jobs_dead_letter_queue,
+                ),
+                encryption=QueueEncryption.SQS_MANAGED,
+                enforce_ssl=True,
+                retention_period=Duration.seconds(max_event_age),
+                visibility_timeout=Duration.seconds(
+                    6 * __settings["event_processing"]["timeout"]),
+            )
+            self.__jobs_dead_letter_queue_event_source_mapping = \
+                EventSourceMapping(
+                    self,
+                    "JobsDeadLetterQueueEventSourceMapping",
+                    event_source_arn=self.
+                    __jobs_dead_letter_queue.
+                    queue_arn,
+                    report_batch_item_failures=True,
+                    target=self.__error_handling_function,
+                )
+            self.__jobs_queue_event_source_mapping = EventSourceMapping(
+                self,
+                "JobsQueueEventSourceMapping",
+                batch_size=batch_size,
+                event_source_arn=self.jobs_queue.queue_arn,
+                max_batching_window=Duration.seconds(max_batching_window),
+                report_batch_item_failures=True,
+                target=self.event_processing_function,
+            )
+
+            self.__jobs_dead_letter_queue.grant_consume_messages(
+                self.__error_handling_function)
+            self.__jobs_queue_event_source_mapping.node.default_child.\
+                add_property_override(
+                    "ScalingConfig",
+                    {
+                        "MaximumConcurrency": max_concurrency,
+                    },
+                )
+            self.event_processing_function.add_environment(
+                "QUEUE_URL",
+                self.jobs_queue.queue_url,
+            )
+            self.job_submission_function.add_environment(
+                "QUEUE_URL",
+                self.jobs_queue.queue_url,
+            )
+            self.jobs_queue.grant_consume_messages(
+                self.event_processing_function)
+            self.jobs_queue.grant_send_messages(
+                self.event_processing_function)
+            self.jobs_queue.grant_send_messages(self.job_submission_function)
+
+        if webhooks:
+            self.__webhooks_dead_letter_queue = Queue(
+                self,
+                "WebhooksDeadLetterQueue",
+                encryption=QueueEncryption.SQS_MANAGED,
+                enforce_ssl=True,
+                retention_period=Duration.days(14),
+            )
+
+        for webhook in webhooks or list():
+            __name = webhook["name"]
+            __connection = Connection(
+                self,
+                f"{__name}WebhookConnection",
+                authorization=Authorization.api_key(
+                    webhook.get("api_key_header", "x-api-key"),
+                    SecretValue.secrets_manager(
+                        webhook["api_key_secret_name"]),
+                ),
+                description=f"{__name} Webhook Connection",
+            )
+            __api_destination = ApiDestination(
+                self,
+                f"{__name}WebhookApiDestination",
+                connection=__connection,
+                description=f"{__name} Webhook API Destination",
+                endpoint=webhook["endpoint"],
+                http_method=HttpMethod.POST,
+                rate_limit_per_second=webhook.get("rate_limit", 10),
+            )
+
+            Rule(
+                self,
+                f"{__name}WebhookRule",
+                description=f"{__name} Webhook Rule",
+                event_bus=self.jobs_event_bus,
+                event_pattern=EventPattern(
+                    detail={
+                        "responsePayload": {
+                            "status": webhook.get(
+                                "statuses",
+                                [
+                                    "Failure",
+                                    "Success",
+                                    "TimedOut",
+                                ],
+                            ),
+                        },
+                    },
+                    detail_type=[
+                        "Lambda Function Invocation Result - Success",
+                    ],
+                ),
+                targets=[
+                    ApiDestinationTarget(
+                        __api_destination,
+                        dead_letter_queue=self.__webhooks_dead_letter_queue,
+                        event=RuleTargetInput.from_event_path(
+                            "$.detail.responsePayload"),
+                        max_event_age=Duration.seconds(max_event_age),
+                        retry_attempts=webhook.get("retry_attempts", 185),
+                    ),
+                ],
+            )
+
+        if results_cache_enabled:
+            self.__results_cache_table = Table(
+                self,
+                "ResultsCacheTable",
+                billing_mode=BillingMode.PAY_PER_REQUEST,
+                encryption=TableEncryption.CUSTOMER_MANAGED,
+                encryption_key=self.__jobs_table_key,
+                partition_key=Attribute(
+                    name="id",
+                    type=AttributeType.STRING,
+                ),
+                removal_policy=removal_policy,
+                time_to_live_attribute="ttl",
+            )
+
+            for function in __event_processing_functions:
+                self.__results_cache_table.grant_read_write_data(function)
+            self.__results_cache_table.node.default_child.add_metadata(
+                "checkov",
+                {
+                    "skip": [
+                        {
+                            "comment": ("The results cache is rebuilt "
+                                        "on demand"),
+                            "id": "CKV_AWS_28",
+                        },
+                    ],
+                },
+            )
+
+            for name, value in {
+                "RESULTS_CACHE_POLICY": results_cache_policy,
+                "RESULTS_CACHE_SIZE": str(results_cache_size),
+                "RESULTS_CACHE_TABLE_NAME": self.
+                __results_cache_table.
+                table_name,
+                "RESULTS_CACHE_TTL": str(results_cache_ttl),
+            }.items():
+                for function in __event_processing_functions:
+                    function.add_environment(name, value)
+
+        self.__skip_function_checks(self.__error_handling_function)
+        self.__failed_jobs_event_bus.archive(
+            "FailedJobsEventArchive",
+            description="Failed Jobs Event Archive",
+            event_pattern=EventPattern(),
+        )
+        self.failed_jobs_archive = self.jobs_event_bus.archive(
+            "FailedJobsArchive",
+            description="Failed Jobs Archive",
+            event_pattern=self.__failed_jobs_event_pattern(),
         )
+        self.job_replay_rule = None
+
+        if replay_enabled:
+            self.__job_replay_dead_letter_queue = Queue(
+                self,
+                "JobReplayDeadLetterQueue",
+                encryption=QueueEncryption.SQS_MANAGED,
+                enforce_ssl=True,
+                retention_period=Duration.days(14),
+            )
+            self.__job_replay_queue = Queue(
+                self,
+                "JobReplayQueue",
+                dead_letter_queue=DeadLetterQueue(
+                    max_receive_count=retry_attempts + 1,
+                    queue=self.__job_replay_dead_letter_queue,
+                ),
+                encryption=QueueEncryption.SQS_MANAGED,
+                enforce_ssl=True,
+                retention_period=Duration.days(14),
+                visibility_timeout=Duration.seconds(
+                    6 * __settings["job_replay"]["timeout"]),
+            )
+            self.__job_replay_function = Function(
+                self,
+                "JobReplayFunction",
+                code=self.__function_code("job_replay"),
+                environment={
+                    "FUNCTION_NAME": self.
+                    event_processing_function.
+                    function_name,
+                    "REPLAY_CONCURRENCY": str(replay_max_concurrency),
+                    "REPLAY_RATE": str(replay_rate),
+                    "TABLE_NAME": self.jobs_table.table_name,
+                },
+                handler="main.handler",
+                runtime=Runtime.PYTHON_3_9,
+                tracing=Tracing.ACTIVE,
+                **self.__function_settings(__settings["job_replay"]),
+            )
+            self.job_replay_rule = Rule(
+                self,
+                "JobReplayRule",
+                description="Job Replay Rule",
+                event_bus=self.jobs_event_bus,
+                event_pattern=self.__failed_jobs_event_pattern(),
+                targets=[
+                    SqsQueue(self.__job_replay_queue),
+                ],
+            )
+            self.__job_replay_queue_event_source_mapping = EventSourceMapping(
+                self,
+                "JobReplayQueueEventSourceMapping",
+                batch_size=replay_batch_size,
+                event_source_arn=self.__job_replay_queue.queue_arn,
+                report_batch_item_failures=True,
+                target=self.__job_replay_function,
+            )
+
+            self.job_replay_rule.node.default_child.add_property_override(
+                "EventPattern.replay-name",
+                [
+                    {
+                        "exists": True,
+                    },
+                ],
+            )
+            self.__job_replay_queue.grant_consume_messages(
+                self.__job_replay_function)
+            self.__job_replay_queue_event_source_mapping.node.default_child.\
+                add_property_override(
+                    "ScalingConfig",
+                    {
+                        "MaximumConcurrency": replay_max_concurrency,
+                    },
+                )
+            self.__skip_function_checks(
+                self.__job_replay_function,
+                dead_letter_queue_comment=("This function is invoked "
+                                           "by an event source mapping"),
+            )
+            self.jobs_table.grant_read_write_data(self.__job_replay_function)
+
+            for function in __event_processing_functions:
+                function.grant_invoke(self.__job_replay_function)
 
-        self.__error_handling_function.node.default_child.add_metadata(
+        self.job_stats_function = None
+
+        if stats_enabled:
+            self.__job_stats_table = Table(
+                self,
+                "JobStatsTable",
+                billing_mode=BillingMode.PAY_PER_REQUEST,
+                encryption=TableEncryption.CUSTOMER_MANAGED,
+                encryption_key=self.__jobs_table_key,
+                partition_key=Attribute(
+                    name="d",
+                    type=AttributeType.STRING,
+                ),
+                point_in_time_recovery=True,
+                removal_policy=removal_policy,
+                sort_key=Attribute(
+                    name="m",
+                    type=AttributeType.NUMBER,
+                ),
+                time_to_live_attribute="ttl",
+            )
+            self.job_stats_function = Function(
+                self,
+                "JobStatsFunction",
+                code=self.__function_code("job_stats"),
+                environment={
+                    "STATS_TABLE_NAME": self.__job_stats_table.table_name,
+                    "STATS_TTL": str(stats_ttl),
+                },
+                handler="main.handler",
+                runtime=Runtime.PYTHON_3_9,
+                tracing=Tracing.ACTIVE,
+                **self.__function_settings(__settings["job_stats"]),
+            )
+            self.__job_stats_dead_letter_queue = Queue(
+                self,
+                "JobStatsDeadLetterQueue",
+                encryption=QueueEncryption.SQS_MANAGED,
+                enforce_ssl=True,
+                retention_period=Duration.days(14),
+            )
+            self.__job_stats_event_source_mapping = EventSourceMapping(
+                self,
+                "JobStatsEventSourceMapping",
+                batch_size=500,
+                event_source_arn=self.jobs_table.table_stream_arn,
+                filters=[
+                    FilterCriteria.filter(
+                        {
+                            "eventName": FilterRule.or_(
+                                "INSERT",
+                                "MODIFY",
+                            ),
+                        },
+                    ),
+                ],
+                max_batching_window=Duration.seconds(10),
+                max_record_age=Duration.hours(1),
+                on_failure=SqsDlq(self.__job_stats_dead_letter_queue),
+                retry_attempts=2,
+                starting_position=StartingPosition.TRIM_HORIZON,
+                target=self.job_stats_function,
+            )
+
+            self.__job_stats_table.grant_read_write_data(
+                self.job_stats_function)
+            self.__skip_function_checks(
+                self.job_stats_function,
+                dead_letter_queue_comment=("This function is invoked "
+                                           "by an event source mapping "
+                                           "and synchronously"),
+            )
+            self.jobs_table.grant_stream_read(self.job_stats_function)
+
+        for function in __event_processing_functions:
+            self.__skip_function_checks(function)
+
+        self.__skip_function_checks(
+            self.__job_archival_function,
+            dead_letter_queue_comment=("This function is invoked "
+                                       "by an event source mapping"),
+        )
+        self.__jobs_archive_bucket.grant_put(self.__job_archival_function)
+        self.__jobs_archive_bucket.grant_read_write(
+            self.__jobs_archive_delivery_stream_role)
+        self.__jobs_archive_bucket.node.default_child.add_metadata(
             "checkov",
             {
                 "skip": [
                     {
-                        "comment": ("This function uses "
-                                    "Lambda Destinations"),
-                        "id": "CKV_AWS_116",
+                        "comment": ("Access logging "
+                                    "is not required"),
+                        "id": "CKV_AWS_18",
                     },
                     {
-                        "comment": ("This function is not meant "
-                                    "to be run inside a VPC"),
-                        "id": "CKV_AWS_117",
+                        "comment": ("Archived jobs are "
+                                    "written only once"),
+                        "id": "CKV_AWS_21",
                     },
                     {
                         "comment": ("A customer managed key "
                                     "is not required"),
-                        "id": "CKV_AWS_173",
+                        "id": "CKV_AWS_145",
                     },
                 ],
             },
         )
-        self.__failed_jobs_event_bus.archive(
-            "FailedJobsEventArchive",
-            description="Failed Jobs Event Archive",
-            event_pattern=EventPattern(),
+        self.__jobs_archive_delivery_stream.node.add_dependency(
+            self.__jobs_archive_delivery_stream_role)
+        self.__jobs_archive_delivery_stream_role.add_to_policy(
+            PolicyStatement(
+                actions=[
+                    "glue:GetTable",
+                    "glue:GetTableVersion",
+                    "glue:GetTableVersions",
+                ],
+                resources=[
+                    Stack.of(self).format_arn(
+                        resource="catalog",
+                        service="glue",
+                    ),
+                    Stack.of(self).format_arn(
+                        resource="database",
+                        resource_name=self.__jobs_archive_database.ref,
+                        service="glue",
+                    ),
+                    Stack.of(self).format_arn(
+                        resource="table",
+                        resource_name=(f"{self.__jobs_archive_database.ref}/"
+                                       f"{self.__jobs_archive_table.ref}"),
+                        service="glue",
+                    ),
+                ],
+            ),
+        )
+        self.__job_archival_function.add_to_role_policy(
+            PolicyStatement(
+                actions=[
+                    "firehose:PutRecordBatch",
+                ],
+                resources=[
+                    self.__jobs_archive_delivery_stream.attr_arn,
+                ],
+            ),
+        )
+        self.__skip_function_checks(
+            self.job_lookup_function,
+            dead_letter_queue_comment=("This function is invoked "
+                                       "synchronously"),
+        )
+        self.__skip_function_checks(
+            self.job_submission_function,
+            dead_letter_queue_comment=("This function is invoked "
+                                       "synchronously"),
+        )
+
+        for function in __event_processing_functions:
+            self.__results_bucket.grant_put(function)
+
+        self.__results_bucket.grant_read(self.__job_archival_function)
+        self.__results_bucket.grant_read(self.job_lookup_function)
+        self.__results_bucket.node.default_child.add_metadata(
+            "checkov",
+            {
+                "skip": [
+                    {
+                        "comment": ("Access logging "
+                                    "is not required"),
+                        "id": "CKV_AWS_18",
+                    },
+                    {
+                        "comment": ("Job results are "
+                                    "written only once"),
+                        "id": "CKV_AWS_21",
+                    },
+                    {
+                        "comment": ("A customer managed key "
+                                    "is not required"),
+                        "id": "CKV_AWS_145",
+                    },
+                ],
+            },
+        )
+        self.__event_processing_function_policy = Policy(
+            self,
+            "EventProcessingFunctionPolicy",
+            statements=[
+                PolicyStatement(
+                    actions=[
+                        "lambda:InvokeFunction",
+                    ],
+                    resources=[
+                        function.function_arn
+                        for function in __event_processing_functions
+                    ],
+                ),
+            ],
+        )
+
+        for function in __event_processing_functions:
+            function.grant_invoke(self.job_submission_function)
+            self.__event_processing_function_policy.attach_to_role(
+                function.role)
+            self.jobs_table.grant_read_write_data(function)
+
+        self.jobs_table.grant_read_write_data(self.__error_handling_function)
+        self.jobs_table.grant_read_data(self.job_lookup_function)
+        self.jobs_table.grant_stream_read(self.__job_archival_function)
+        self.jobs_table.grant_read_write_data(self.job_submission_function)
+
+    def __failed_jobs_event_pattern(self) -> EventPattern:
+        return EventPattern(
+            detail={
+                "$or": [
+                    {
+                        "requestPayload": {
+                            "requestContext": {
+                                "functionArn": [
+                                    {
+                                        "exists": True,
+                                    },
+                                ],
+                            },
+                        },
+                        "responsePayload": {
+                            "status": [
+                                "Failure",
+                                "TimedOut",
+                            ],
+                        },
+                    },
+                    {
+                        "requestPayload": {
+                            "id": [
+                                {
+                                    "exists": True,
+                                },
+                            ],
+                        },
+                        "responsePayload": {
+                            "status": [
+                                "Failure",
+                            ],
+                        },
+                    },
+                ],
+            },
+            detail_type=[
+                "Lambda Function Invocation Result - Success",
+            ],
+        )
+
+    def __function_layers(
+        self,
+        architecture: Architecture,
+    ) -> List[LayerVersion]:
+        __x86_64 = architecture.name == Architecture.X86_64.name
+
+        if architecture.name not in self.__powertools_layers:
+            __platform = "" if __x86_64 else (
+                "--implementation cp "
+                "--only-binary=:all: "
+                "--platform manylinux2014_aarch64 "
+                "--python-version 3.9 ")
+
+            self.__powertools_layers[architecture.name] = LayerVersion(
+                self,
+                "PowertoolsLayer" if __x86_64 else "PowertoolsLayerArm64",
+                code=Code.from_asset(
+                    str(
+                        Path(__file__).
+                        parent.
+                        parent.
+                        parent.
+                        joinpath("powertools").
+                        resolve()
+                    ),
+                    bundling=BundlingOptions(
+                        command=[
+                            "bash",
+                            "-c",
+                            ("mkdir /asset-output/python && "
+                             "pip install "
+                             f"{__platform}"
+                             "--requirement /asset-input/requirements.txt "
+                             "--target /asset-output/python"),
+                        ],
+                        image=Runtime.PYTHON_3_9.bundling_image,
+                    ),
+                ),
+                compatible_architectures=[
+                    architecture,
+                ],
+                compatible_runtimes=[
+                    Runtime.PYTHON_3_9,
+                ],
+                description="AWS Lambda Powertools for Python",
+                license="MIT-0",
+            )
+
+        return [
+            self.__job_items_layer,
+            self.__powertools_layers[architecture.name],
+        ]
+
+    def __function_code(self, directory: str) -> Code:
+        return Code.from_asset(
+            str(
+                Path(__file__).
+                parent.
+                parent.
+                parent.
+                joinpath(directory).
+                resolve()
+            ),
+            bundling=BundlingOptions(
+                command=[
+                    "bash",
+                    "-c",
+                    ("cp /asset-input/main.py "
+                     "--target /asset-output "
+                     "--update"),
+                ],
+                image=Runtime.PYTHON_3_9.bundling_image,
+            ),
         )
-        self.event_processing_function.node.default_child.add_metadata(
+
+    def __function_settings(self, settings: dict) -> dict:
+        return {
+            "architecture": settings["architecture"],
+            "ephemeral_storage_size": Size.mebibytes(
+                settings["ephemeral_storage_size"]),
+            "layers": self.__function_layers(settings["architecture"]),
+            "memory_size": settings["memory_size"],
+            "timeout": Duration.seconds(settings["timeout"]),
+        }
+
+    def __skip_function_checks(
+        self,
+        function: Function,
+        dead_letter_queue_comment: str = ("This function uses "
+                                          "Lambda Destinations"),
+    ) -> None:
+        function.node.default_child.add_metadata(
             "checkov",
             {
                 "skip": [
                     {
-                        "comment": ("This function uses "
-                                    "Lambda Destinations"),
+                        "comment": dead_letter_queue_comment,
                         "id": "CKV_AWS_116",
                     },
                     {
@@ -235,5 +1342,3 @@ class EventProcessingConstruct(Construct):
                 ],
             },
         )
-        self.jobs_table.grant_read_write_data(self.__error_handling_function)
-        self.jobs_table.grant_read_write_data(self.event_processing_function)
@@ -6,24 +6,25 @@ from aws_cdk import (
 )
 from aws_cdk.aws_apigateway import (
     AuthorizationType,
-    AwsIntegration,
     EndpointType,
-    IntegrationOptions,
     IntegrationResponse,
     JsonSchema,
     JsonSchemaType,
     JsonSchemaVersion,
     LambdaIntegration,
     LogGroupLogDestination,
+    Method,
+    MethodDeploymentOptions,
     MethodResponse,
     Model,
     PassthroughBehavior,
-    RequestValidatorOptions,
+    Period,
+    QuotaSettings,
+    ResponseType,
     RestApi,
     StageOptions,
-)
-from aws_cdk.aws_dynamodb import (
-    Table,
+    ThrottleSettings,
+    UsagePlanPerApiStage,
 )
 from aws_cdk.aws_iam import (
     AccountPrincipal,
@@ -49,6 +50,18 @@ from constructs import (
 from json import (
     dumps,
 )
+from typing import (
+    List,
+    Optional,
+)
+
+JOBS_API_METHODS = [
+    "job_id",
+    "jobs",
+    "jobs_batch",
+    "jobs_lookup",
+    "jobs_stats",
+]
 
 
 class JobsApiConstruct(Construct):
@@ -56,10 +69,21 @@ class JobsApiConstruct(Construct):
         self,
         scope: Construct,
         construct_id: str,
+        api_key_required_methods: Optional[List[str]] = None,
+        cache_enabled: bool = False,
+        cache_size: str = "0.5",
+        cache_ttl: int = 300,
+        job_types: Optional[List[str]] = None,
+        max_batch_size: int = 100,
         pending_window: int = 7,
+        priorities: Optional[List[str]] = None,
+        quota_retry_after: int = 3600,
         removal_policy: RemovalPolicy = RemovalPolicy.DESTROY,
         retetion: RetentionDays = RetentionDays.ONE_MONTH,
+        retry_after: int = 5,
         stage_name: str = "dev",
+        throttle_retry_after: int = 1,
+        usage_plans: Optional[List[dict]] = None,
     ) -> None:
         super().__init__(
             scope,
@@ -84,6 +108,18 @@ class JobsApiConstruct(Construct):
             __jobs_api_access_log_group_name,
             retention=retetion,
         )
+
+        if api_key_required_methods and not usage_plans:
+            raise ValueError(
+                "API keys can't be required without usage plans")
+
+        for method in api_key_required_methods or list():
+            if method not in JOBS_API_METHODS:
+                raise ValueError(f"{method} is not a valid jobs API method")
+
+        self.__api_key_required_methods = api_key_required_methods or list()
+        self.__cache_enabled = cache_enabled
+        self.__retry_after = retry_after
         self.__jobs_api = RestApi(
             self,
             "JobsAPI",
@@ -92,6 +128,15 @@ class JobsApiConstruct(Construct):
                 access_log_destination=LogGroupLogDestination(
                     self.__jobs_api_access_log_group,
                 ),
+                cache_cluster_enabled=cache_enabled,
+                cache_cluster_size=cache_size if cache_enabled else None,
+                method_options={
+                    "/jobs/{jobId}/GET": MethodDeploymentOptions(
+                        cache_data_encrypted=True,
+                        cache_ttl=Duration.seconds(cache_ttl),
+                        caching_enabled=True,
+                    ),
+                } if cache_enabled else None,
                 stage_name=stage_name,
                 tracing_enabled=True,
             ),
@@ -99,10 +144,111 @@ class JobsApiConstruct(Construct):
                 EndpointType.REGIONAL,
             ],
         )
+        self.__body_request_validator = self.__jobs_api.add_request_validator(
+            "BodyRequestValidator",
+            validate_request_body=True,
+            validate_request_parameters=False,
+        )
+        self.__parameters_request_validator = \
+            self.__jobs_api.add_request_validator(
+                "ParametersRequestValidator",
+                validate_request_body=False,
+                validate_request_parameters=True,
+            )
         self.__jobs_api_invoke_role_policy = Policy(
             self,
             "JobsAPIInvokeRolePolicy",
         )
+        self.__jobs_api.add_gateway_response(
+            "QuotaExceededResponse",
+            response_headers={
+                "Retry-After": f"'{quota_retry_after}'",
+            },
+            status_code="429",
+            type=ResponseType.QUOTA_EXCEEDED,
+        )
+        self.__jobs_api.add_gateway_response(
+            "ThrottledResponse",
+            response_headers={
+                "Retry-After": f"'{throttle_retry_after}'",
+            },
+            status_code="429",
+            type=ResponseType.THROTTLED,
+        )
+        self.__usage_plans = list()
+
+        for usage_plan in usage_plans or list():
+            __name = usage_plan["name"]
+            __usage_plan = self.__jobs_api.add_usage_plan(
+                f"{__name}UsagePlan",
+                api_stages=[
+                    UsagePlanPerApiStage(
+                        api=self.__jobs_api,
+                        stage=self.__jobs_api.deployment_stage,
+                    ),
+                ],
+                description=f"{__name} Usage Plan",
+                name=__name,
+                quota=QuotaSettings(
+                    limit=usage_plan["quota_limit"],
+                    period=Period[usage_plan.get("quota_period", "DAY")],
+                ) if "quota_limit" in usage_plan else None,
+                throttle=ThrottleSettings(
+                    burst_limit=usage_plan.get("burst_limit"),
+                    rate_limit=usage_plan.get("rate_limit"),
+                ),
+            )
+
+            for api_key_name in usage_plan.get("api_keys", list()):
+                __usage_plan.add_api_key(
+                    self.__jobs_api.add_api_key(
+                        f"{__name}{api_key_name}ApiKey",
+                        api_key_name=api_key_name,
+                    ),
+                )
+
+            self.__usage_plans.append((__usage_plan, usage_plan))
+        __jobs_parameters_properties = {
+            "seconds": JsonSchema(
+                minimum=1,
+                type=JsonSchemaType.INTEGER,
+            ),
+            **({
+                "priority": JsonSchema(
+                    enum=priorities,
+                    type=JsonSchemaType.STRING,
+                ),
+            } if priorities else dict()),
+            **({
+                "type": JsonSchema(
+                    enum=job_types,
+                    type=JsonSchemaType.STRING,
+                ),
+            } if job_types else dict()),
+        }
+        self.__jobs_batch_request_model = Model(
+            self,
+            "JobsBatchRequestModel",
+            content_type="application/json",
+            description="Model for requests to /jobs/batch",
+            model_name="JobsBatchRequest",
+            rest_api=self.__jobs_api,
+            schema=JsonSchema(
+                items=JsonSchema(
+                    additional_properties=False,
+                    properties=__jobs_parameters_properties,
+                    required=[
+                        "seconds",
+                    ],
+                    type=JsonSchemaType.OBJECT,
+                ),
+                max_items=max_batch_size,
+                min_items=1,
+                schema=JsonSchemaVersion.DRAFT4,
+                title="Jobs Batch Request Schema",
+                type=JsonSchemaType.ARRAY,
+            ),
+        )
         self.__jobs_request_model = Model(
             self,
             "JobsRequestModel",
@@ -111,18 +257,19 @@ class JobsApiConstruct(Construct):
             model_name="JobsRequest",
             rest_api=self.__jobs_api,
             schema=JsonSchema(
-                properties={
-                    "seconds": JsonSchema(
-                        minimum=1,
-                        type=JsonSchemaType.INTEGER,
-                    ),
-                },
+                additional_properties=False,
+                properties=__jobs_parameters_properties,
+                required=[
+                    "seconds",
+                ],
                 schema=JsonSchemaVersion.DRAFT4,
                 title="Jobs Request Schema",
                 type=JsonSchemaType.OBJECT,
             ),
         )
         self.__jobs_resource = self.__jobs_api.root.add_resource("jobs")
+        self.__jobs_batch_resource = self.__jobs_resource.add_resource(
+            "batch")
         self.__job_id_resource = self.__jobs_resource.add_resource("{jobId}")
         self.__passthrough_behavior = PassthroughBehavior.WHEN_NO_TEMPLATES
         self.jobs_api_execution_role = Role(
@@ -136,68 +283,55 @@ class JobsApiConstruct(Construct):
             assumed_by=AccountPrincipal(Stack.of(self).account),
         )
 
-        self.__jobs_api.deployment_stage.node.default_child.add_metadata(
-            "checkov",
-            {
-                "skip": [
-                    {
-                        "comment": ("API Gateway caching "
-                                    "is not required"),
-                        "id": "CKV_AWS_120",
-                    },
-                ],
-            },
-        )
+        if not cache_enabled:
+            self.__jobs_api.deployment_stage.node.default_child.add_metadata(
+                "checkov",
+                {
+                    "skip": [
+                        {
+                            "comment": ("API Gateway caching "
+                                        "is not required"),
+                            "id": "CKV_AWS_120",
+                        },
+                    ],
+                },
+            )
+
         self.__jobs_api_invoke_role_policy.attach_to_role(
             self.jobs_api_invoke_role,
         )
 
     def add_job_id_method(
         self,
-        jobs_table: Table,
+        job_lookup_function: IFunction,
     ) -> None:
         __job_id_method = self.__job_id_resource.add_method(
             "GET",
+            api_key_required="job_id" in self.__api_key_required_methods,
             authorization_type=AuthorizationType.IAM,
-            integration=AwsIntegration(
-                action="GetItem",
-                options=IntegrationOptions(
-                    credentials_role=self.jobs_api_execution_role,
-                    passthrough_behavior=self.__passthrough_behavior,
-                    integration_responses=[
-                        IntegrationResponse(
-                            response_templates={
-                                "application/json": "\n".join([
-                                    ("#set($inputRoot = "
-                                     "$input.path('$').Item)"),
-                                    "{",
-                                    "  #if($inputRoot.parameters != $null)",
-                                    ("  \"parameters\": "
-                                     "$inputRoot.parameters.S,"),
-                                    "  #end",
-                                    "  #if($inputRoot.results != $null)",
-                                    ("  \"results\": "
-                                     "$inputRoot.results.S,"),
-                                    "  #end",
-                                    ("  \"status\": "
-                                     "\"$inputRoot.status.S\""),
-                                    "}",
-                                ]),
-                            },
-                            status_code="200",
-                        ),
-                    ],
-                    request_templates={
-                        "application/json": dumps({
-                            "Key": {
-                                "id": {
-                                    "S": "$input.params('jobId')",
-                                },
-                            },
-                            "TableName": jobs_table.table_name,
-                        }),
+            integration=LambdaIntegration(
+                cache_key_parameters=[
+                    "method.request.path.jobId",
+                    "method.request.querystring.view",
+                ] if self.__cache_enabled else None,
+                handler=job_lookup_function,
+                integration_responses=self.__function_integration_responses(
+                    retry_after=self.__retry_after
+                    if self.__cache_enabled
+                    else None,
+                ),
+                passthrough_behavior=self.__passthrough_behavior,
+                proxy=False,
+                request_templates={
+                    "application/json": dumps({
+                        "id": ("$util.escapeJavaScript("
+                               "$input.params('jobId'))"),
+                        "view": ("$util.escapeJavaScript("
+                                 "$input.params('view'))"),
+                        "wait": ("$util.escapeJavaScript("
+                                 "$input.params('wait'))"),
                     }),
-                service="dynamodb",
+                }
             ),
             method_responses=[
                 MethodResponse(
@@ -206,12 +340,28 @@ class JobsApiConstruct(Construct):
                     },
                     response_parameters={
                         "method.response.header.Content-Type": True,
+                        **({
+                            "method.response.header.Retry-After": True,
+                        } if status_code == "202" else dict()),
                     },
-                    status_code="200",
-                ),
+                    status_code=status_code,
+                )
+                for status_code in [
+                    "200",
+                    *(["202"] if self.__cache_enabled else list()),
+                    "400",
+                    "404",
+                    "500",
+                ]
             ],
+            request_parameters={
+                "method.request.path.jobId": True,
+                "method.request.querystring.view": False,
+                "method.request.querystring.wait": False,
+            },
         )
 
+        self.__add_method_throttles(__job_id_method, "job_id")
         self.__jobs_api_access_log_key.grant_encrypt_decrypt(
             ServicePrincipal(
                 "logs.amazonaws.com",
@@ -244,56 +394,107 @@ class JobsApiConstruct(Construct):
 
     def add_jobs_method(
         self,
-        event_processing_function: IFunction,
+        job_submission_function: IFunction,
     ) -> None:
         __jobs_method = self.__jobs_resource.add_method(
             "POST",
+            api_key_required="jobs" in self.__api_key_required_methods,
             authorization_type=AuthorizationType.IAM,
             integration=LambdaIntegration(
-                handler=event_processing_function,
-                integration_responses=[
-                    IntegrationResponse(
-                        response_templates={
-                            "application/json": dumps({
-                                "id": "$context.requestId",
-                            }),
-                        },
-                        status_code="200",
-                    )
-                ],
+                handler=job_submission_function,
+                integration_responses=self.__function_integration_responses(
+                    conflict_retry_after=self.__retry_after,
+                    response_template=dumps({
+                        "id": "$input.path('$.ids[0]')",
+                    }),
+                ),
                 passthrough_behavior=self.__passthrough_behavior,
                 proxy=False,
-                request_parameters={
-                    ("integration.request.header."
-                     "X-Amz-Invocation-Type"): "'Event'",
-                },
                 request_templates={
-                    "application/json": "\n".join([
-                        "{",
-                        "  \"id\": \"$context.requestId\",",
-                        "  \"parameters\": $input.body",
-                        "}",
-                    ])
+                    "application/json": self.__jobs_request_template(
+                        jobs="[$input.body]",
+                    ),
                 }
             ),
+            request_parameters={
+                "method.request.header.Idempotency-Key": False,
+            },
             request_models={
                 "application/json": self.__jobs_request_model,
             },
-            request_validator_options=RequestValidatorOptions(
-                validate_request_body=True,
-                validate_request_parameters=False,
+            request_validator=self.__body_request_validator,
+        )
+
+        self.__add_method_throttles(__jobs_method, "jobs")
+
+        for status_code in ["200", "400", "409", "500"]:
+            __jobs_method.add_method_response(
+                response_models={
+                    "application/json": Model.EMPTY_MODEL,
+                },
+                response_parameters={
+                    "method.response.header.Content-Type": True,
+                    **({
+                        "method.response.header.Retry-After": True,
+                    } if status_code == "409" else dict()),
+                },
+                status_code=status_code,
+            )
+        self.__jobs_api_invoke_role_policy.add_statements(
+            PolicyStatement(
+                actions=[
+                    "execute-api:Invoke",
+                ],
+                effect=Effect.ALLOW,
+                resources=[
+                    __jobs_method.method_arn,
+                ],
             ),
         )
 
-        __jobs_method.add_method_response(
-            response_models={
-                "application/json": Model.EMPTY_MODEL,
+    def add_jobs_batch_method(
+        self,
+        job_submission_function: IFunction,
+    ) -> None:
+        __jobs_batch_method = self.__jobs_batch_resource.add_method(
+            "POST",
+            api_key_required="jobs_batch" in self.__api_key_required_methods,
+            authorization_type=AuthorizationType.IAM,
+            integration=LambdaIntegration(
+                handler=job_submission_function,
+                integration_responses=self.__function_integration_responses(
+                    conflict_retry_after=self.__retry_after,
+                ),
+                passthrough_behavior=self.__passthrough_behavior,
+                proxy=False,
+                request_templates={
+                    "application/json": self.__jobs_request_template(
+                        jobs="$input.body",
+                    ),
+                }
+            ),
+            request_models={
+                "application/json": self.__jobs_batch_request_model,
             },
-            response_parameters={
-                "method.response.header.Content-Type": True,
+            request_parameters={
+                "method.request.header.Idempotency-Key": False,
             },
-            status_code="200",
+            request_validator=self.__body_request_validator,
         )
+
+        for status_code in ["200", "400", "409", "500"]:
+            __jobs_batch_method.add_method_response(
+                response_models={
+                    "application/json": Model.EMPTY_MODEL,
+                },
+                response_parameters={
+                    "method.response.header.Content-Type": True,
+                    **({
+                        "method.response.header.Retry-After": True,
+                    } if status_code == "409" else dict()),
+                },
+                status_code=status_code,
+            )
         self.__jobs_api_invoke_role_policy.add_statements(
             PolicyStatement(
                 actions=[
@@ -301,7 +502,224 @@ class JobsApiConstruct(Construct):
                 ],
                 effect=Effect.ALLOW,
                 resources=[
-                    __jobs_method.method_arn,
+                    __jobs_batch_method.method_arn,
+                ],
+            ),
+        )
+
+    def add_jobs_lookup_method(
+        self,
+        job_lookup_function: IFunction,
+    ) -> None:
+        __jobs_lookup_method = self.__jobs_resource.add_method(
+            "GET",
+            api_key_required="jobs_lookup" in self.__api_key_required_methods,
+            authorization_type=AuthorizationType.IAM,
+            integration=LambdaIntegration(
+                handler=job_lookup_function,
+                integration_responses=self.
+                __function_integration_responses(),
+                passthrough_behavior=self.__passthrough_behavior,
+                proxy=False,
+                request_templates={
+                    "application/json": dumps({
+                        parameter: ("$util.escapeJavaScript("
+                                    f"$input.params('{parameter}'))")
+                        for parameter in [
+                            "cursor",
+                            "ids",
+                            "limit",
+                            "since",
+                            "status",
+                        ]
+                    }),
+                }
+            ),
+            request_parameters={
+                "method.request.querystring.cursor": False,
+                "method.request.querystring.ids": False,
+                "method.request.querystring.limit": False,
+                "method.request.querystring.since": False,
+                "method.request.querystring.status": False,
+            },
+            request_validator=self.__parameters_request_validator,
+        )
+
+        for status_code in ["200", "400", "500"]:
+            __jobs_lookup_method.add_method_response(
+                response_models={
+                    "application/json": Model.EMPTY_MODEL,
+                },
+                response_parameters={
+                    "method.response.header.Content-Type": True,
+                },
+                status_code=status_code,
+            )
+        self.__jobs_api_invoke_role_policy.add_statements(
+            PolicyStatement(
+                actions=[
+                    "execute-api:Invoke",
+                ],
+                effect=Effect.ALLOW,
+                resources=[
+                    __jobs_lookup_method.method_arn,
+                ],
+            ),
+        )
+
+    def add_jobs_stats_method(
+        self,
+        job_stats_function: IFunction,
+    ) -> None:
+        __jobs_stats_method = self.__jobs_resource.add_resource(
+            "stats").add_method(
+            "GET",
+            api_key_required="jobs_stats" in self.__api_key_required_methods,
+            authorization_type=AuthorizationType.IAM,
+            integration=LambdaIntegration(
+                handler=job_stats_function,
+                integration_responses=self.
+                __function_integration_responses(),
+                passthrough_behavior=self.__passthrough_behavior,
+                proxy=False,
+                request_templates={
+                    "application/json": dumps({
+                        parameter: ("$util.escapeJavaScript("
+                                    f"$input.params('{parameter}'))")
+                        for parameter in [
+                            "since",
+                            "until",
+                        ]
+                    }),
+                }
+            ),
+            request_parameters={
+                "method.request.querystring.since": False,
+                "method.request.querystring.until": False,
+            },
+            request_validator=self.__parameters_request_validator,
+        )
+
+        for status_code in ["200", "400", "500"]:
+            __jobs_stats_method.add_method_response(
+                response_models={
+                    "application/json": Model.EMPTY_MODEL,
+                },
+                response_parameters={
+                    "method.response.header.Content-Type": True,
+                },
+                status_code=status_code,
+            )
+        self.__jobs_api_invoke_role_policy.add_statements(
+            PolicyStatement(
+                actions=[
+                    "execute-api:Invoke",
+                ],
+                effect=Effect.ALLOW,
+                resources=[
+                    __jobs_stats_method.method_arn,
                 ],
             ),
         )
+
+    def __add_method_throttles(self, method: Method, prefix: str) -> None:
+        for __usage_plan, usage_plan in self.__usage_plans:
+            __throttle = {
+                name: usage_plan[f"{prefix}_{key}"]
+                for name, key in [
+                    ("BurstLimit", "burst_limit"),
+                    ("RateLimit", "rate_limit"),
+                ]
+                if f"{prefix}_{key}" in usage_plan
+            }
+
+            if __throttle:
+                __usage_plan.node.default_child.add_property_override(
+                    (f"ApiStages.0.Throttle."
+                     f"{method.resource.path}/{method.http_method}"),
+                    __throttle,
+                )
+
+    def __function_integration_responses(
+        self,
+        conflict_retry_after: Optional[int] = None,
+        response_template: Optional[str] = None,
+        retry_after: Optional[int] = None,
+    ) -> List[IntegrationResponse]:
+        __error_response_template = "\n".join([
+            "{",
+            ("  \"message\": "
+             "\"$util.escapeJavaScript("
+             "$input.path('$.errorMessage'))\""),
+            "}",
+        ])
+        __not_ready_responses = list() if retry_after is None else [
+            IntegrationResponse(
+                response_parameters={
+                    "method.response.header.Retry-After": f"'{retry_after}'",
+                },
+                response_templates={
+                    "application/json": ("$input.path('$.errorMessage')."
+                                         "substring(11)"),
+                },
+                selection_pattern="Not Ready: .*",
+                status_code="202",
+            ),
+        ]
+        __conflict_responses = list() if conflict_retry_after is None else [
+            IntegrationResponse(
+                response_parameters={
+                    "method.response.header.Retry-After": (
+                        f"'{conflict_retry_after}'"),
+                },
+                response_templates={
+                    "application/json": __error_response_template,
+                },
+                selection_pattern="Conflict: .*",
+                status_code="409",
+            ),
+        ]
+
+        return __not_ready_responses + __conflict_responses + [
+            IntegrationResponse(
+                response_templates=None if response_template is None else {
+                    "application/json": response_template,
+                },
+                status_code="200",
+            ),
+            IntegrationResponse(
+                response_templates={
+                    "application/json": __error_response_template,
+                },
+                selection_pattern="Bad Request: .*",
+                status_code="400",
+            ),
+            IntegrationResponse(
+                response_templates={
+                    "application/json": __error_response_template,
+                },
+                selection_pattern="Not Found: .*",
+                status_code="404",
+            ),
+            IntegrationResponse(
+                response_templates={
+                    "application/json": dumps({
+                        "message": "Internal server error",
+                    }),
+                },
+                selection_pattern=("(?!Bad Request: |Conflict: "
+                                   "|Not Found: |Not Ready: ).+"),
+                status_code="500",
+            ),
+        ]
+
+    def __jobs_request_template(self, jobs: str) -> str:
+        return "\n".join([
+            "{",
+            "  \"caller\": \"$context.identity.caller\",",
+            ("  \"idempotency_key\": "
+             "\"$util.escapeJavaScript("
+             "$input.params('Idempotency-Key'))\","),
+            f"  \"jobs\": {jobs}",
+            "}",
+        ])
@@ -3,6 +3,9 @@ from aws_cdk import (
     RemovalPolicy,
     Stack,
 )
+from aws_cdk.aws_dynamodb import (
+    BillingMode,
+)
 from aws_cdk.aws_logs import (
     RetentionDays,
 )
@@ -15,6 +18,11 @@ from infrastructure.event_processing.main import (
 from infrastructure.jobs_api.main import (
     JobsApiConstruct,
 )
+from typing import (
+    Dict,
+    List,
+    Optional,
+)
 
 
 class InfrastructureStack(Stack):
@@ -22,16 +30,59 @@ class InfrastructureStack(Stack):
         self,
         scope: Construct,
         construct_id: str,
-        error_handling_timeout: int = 5,
-        event_processing_timeout: int = 300,
+        account_concurrency_limit: int = 1000,
+        api_cache_enabled: bool = False,
+        api_cache_size: str = "0.5",
+        api_cache_ttl: int = 300,
+        api_key_required_methods: Optional[List[str]] = None,
+        api_quota_retry_after: int = 3600,
+        api_retry_after: int = 5,
+        api_throttle_retry_after: int = 1,
+        api_usage_plans: Optional[List[dict]] = None,
+        archive_buffering_interval: int = 900,
+        archive_buffering_size: int = 64,
+        archive_transition: int = 90,
+        batch_size: int = 10,
+        billing_mode: BillingMode = BillingMode.PROVISIONED,
+        checkpoint_margin: int = 10,
+        event_processing_max_workers: int = 8,
+        function_settings: Optional[Dict[str, dict]] = None,
+        idempotency_window: int = 86400,
+        job_ttl: int = 2592000,
+        job_types: Optional[List[dict]] = None,
+        max_batch_size: int = 100,
+        max_batching_window: int = 0,
+        max_concurrency: int = 100,
         max_event_age: int = 21600,
+        max_read_capacity: int = 100,
+        max_wait: int = 25,
+        max_write_capacity: int = 100,
+        metrics_dimensions: Optional[Dict[str, str]] = None,
+        metrics_namespace: str = "AsynchronousEventProcessing",
+        pack_size: int = 1,
         pending_window: int = 7,
+        priority_lanes: Optional[List[dict]] = None,
+        queue_enabled: bool = False,
         read_capacity: int = 5,
         removal_policy: RemovalPolicy = RemovalPolicy.DESTROY,
+        replay_batch_size: int = 10,
+        replay_enabled: bool = False,
+        replay_max_concurrency: int = 2,
+        replay_rate: float = 10,
         reserved_concurrent_executions: int = 100,
+        results_cache_enabled: bool = False,
+        results_cache_policy: str = "lru",
+        results_cache_size: int = 128,
+        results_cache_ttl: int = 3600,
+        results_size_threshold: int = 4096,
+        results_url_expiration: int = 3600,
         retetion: RetentionDays = RetentionDays.ONE_MONTH,
         retry_attempts: int = 0,
+        stats_enabled: bool = False,
+        stats_ttl: int = 7776000,
         stage_name: str = "dev",
+        target_utilization: int = 70,
+        webhooks: Optional[List[dict]] = None,
         write_capacity: int = 5,
         **kwargs,
     ) -> None:
@@ -44,23 +95,75 @@ class InfrastructureStack(Stack):
         self.__event_processing = EventProcessingConstruct(
             self,
             "EventProcessing",
-            error_handling_timeout=error_handling_timeout,
-            event_processing_timeout=event_processing_timeout,
+            account_concurrency_limit=account_concurrency_limit,
+            api_cache_enabled=api_cache_enabled,
+            archive_buffering_interval=archive_buffering_interval,
+            archive_buffering_size=archive_buffering_size,
+            archive_transition=archive_transition,
+            batch_size=batch_size,
+            billing_mode=billing_mode,
+            checkpoint_margin=checkpoint_margin,
+            event_processing_max_workers=event_processing_max_workers,
+            function_settings=function_settings,
+            idempotency_window=idempotency_window,
+            job_ttl=job_ttl,
+            job_types=job_types,
+            max_batching_window=max_batching_window,
+            max_concurrency=max_concurrency,
             max_event_age=max_event_age,
+            max_read_capacity=max_read_capacity,
+            max_wait=max_wait,
+            max_write_capacity=max_write_capacity,
+            metrics_dimensions=metrics_dimensions,
+            metrics_namespace=metrics_namespace,
+            pack_size=pack_size,
             pending_window=pending_window,
+            priority_lanes=priority_lanes,
+            queue_enabled=queue_enabled,
             read_capacity=read_capacity,
             removal_policy=removal_policy,
+            replay_batch_size=replay_batch_size,
+            replay_enabled=replay_enabled,
+            replay_max_concurrency=replay_max_concurrency,
+            replay_rate=replay_rate,
             reserved_concurrent_executions=reserved_concurrent_executions,
+            results_cache_enabled=results_cache_enabled,
+            results_cache_policy=results_cache_policy,
+            results_cache_size=results_cache_size,
+            results_cache_ttl=results_cache_ttl,
+            results_size_threshold=results_size_threshold,
+            results_url_expiration=results_url_expiration,
             retry_attempts=retry_attempts,
+            stats_enabled=stats_enabled,
+            stats_ttl=stats_ttl,
+            target_utilization=target_utilization,
+            webhooks=webhooks,
             write_capacity=write_capacity,
         )
         self.__jobs_api = JobsApiConstruct(
             self,
             "JobsApi",
+            api_key_required_methods=api_key_required_methods,
+            cache_enabled=api_cache_enabled,
+            cache_size=api_cache_size,
+            cache_ttl=api_cache_ttl,
+            job_types=[
+                job_type["name"]
+                for job_type in job_types or list()
+            ],
+            max_batch_size=max_batch_size,
             pending_window=pending_window,
+            priorities=[
+                priority_lane["name"]
+                for priority_lane in priority_lanes or list()
+            ],
+            quota_retry_after=api_quota_retry_after,
             removal_policy=removal_policy,
             retetion=retetion,
+            retry_after=api_retry_after,
             stage_name=stage_name,
+            throttle_retry_after=api_throttle_retry_after,
+            usage_plans=api_usage_plans,
         )
 
         CfnOutput(
@@ -68,14 +171,58 @@ class InfrastructureStack(Stack):
             "JobsAPIInvokeRole",
             value=self.__jobs_api.jobs_api_invoke_role.role_arn,
         )
-        self.__event_processing.jobs_table.grant_read_data(
-            self.__jobs_api.jobs_api_execution_role)
+
+        if replay_enabled:
+            CfnOutput(
+                self,
+                "FailedJobsArchive",
+                value=self.
+                __event_processing.
+                failed_jobs_archive.
+                archive_arn,
+            )
+            CfnOutput(
+                self,
+                "JobsEventBus",
+                value=self.
+                __event_processing.
+                jobs_event_bus.
+                event_bus_arn,
+            )
+            CfnOutput(
+                self,
+                "JobReplayRule",
+                value=self.__event_processing.job_replay_rule.rule_arn,
+            )
+            CfnOutput(
+                self,
+                "JobsTable",
+                value=self.__event_processing.jobs_table.table_name,
+            )
+
         self.__jobs_api.add_job_id_method(
-            jobs_table=self.__event_processing.jobs_table)
+            job_lookup_function=self.
+            __event_processing.
+            job_lookup_function)
         self.__jobs_api.add_jobs_method(
-            event_processing_function=self.
+            job_submission_function=self.
             __event_processing.
-            event_processing_function)
+            job_submission_function)
+        self.__jobs_api.add_jobs_lookup_method(
+            job_lookup_function=self.
+            __event_processing.
+            job_lookup_function)
+        self.__jobs_api.add_jobs_batch_method(
+            job_submission_function=self.
+            __event_processing.
+            job_submission_function)
+
+        if stats_enabled:
+            self.__jobs_api.add_jobs_stats_method(
+                job_stats_function=self.
+                __event_processing.
+                job_stats_function)
+
         self.add_metadata(
             "cfn-lint", {
                 "config": {
@@ -0,0 +1,118 @@
+from aws_lambda_powertools import (
+    Logger,
+)
+from aws_lambda_powertools.utilities.typing import (
+    LambdaContext,
+)
+from boto3 import (
+    client,
+)
+from job_items.main import (
+    decode_stream_item,
+)
+from json import (
+    dumps,
+)
+from os import (
+    getenv,
+)
+from time import (
+    sleep,
+)
+from typing import (
+    List,
+)
+
+ARCHIVE_BUCKET_NAME = getenv("ARCHIVE_BUCKET_NAME")
+DELIVERY_STREAM_NAME = getenv("DELIVERY_STREAM_NAME")
+MAX_ATTEMPTS = int(getenv("MAX_ATTEMPTS", "5"))
+PUT_RECORD_BATCH_SIZE = 500
+RESULTS_BUCKET_NAME = getenv("RESULTS_BUCKET_NAME")
+firehose = client("firehose")
+logger = Logger(
+    level=getenv("LOG_LEVEL", "INFO"),
+    service="job_archival",
+)
+s3 = client("s3")
+
+
+def archive_results(job: dict) -> dict:
+    results_location = job.get("resultsLocation")
+
+    if results_location is None or ARCHIVE_BUCKET_NAME is None:
+        return job
+
+    try:
+        s3.copy_object(
+            Bucket=ARCHIVE_BUCKET_NAME,
+            CopySource={
+                "Bucket": RESULTS_BUCKET_NAME,
+                "Key": results_location,
+            },
+            Key=results_location,
+        )
+    except s3.exceptions.NoSuchKey:
+        logger.warning(f"Results of job {job['id']} not found")
+
+        return job
+
+    return {
+        **job,
+        "resultsLocation": f"s3://{ARCHIVE_BUCKET_NAME}/{results_location}",
+    }
+
+
+def archive_record(job: dict) -> dict:
+    return {
+        "Data": (dumps({
+            "created_at": job.get("createdAt"),
+            "id": job["id"],
+            "parameters": dumps(job.get("parameters")),
+            "results": dumps(job.get("results")),
+            "results_location": job.get("resultsLocation"),
+            "status": job["status"],
+            "updated_at": job.get("updatedAt"),
+        }) + "\n").encode(),
+    }
+
+
+def put_records(records: List[dict]) -> None:
+    for start in range(0, len(records), PUT_RECORD_BATCH_SIZE):
+        batch = records[start:start + PUT_RECORD_BATCH_SIZE]
+
+        for attempt in range(MAX_ATTEMPTS):
+            response = firehose.put_record_batch(
+                DeliveryStreamName=DELIVERY_STREAM_NAME,
+                Records=batch,
+            )
+
+            if not response["FailedPutCount"]:
+                break
+
+            batch = [
+                record
+                for record, result in zip(batch, response["RequestResponses"])
+                if "ErrorCode" in result
+            ]
+
+            sleep(0.05 * 2 ** attempt)
+        else:
+            raise RuntimeError(
+                f"{len(batch)} records not archived "
+                f"after {MAX_ATTEMPTS} attempts")
+
+
+def handler(event: dict, context: LambdaContext) -> None:
+    logger.debug(event)
+
+    images = [
+        record["dynamodb"]["OldImage"]
+        for record in event["Records"]
+        if "OldImage" in record["dynamodb"]
+    ]
+
+    put_records([
+        archive_record(archive_results(decode_stream_item(image)))
+        for image in images
+        if "s" in image or "status" in image
+    ])
@@ -0,0 +1,159 @@
+from base64 import (
+    b64decode,
+)
+from json import (
+    dumps,
+    loads,
+)
+from time import (
+    time,
+)
+from typing import (
+    Optional,
+)
+from zlib import (
+    compress,
+    crc32,
+    decompress,
+)
+
+STATUS_ATTRIBUTES = {
+    "#id": "id",
+    "#s": "s",
+    "#status": "status",
+    "#u": "u",
+    "#v": "v",
+}
+STATUS_SHARDS = 16
+STATUSES = {
+    "Failure",
+    "Pending",
+    "Running",
+    "Success",
+    "TimedOut",
+}
+TERMINAL_STATUSES = {
+    "Failure",
+    "Success",
+    "TimedOut",
+}
+VERSION = 2
+
+
+def status_key(id: str, status: str) -> str:
+    return f"{status}#{crc32(id.encode()) % STATUS_SHARDS}"
+
+
+def encode_item(
+    id: str,
+    status: str,
+    checkpoint: Optional[int] = None,
+    created_at: Optional[int] = None,
+    parameters: Optional[dict] = None,
+    results: Optional[str] = None,
+    results_location: Optional[str] = None,
+    ttl: Optional[int] = None,
+) -> dict:
+    now = time()
+    item = {
+        "id": {
+            "S": id,
+        },
+        "s": {
+            "S": status,
+        },
+        "u": {
+            "N": str(int(now * 1000)),
+        },
+        "v": {
+            "N": str(VERSION),
+        },
+    }
+
+    if checkpoint is not None:
+        item["c"] = {
+            "N": str(checkpoint),
+        }
+
+    if created_at is not None:
+        item["g"] = {
+            "S": status_key(id, status),
+        }
+        item["t"] = {
+            "N": str(created_at),
+        }
+
+    if parameters is not None:
+        item["p"] = {
+            "B": compress(dumps(parameters, separators=(",", ":")).encode()),
+        }
+
+    if results is not None:
+        item["r"] = {
+            "B": compress(results.encode()),
+        }
+
+    if results_location is not None:
+        item["l"] = {
+            "S": results_location,
+        }
+
+    if ttl is not None:
+        item["ttl"] = {
+            "N": str(int(now) + ttl),
+        }
+
+    return item
+
+
+def decode_item(item: dict) -> dict:
+    if "v" not in item:
+        job = {
+            "id": item["id"]["S"],
+            "status": item["status"]["S"],
+        }
+
+        if "parameters" in item:
+            job["parameters"] = loads(item["parameters"]["S"])
+
+        if "results" in item:
+            job["results"] = loads(item["results"]["S"])
+
+        if "resultsLocation" in item:
+            job["resultsLocation"] = item["resultsLocation"]["S"]
+
+        return job
+
+    job = {
+        "id": item["id"]["S"],
+        "status": item["s"]["S"],
+    }
+
+    if "c" in item:
+        job["checkpoint"] = int(item["c"]["N"])
+
+    if "t" in item:
+        job["createdAt"] = int(item["t"]["N"])
+
+    if "p" in item:
+        job["parameters"] = loads(decompress(item["p"]["B"]))
+
+    if "r" in item:
+        job["results"] = loads(decompress(item["r"]["B"]))
+
+    if "l" in item:
+        job["resultsLocation"] = item["l"]["S"]
+
+    if "u" in item:
+        job["updatedAt"] = int(item["u"]["N"])
+
+    return job
+
+
+def decode_stream_item(image: dict) -> dict:
+    return decode_item({
+        name: {
+            "B": b64decode(value["B"]),
+        } if "B" in value else value
+        for name, value in image.items()
+    })
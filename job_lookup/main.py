@@ -0,0 +1,376 @@
+from aws_lambda_powertools import (
+    Logger,
+)
+from aws_lambda_powertools.utilities.typing import (
+    LambdaContext,
+)
+from base64 import (
+    urlsafe_b64decode,
+    urlsafe_b64encode,
+)
+from boto3 import (
+    client,
+)
+from botocore.config import (
+    Config,
+)
+from concurrent.futures import (
+    ThreadPoolExecutor,
+)
+from job_items.main import (
+    STATUS_ATTRIBUTES,
+    STATUS_SHARDS,
+    STATUSES,
+    TERMINAL_STATUSES,
+    decode_item,
+)
+from json import (
+    dumps,
+    loads,
+)
+from os import (
+    getenv,
+)
+from time import (
+    monotonic,
+    sleep,
+)
+from typing import (
+    Dict,
+    List,
+    Optional,
+)
+
+CACHE_ENABLED = getenv("CACHE_ENABLED", "false") == "true"
+MAX_ATTEMPTS = int(getenv("MAX_ATTEMPTS", "5"))
+MAX_IDS = 100
+MAX_JOBS = 100
+MAX_WAIT = int(getenv("MAX_WAIT", "25"))
+MAX_WAIT_DELAY = 2.0
+RESULTS_BUCKET_NAME = getenv("RESULTS_BUCKET_NAME")
+RESULTS_URL_EXPIRATION = int(getenv("RESULTS_URL_EXPIRATION", "3600"))
+STATUS_INDEX_NAME = getenv("STATUS_INDEX_NAME", "StatusIndex")
+TABLE_NAME = getenv("TABLE_NAME")
+WAIT_DELAY = 0.25
+dynamodb = client("dynamodb")
+s3 = client(
+    "s3",
+    config=Config(
+        signature_version="s3v4",
+    ),
+)
+logger = Logger(
+    level=getenv("LOG_LEVEL", "INFO"),
+    service="job_lookup",
+)
+
+
+def batch_get_items(ids: List[str]) -> Dict[str, dict]:
+    items = dict()
+    request_items = {
+        TABLE_NAME: {
+            "ExpressionAttributeNames": STATUS_ATTRIBUTES,
+            "Keys": [
+                {
+                    "id": {
+                        "S": id,
+                    },
+                }
+                for id in ids
+            ],
+            "ProjectionExpression": ", ".join(STATUS_ATTRIBUTES),
+        },
+    }
+
+    for attempt in range(MAX_ATTEMPTS):
+        response = dynamodb.batch_get_item(RequestItems=request_items)
+
+        for item in response["Responses"].get(TABLE_NAME, list()):
+            if is_job_item(item):
+                items[item["id"]["S"]] = item
+
+        request_items = response.get("UnprocessedKeys", dict())
+
+        if not request_items:
+            break
+
+        sleep(0.05 * 2 ** attempt)
+    else:
+        raise RuntimeError(
+            f"{len(request_items[TABLE_NAME]['Keys'])} keys not read "
+            f"after {MAX_ATTEMPTS} attempts")
+
+    return items
+
+
+def is_job_item(item: dict) -> bool:
+    return "s" in item or "status" in item
+
+
+def read_item(id: str, view: str) -> dict:
+    projection = dict() if view == "full" else {
+        "ExpressionAttributeNames": STATUS_ATTRIBUTES,
+        "ProjectionExpression": ", ".join(STATUS_ATTRIBUTES),
+    }
+    item = dynamodb.get_item(
+        Key={
+            "id": {
+                "S": id,
+            },
+        },
+        TableName=TABLE_NAME,
+        **projection,
+    ).get("Item")
+
+    if item is None or not is_job_item(item):
+        raise LookupError(f"Not Found: job {id} not found")
+
+    return decode_item(item)
+
+
+def get_item(id: str, view: str = "full", wait: int = 0) -> dict:
+    if view not in ["full", "status"]:
+        raise ValueError(f"Bad Request: {view} is not a valid view")
+
+    deadline = monotonic() + wait
+    delay = WAIT_DELAY
+    job = read_item(id, view)
+
+    while job["status"] not in TERMINAL_STATUSES:
+        remaining = deadline - monotonic()
+
+        if remaining <= 0:
+            break
+
+        sleep(min(delay, remaining))
+
+        delay = min(2 * delay, MAX_WAIT_DELAY)
+        job = read_item(id, view)
+
+    results_location = job.pop("resultsLocation", None)
+
+    if results_location is not None:
+        job["resultsUrl"] = s3.generate_presigned_url(
+            "get_object",
+            ExpiresIn=RESULTS_URL_EXPIRATION,
+            Params={
+                "Bucket": RESULTS_BUCKET_NAME,
+                "Key": results_location,
+            },
+        )
+
+    del job["id"]
+
+    if CACHE_ENABLED and job["status"] not in TERMINAL_STATUSES:
+        raise RuntimeError(f"Not Ready: {dumps(job)}")
+
+    return job
+
+
+def encode_cursor(status: str, since: int, positions: dict) -> str:
+    return urlsafe_b64encode(dumps({
+        "p": positions,
+        "s": status,
+        "t": since,
+    }, separators=(",", ":")).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> dict:
+    try:
+        decoded_cursor = loads(urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        decoded_cursor = None
+
+    if not isinstance(decoded_cursor, dict) or set(decoded_cursor) != {
+        "p",
+        "s",
+        "t",
+    }:
+        raise ValueError(f"Bad Request: {cursor} is not a valid cursor")
+
+    return decoded_cursor
+
+
+def query_shard(
+    status: str,
+    shard: str,
+    since: int,
+    limit: int,
+    position: Optional[list],
+) -> dict:
+    start_key = dict() if position is None else {
+        "ExclusiveStartKey": {
+            "g": {
+                "S": f"{status}#{shard}",
+            },
+            "id": {
+                "S": position[1],
+            },
+            "t": {
+                "N": str(position[0]),
+            },
+        },
+    }
+
+    return dynamodb.query(
+        ExpressionAttributeNames={
+            "#g": "g",
+            "#t": "t",
+        },
+        ExpressionAttributeValues={
+            ":g": {
+                "S": f"{status}#{shard}",
+            },
+            ":since": {
+                "N": str(since),
+            },
+        },
+        IndexName=STATUS_INDEX_NAME,
+        KeyConditionExpression="#g = :g AND #t >= :since",
+        Limit=limit,
+        TableName=TABLE_NAME,
+        **start_key,
+    )
+
+
+def query_items(
+    status: str,
+    since: int = 0,
+    limit: int = MAX_JOBS,
+    positions: Optional[dict] = None,
+) -> dict:
+    if positions is None:
+        positions = {
+            str(shard): None
+            for shard in range(STATUS_SHARDS)
+        }
+
+    shards = list(positions)
+
+    with ThreadPoolExecutor(max_workers=max(len(shards), 1)) as executor:
+        responses = dict(zip(shards, executor.map(
+            lambda shard: query_shard(
+                status,
+                shard,
+                since,
+                limit,
+                positions[shard],
+            ),
+            shards,
+        )))
+
+    items = sorted(
+        (
+            (int(item["t"]["N"]), item["id"]["S"], shard, item)
+            for shard, response in responses.items()
+            for item in response["Items"]
+        ),
+        key=lambda item: item[:2],
+    )[:limit]
+    next_positions = dict()
+
+    for shard, response in responses.items():
+        taken = [item for item in items if item[2] == shard]
+
+        if (len(taken) < len(response["Items"]) or
+                "LastEvaluatedKey" in response):
+            next_positions[shard] = (
+                list(taken[-1][:2]) if taken else positions[shard])
+
+    page = {
+        "jobs": [
+            decode_item(item)
+            for *_, item in items
+        ],
+    }
+
+    if next_positions:
+        page["cursor"] = encode_cursor(status, since, next_positions)
+
+    return page
+
+
+def list_items(event: dict) -> dict:
+    try:
+        limit = int(event.get("limit") or MAX_JOBS)
+    except ValueError:
+        raise ValueError(
+            f"Bad Request: {event['limit']} is not a valid limit")
+
+    if not 0 < limit <= MAX_JOBS:
+        raise ValueError(f"Bad Request: {limit} is not a valid limit")
+
+    if event.get("cursor"):
+        cursor = decode_cursor(event["cursor"])
+
+        return query_items(
+            cursor["s"],
+            cursor["t"],
+            limit,
+            cursor["p"],
+        )
+
+    status = event["status"]
+
+    if status not in STATUSES:
+        raise ValueError(f"Bad Request: {status} is not a valid status")
+
+    try:
+        since = int(event.get("since") or 0)
+    except ValueError:
+        raise ValueError(
+            f"Bad Request: {event['since']} is not a valid since")
+
+    return query_items(status, since, limit)
+
+
+def handler(event: dict, context: LambdaContext) -> dict:
+    logger.debug(event)
+
+    if "id" in event:
+        try:
+            wait = int(event.get("wait") or 0)
+        except ValueError:
+            raise ValueError(
+                f"Bad Request: {event['wait']} is not a valid wait")
+
+        if wait < 0:
+            raise ValueError(f"Bad Request: {wait} is not a valid wait")
+
+        return get_item(
+            event["id"],
+            event.get("view") or "full",
+            min(wait, MAX_WAIT),
+        )
+
+    if not event.get("ids") and (event.get("status") or
+                                 event.get("cursor")):
+        return list_items(event)
+
+    ids = list(dict.fromkeys(
+        id.strip()
+        for id in (event.get("ids") or "").split(",")
+        if id.strip()
+    ))
+
+    if not ids:
+        raise ValueError("Bad Request: no job identifiers")
+
+    if len(ids) > MAX_IDS:
+        raise ValueError(
+            f"Bad Request: {len(ids)} job identifiers major then {MAX_IDS}")
+
+    jobs = {
+        id: decode_item(item)
+        for id, item in batch_get_items(ids).items()
+    }
+
+    return {
+        "jobs": [
+            {
+                "id": id,
+                "status": jobs.get(id, dict()).get("status"),
+            }
+            for id in ids
+        ],
+    }
@@ -0,0 +1,202 @@
+from aws_lambda_powertools import (
+    Logger,
+    Tracer,
+)
+from aws_lambda_powertools.utilities.batch import (
+    BatchProcessor,
+    EventType,
+    batch_processor,
+)
+from aws_lambda_powertools.utilities.data_classes.sqs_event import (
+    SQSRecord,
+)
+from aws_lambda_powertools.utilities.typing import (
+    LambdaContext,
+)
+from boto3 import (
+    client,
+)
+from job_items.main import (
+    encode_item,
+)
+from json import (
+    dumps,
+    loads,
+)
+from os import (
+    getenv,
+)
+from time import (
+    monotonic,
+    sleep,
+)
+from typing import (
+    Dict,
+    List,
+    Optional,
+    Tuple,
+)
+
+DEADLINE_MARGIN = 5000
+FUNCTION_NAME = getenv("FUNCTION_NAME")
+REPLAY_CONCURRENCY = int(getenv("REPLAY_CONCURRENCY", "2"))
+REPLAY_RATE = float(getenv("REPLAY_RATE", "10"))
+TABLE_NAME = getenv("TABLE_NAME")
+dynamodb = client("dynamodb")
+lambda_ = client("lambda")
+logger = Logger(
+    level=getenv("LOG_LEVEL", "INFO"),
+    service="job_replay",
+)
+pacing = {
+    "last": 0.0,
+}
+processor = BatchProcessor(event_type=EventType.SQS)
+replays = dict()
+tracer = Tracer(service="job_replay")
+
+
+def replay_key(name: str) -> str:
+    return f"replay#{name}"
+
+
+def get_replay(name: str) -> Optional[dict]:
+    if name not in replays:
+        item = dynamodb.get_item(
+            ConsistentRead=True,
+            ExpressionAttributeNames={
+                "#error_types": "error_types",
+                "#rate": "rate",
+            },
+            Key={
+                "id": {
+                    "S": replay_key(name),
+                },
+            },
+            ProjectionExpression="#error_types, #rate",
+            TableName=TABLE_NAME,
+        ).get("Item")
+        replays[name] = None if item is None else {
+            "error_types": [
+                error_type["S"]
+                for error_type in item.get("error_types", dict()).get(
+                    "L", list())
+            ],
+            "rate": float(item["rate"]["N"]) if "rate" in item else None,
+        }
+
+    return replays[name]
+
+
+def count(name: str, counter: str) -> None:
+    dynamodb.update_item(
+        ExpressionAttributeNames={
+            "#counter": counter,
+        },
+        ExpressionAttributeValues={
+            ":one": {
+                "N": "1",
+            },
+        },
+        Key={
+            "id": {
+                "S": replay_key(name),
+            },
+        },
+        TableName=TABLE_NAME,
+        UpdateExpression="ADD #counter :one",
+    )
+
+
+@tracer.capture_method(capture_response=False)
+def resubmit(jobs: List[dict], function_name: Optional[str]) -> None:
+    for job in jobs:
+        dynamodb.put_item(
+            Item=encode_item(
+                created_at=job.get("submitted_at"),
+                id=job["id"],
+                parameters=job["parameters"],
+                status="Pending",
+            ),
+            TableName=TABLE_NAME,
+        )
+
+    lambda_.invoke(
+        FunctionName=function_name or FUNCTION_NAME,
+        InvocationType="Event",
+        Payload=dumps(jobs if len(jobs) > 1 else jobs[0]),
+    )
+
+
+def failed_jobs(detail: dict) -> Tuple[List[dict], Dict[str, str], dict]:
+    if isinstance(detail["requestPayload"], list):
+        error_types = {
+            outcome["id"]: outcome.get("errorType")
+            for outcome in detail["responsePayload"]
+            if outcome.get("status") == "Failure"
+        }
+
+        return [
+            job
+            for job in detail["requestPayload"]
+            if job.get("id") in error_types
+        ], error_types, detail.get("requestContext") or dict()
+
+    failure = detail["requestPayload"]
+    payload = failure["requestPayload"]
+    jobs = payload if isinstance(payload, list) else [payload]
+    error_type = (failure.get("responsePayload") or dict()).get("errorType")
+
+    return jobs, {
+        job["id"]: error_type
+        for job in jobs
+    }, failure.get("requestContext") or dict()
+
+
+def pace(rate: float, context: LambdaContext) -> None:
+    delay = max(pacing["last"] + REPLAY_CONCURRENCY / rate - monotonic(), 0)
+
+    if context.get_remaining_time_in_millis() < delay * 1000 + DEADLINE_MARGIN:
+        raise TimeoutError("Not enough time left to resubmit the job")
+
+    sleep(delay)
+
+    pacing["last"] = monotonic()
+
+
+def record_handler(record: SQSRecord, lambda_context: LambdaContext) -> None:
+    event = loads(record.body)
+    name = event.get("replay-name")
+    replay = get_replay(name) if name else None
+    jobs, error_types, request_context = failed_jobs(event["detail"])
+
+    logger.debug(event)
+
+    if replay and replay["error_types"]:
+        jobs = [
+            job
+            for job in jobs
+            if error_types.get(job["id"]) in replay["error_types"]
+        ]
+
+    if not jobs:
+        if replay is not None:
+            count(name, "skipped")
+
+        return
+
+    pace((replay or dict()).get("rate") or REPLAY_RATE, lambda_context)
+    resubmit(jobs, request_context.get("functionArn"))
+
+    if replay is not None:
+        count(name, "resubmitted")
+
+
+@batch_processor(record_handler=record_handler, processor=processor)
+def records_handler(event: dict, context: LambdaContext) -> dict:
+    return processor.response()
+
+
+@tracer.capture_lambda_handler
+def handler(event: dict, context: LambdaContext) -> dict:
+    return records_handler(event, context)
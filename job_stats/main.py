@@ -0,0 +1,321 @@
+from aws_lambda_powertools import (
+    Logger,
+    Tracer,
+)
+from aws_lambda_powertools.utilities.typing import (
+    LambdaContext,
+)
+from boto3 import (
+    client,
+)
+from collections import (
+    Counter,
+)
+from datetime import (
+    datetime,
+    timedelta,
+    timezone,
+)
+from hashlib import (
+    sha256,
+)
+from job_items.main import (
+    TERMINAL_STATUSES,
+)
+from os import (
+    getenv,
+)
+from time import (
+    time,
+)
+from typing import (
+    Dict,
+    List,
+    Optional,
+)
+
+BATCH_TTL = 86400
+MAX_RANGE = 604800000
+MINUTE = 60000
+PERCENTILES = {
+    "p50": 0.5,
+    "p95": 0.95,
+    "p99": 0.99,
+}
+STATS_TABLE_NAME = getenv("STATS_TABLE_NAME")
+STATS_TTL = int(getenv("STATS_TTL", "7776000"))
+TRANSACT_WRITE_SIZE = 100
+dynamodb = client("dynamodb")
+logger = Logger(
+    level=getenv("LOG_LEVEL", "INFO"),
+    service="job_stats",
+)
+tracer = Tracer(service="job_stats")
+
+
+def day(minute: int) -> str:
+    return datetime.fromtimestamp(
+        minute / 1000,
+        tz=timezone.utc,
+    ).strftime("%Y-%m-%d")
+
+
+def histogram_bucket(duration: int) -> int:
+    return max(duration, 1).bit_length()
+
+
+def image_status(image: dict) -> Optional[str]:
+    return (image.get("s") or image.get("status") or dict()).get("S")
+
+
+def aggregate(records: List[dict]) -> Dict[int, Counter]:
+    minutes = dict()
+
+    for record in records:
+        images = record["dynamodb"]
+        new_image = images.get("NewImage", dict())
+        status = image_status(new_image)
+
+        if status in [None, image_status(images.get("OldImage", dict()))]:
+            continue
+
+        updated_at = int(new_image["u"]["N"]) if "u" in new_image else int(
+            images["ApproximateCreationDateTime"] * 1000)
+        counters = minutes.setdefault(
+            updated_at - updated_at % MINUTE,
+            Counter(),
+        )
+        counters[f"c_{status}"] += 1
+
+        if status in TERMINAL_STATUSES and "t" in new_image:
+            duration = max(updated_at - int(new_image["t"]["N"]), 0)
+            counters[f"h_{histogram_bucket(duration)}"] += 1
+            counters["n"] += 1
+            counters["sum"] += duration
+
+    return minutes
+
+
+@tracer.capture_method(capture_response=False)
+def update_stats(minutes: Dict[int, Counter], token: str) -> None:
+    updates = [
+        {
+            "Update": {
+                "ExpressionAttributeNames": {
+                    "#ttl": "ttl",
+                    **{
+                        f"#{name}": name
+                        for name in counters
+                    },
+                },
+                "ExpressionAttributeValues": {
+                    ":ttl": {
+                        "N": str(minute // 1000 + STATS_TTL),
+                    },
+                    **{
+                        f":{name}": {
+                            "N": str(value),
+                        }
+                        for name, value in counters.items()
+                    },
+                },
+                "Key": {
+                    "d": {
+                        "S": day(minute),
+                    },
+                    "m": {
+                        "N": str(minute),
+                    },
+                },
+                "TableName": STATS_TABLE_NAME,
+                "UpdateExpression": "SET #ttl = :ttl ADD " + ", ".join(
+                    f"#{name} :{name}"
+                    for name in sorted(counters)
+                ),
+            },
+        }
+        for minute, counters in sorted(minutes.items())
+    ]
+
+    for start in range(0, len(updates), TRANSACT_WRITE_SIZE - 1):
+        batch_token = sha256(f"{token}#{start}".encode()).hexdigest()
+
+        try:
+            dynamodb.transact_write_items(
+                ClientRequestToken=batch_token[:36],
+                TransactItems=[
+                    {
+                        "Put": {
+                            "ConditionExpression": "attribute_not_exists(#d)",
+                            "ExpressionAttributeNames": {
+                                "#d": "d",
+                            },
+                            "Item": {
+                                "d": {
+                                    "S": f"batch#{batch_token}",
+                                },
+                                "m": {
+                                    "N": "0",
+                                },
+                                "ttl": {
+                                    "N": str(int(time()) + BATCH_TTL),
+                                },
+                            },
+                            "TableName": STATS_TABLE_NAME,
+                        },
+                    },
+                    *updates[start:start + TRANSACT_WRITE_SIZE - 1],
+                ],
+            )
+        except dynamodb.exceptions.TransactionCanceledException as exception:
+            reasons = exception.response.get(
+                "CancellationReasons", [dict()])
+
+            if reasons[0].get("Code") != "ConditionalCheckFailed":
+                raise
+
+            logger.info(f"Stats batch {batch_token} already counted")
+
+
+def read_stats(since: int, until: int) -> List[dict]:
+    items = list()
+    first = since - since % MINUTE
+    current = datetime.fromtimestamp(first / 1000, tz=timezone.utc).date()
+    last = datetime.fromtimestamp(until / 1000, tz=timezone.utc).date()
+
+    while current <= last:
+        start_key = dict()
+
+        while True:
+            response = dynamodb.query(
+                ExpressionAttributeNames={
+                    "#d": "d",
+                    "#m": "m",
+                },
+                ExpressionAttributeValues={
+                    ":d": {
+                        "S": current.isoformat(),
+                    },
+                    ":since": {
+                        "N": str(first),
+                    },
+                    ":until": {
+                        "N": str(until),
+                    },
+                },
+                KeyConditionExpression=("#d = :d AND "
+                                        "#m BETWEEN :since AND :until"),
+                TableName=STATS_TABLE_NAME,
+                **start_key,
+            )
+            items.extend(response["Items"])
+
+            if "LastEvaluatedKey" not in response:
+                break
+
+            start_key = {
+                "ExclusiveStartKey": response["LastEvaluatedKey"],
+            }
+
+        current += timedelta(days=1)
+
+    return items
+
+
+def percentile(
+    histogram: Counter,
+    count: int,
+    quantile: float,
+) -> Optional[int]:
+    cumulative = 0
+
+    for bucket in sorted(histogram):
+        cumulative += histogram[bucket]
+
+        if cumulative >= quantile * count:
+            return 2 ** bucket
+
+    return None
+
+
+def summarize(items: List[dict], since: int, until: int) -> dict:
+    counts = Counter()
+    histogram = Counter()
+    minutes = list()
+    durations = Counter()
+
+    for item in items:
+        minute_counts = {
+            name[2:]: int(value["N"])
+            for name, value in item.items()
+            if name.startswith("c_")
+        }
+
+        counts.update(minute_counts)
+        histogram.update({
+            int(name[2:]): int(value["N"])
+            for name, value in item.items()
+            if name.startswith("h_")
+        })
+        durations.update({
+            name: int(item[name]["N"])
+            for name in ["n", "sum"]
+            if name in item
+        })
+        minutes.append({
+            "counts": minute_counts,
+            "minute": int(item["m"]["N"]),
+        })
+
+    return {
+        "counts": dict(counts),
+        "durations": {
+            "count": durations["n"],
+            "histogram": {
+                str(2 ** bucket): histogram[bucket]
+                for bucket in sorted(histogram)
+            },
+            "sum": durations["sum"],
+            **{
+                name: percentile(histogram, durations["n"], quantile)
+                for name, quantile in PERCENTILES.items()
+            },
+        },
+        "minutes": minutes,
+        "since": since,
+        "until": until,
+    }
+
+
+def stats(event: dict) -> dict:
+    now = int(time() * 1000)
+
+    try:
+        until = int(event.get("until") or now)
+        since = int(event.get("since") or until - 3600000)
+    except ValueError:
+        raise ValueError("Bad Request: since and until must be integers")
+
+    if not 0 <= until - since <= MAX_RANGE:
+        raise ValueError(
+            f"Bad Request: {since} to {until} is not a valid range")
+
+    return summarize(read_stats(since, until), since, until)
+
+
+@tracer.capture_lambda_handler(capture_response=False)
+def handler(event: dict, context: LambdaContext) -> Optional[dict]:
+    logger.debug(event)
+
+    if "Records" not in event:
+        return stats(event)
+
+    minutes = aggregate(event["Records"])
+
+    if minutes:
+        update_stats(minutes, ",".join(
+            record["eventID"]
+            for record in event["Records"]
+        ))
+
+    return None
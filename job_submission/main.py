@@ -0,0 +1,503 @@
+from aws_lambda_powertools import (
+    Logger,
+    Tracer,
+)
+from aws_lambda_powertools.utilities.parser import (
+    BaseModel,
+    Field,
+    event_parser,
+)
+from aws_lambda_powertools.utilities.typing import (
+    LambdaContext,
+)
+from boto3 import (
+    client,
+)
+from concurrent.futures import (
+    ThreadPoolExecutor,
+)
+from hashlib import (
+    sha256,
+)
+from job_items.main import (
+    encode_item,
+)
+from json import (
+    dumps,
+    loads,
+)
+from os import (
+    getenv,
+)
+from time import (
+    sleep,
+    time,
+)
+from typing import (
+    List,
+    Optional,
+    Tuple,
+)
+from uuid import (
+    uuid4,
+)
+
+
+class Parameters(BaseModel):
+    priority: Optional[str]
+    seconds: int = Field(ge=0)
+    type: Optional[str]
+
+
+class Event(BaseModel):
+    caller: Optional[str]
+    idempotency_key: Optional[str]
+    jobs: List[Parameters]
+
+
+BATCH_WRITE_SIZE = 25
+FUNCTION_NAME = getenv("FUNCTION_NAME")
+IDEMPOTENCY_WINDOW = int(getenv("IDEMPOTENCY_WINDOW", "86400"))
+LANES = loads(getenv("LANES", "{}"))
+MAX_ATTEMPTS = int(getenv("MAX_ATTEMPTS", "5"))
+MAX_WORKERS = int(getenv("MAX_WORKERS", "16"))
+PACK_SIZE = int(getenv("PACK_SIZE", "1"))
+QUEUE_URL = getenv("QUEUE_URL")
+SEND_MESSAGE_BATCH_SIZE = 10
+TABLE_NAME = getenv("TABLE_NAME")
+TARGETS = loads(getenv("TARGETS", "{}"))
+dynamodb = client("dynamodb")
+lambda_ = client("lambda")
+sqs = client("sqs")
+logger = Logger(
+    level=getenv("LOG_LEVEL", "INFO"),
+    service="job_submission",
+)
+tracer = Tracer(service="job_submission")
+
+
+def batch_write_items(requests: List[dict]) -> List[dict]:
+    unprocessed_requests = list()
+
+    for start in range(0, len(requests), BATCH_WRITE_SIZE):
+        request_items = {
+            TABLE_NAME: requests[start:start + BATCH_WRITE_SIZE],
+        }
+
+        try:
+            for attempt in range(MAX_ATTEMPTS):
+                response = dynamodb.batch_write_item(
+                    RequestItems=request_items)
+                request_items = response.get("UnprocessedItems", dict())
+
+                if not request_items:
+                    break
+
+                sleep(0.05 * 2 ** attempt)
+        except Exception:
+            logger.exception("Batch write failed")
+
+        unprocessed_requests.extend(request_items.get(TABLE_NAME, list()))
+
+    return unprocessed_requests
+
+
+def claim_idempotency_key(
+    key: str,
+    digest: str,
+    ids: List[str],
+) -> Optional[dict]:
+    now = int(time())
+
+    try:
+        dynamodb.put_item(
+            ConditionExpression="attribute_not_exists(#id) OR #ttl < :now",
+            ExpressionAttributeNames={
+                "#id": "id",
+                "#ttl": "ttl",
+            },
+            ExpressionAttributeValues={
+                ":now": {
+                    "N": str(now),
+                },
+            },
+            Item={
+                "digest": {
+                    "S": digest,
+                },
+                "id": {
+                    "S": key,
+                },
+                "ids": {
+                    "L": [
+                        {
+                            "S": id,
+                        }
+                        for id in ids
+                    ],
+                },
+                "state": {
+                    "S": "in_progress",
+                },
+                "ttl": {
+                    "N": str(now + IDEMPOTENCY_WINDOW),
+                },
+            },
+            TableName=TABLE_NAME,
+        )
+    except dynamodb.exceptions.ConditionalCheckFailedException:
+        item = dynamodb.get_item(
+            ConsistentRead=True,
+            Key={
+                "id": {
+                    "S": key,
+                },
+            },
+            TableName=TABLE_NAME,
+        )["Item"]
+
+        if item["digest"]["S"] != digest:
+            raise ValueError(
+                "Bad Request: idempotency key reused with different jobs")
+
+        if item.get("state", dict()).get("S") == "in_progress":
+            raise RuntimeError(
+                "Conflict: request with the same idempotency key in progress")
+
+        return {
+            "ids": [id["S"] for id in item["ids"]["L"]],
+            **({
+                "errors": [
+                    {
+                        "index": int(error["M"]["index"]["N"]),
+                        "message": error["M"]["message"]["S"],
+                    }
+                    for error in item["errors"]["L"]
+                ],
+            } if item.get("errors", dict()).get("L") else dict()),
+        }
+
+    return None
+
+
+def release_idempotency_key(key: str) -> None:
+    try:
+        dynamodb.delete_item(
+            Key={
+                "id": {
+                    "S": key,
+                },
+            },
+            TableName=TABLE_NAME,
+        )
+    except Exception:
+        logger.exception(f"Idempotency key {key} not released")
+
+
+def complete_idempotency_key(
+    key: str,
+    ids: List[str],
+    errors: List[dict],
+) -> None:
+    try:
+        dynamodb.update_item(
+            ExpressionAttributeNames={
+                "#errors": "errors",
+                "#ids": "ids",
+                "#state": "state",
+            },
+            ExpressionAttributeValues={
+                ":errors": {
+                    "L": [
+                        {
+                            "M": {
+                                "index": {
+                                    "N": str(error["index"]),
+                                },
+                                "message": {
+                                    "S": error["message"],
+                                },
+                            },
+                        }
+                        for error in errors
+                    ],
+                },
+                ":ids": {
+                    "L": [
+                        {
+                            "S": id,
+                        }
+                        for id in ids
+                    ],
+                },
+                ":state": {
+                    "S": "completed",
+                },
+            },
+            Key={
+                "id": {
+                    "S": key,
+                },
+            },
+            TableName=TABLE_NAME,
+            UpdateExpression=("SET #errors = :errors, #ids = :ids, "
+                              "#state = :state"),
+        )
+    except Exception:
+        logger.exception(f"Idempotency key {key} not completed")
+
+
+def send_messages(
+    ids: List[str],
+    jobs: List[Parameters],
+    submitted_at: int,
+) -> List[str]:
+    entries = [
+        {
+            "Id": str(index),
+            "MessageAttributes": {
+                "id": {
+                    "DataType": "String",
+                    "StringValue": id,
+                },
+                "submitted_at": {
+                    "DataType": "Number",
+                    "StringValue": str(submitted_at),
+                },
+            },
+            "MessageBody": dumps(parameters.dict(exclude_none=True)),
+        }
+        for index, (id, parameters) in enumerate(zip(ids, jobs))
+    ]
+
+    for attempt in range(MAX_ATTEMPTS):
+        failed = set()
+
+        for start in range(0, len(entries), SEND_MESSAGE_BATCH_SIZE):
+            batch = entries[start:start + SEND_MESSAGE_BATCH_SIZE]
+
+            try:
+                response = sqs.send_message_batch(
+                    Entries=batch,
+                    QueueUrl=QUEUE_URL,
+                )
+            except Exception:
+                logger.exception("Message batch not sent")
+                failed.update(entry["Id"] for entry in batch)
+            else:
+                failed.update(
+                    failure["Id"]
+                    for failure in response.get("Failed", list())
+                )
+
+        entries = [entry for entry in entries if entry["Id"] in failed]
+
+        if not entries:
+            break
+
+        sleep(0.05 * 2 ** attempt)
+
+    return [
+        entry["MessageAttributes"]["id"]["StringValue"]
+        for entry in entries
+    ]
+
+
+def target(parameters: Parameters) -> str:
+    if parameters.priority is not None:
+        return LANES[parameters.priority][parameters.type or ""]
+
+    if parameters.type is not None:
+        return TARGETS[parameters.type]
+
+    return FUNCTION_NAME
+
+
+def pack(
+    ids: List[str],
+    jobs: List[Parameters],
+) -> List[List[Tuple[str, Parameters]]]:
+    targets = dict()
+
+    for id, parameters in zip(ids, jobs):
+        targets.setdefault(target(parameters), list()).append(
+            (id, parameters))
+
+    return [
+        target_jobs[start:start + PACK_SIZE]
+        for target_jobs in targets.values()
+        for start in range(0, len(target_jobs), PACK_SIZE)
+    ]
+
+
+def invoke(
+    jobs: List[Tuple[str, Parameters]],
+    submitted_at: int,
+) -> List[str]:
+    events = [
+        {
+            "id": id,
+            "parameters": parameters.dict(exclude_none=True),
+            "submitted_at": submitted_at,
+        }
+        for id, parameters in jobs
+    ]
+
+    try:
+        lambda_.invoke(
+            FunctionName=target(jobs[0][1]),
+            InvocationType="Event",
+            Payload=dumps(events if len(events) > 1 else events[0]),
+        )
+    except Exception:
+        logger.exception(f"{target(jobs[0][1])} not invoked")
+
+        return [id for id, _ in jobs]
+
+    return list()
+
+
+def submit(ids: List[str], jobs: List[Parameters]) -> List[dict]:
+    submitted_at = int(time() * 1000)
+    unwritten_ids = {
+        request["PutRequest"]["Item"]["id"]["S"]
+        for request in batch_write_items([
+            {
+                "PutRequest": {
+                    "Item": encode_item(
+                        created_at=submitted_at,
+                        id=id,
+                        parameters=parameters.dict(exclude_none=True),
+                        status="Pending",
+                    ),
+                },
+            }
+            for id, parameters in zip(ids, jobs)
+        ])
+    }
+    written_jobs = [
+        (id, parameters)
+        for id, parameters in zip(ids, jobs)
+        if id not in unwritten_ids
+    ]
+
+    if not written_jobs:
+        undispatched_ids = set()
+    elif QUEUE_URL:
+        undispatched_ids = set(send_messages(
+            [id for id, _ in written_jobs],
+            [parameters for _, parameters in written_jobs],
+            submitted_at,
+        ))
+    else:
+        with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+            packs = pack(
+                [id for id, _ in written_jobs],
+                [parameters for _, parameters in written_jobs],
+            )
+            undispatched_ids = {
+                id
+                for pack_ids in executor.map(
+                    invoke,
+                    packs,
+                    [submitted_at] * len(packs),
+                )
+                for id in pack_ids
+            }
+
+    if batch_write_items([
+        {
+            "DeleteRequest": {
+                "Key": {
+                    "id": {
+                        "S": id,
+                    },
+                },
+            },
+        }
+        for id in unwritten_ids | undispatched_ids
+    ]):
+        logger.error("Pending jobs not submitted were not deleted")
+
+    return [
+        {
+            "index": index,
+            "message": ("Job not written" if id in unwritten_ids
+                        else "Job not dispatched"),
+        }
+        for index, id in enumerate(ids)
+        if id in unwritten_ids or id in undispatched_ids
+    ]
+
+
+@tracer.capture_lambda_handler
+@event_parser(model=Event)
+def handler(event: Event, context: LambdaContext) -> dict:
+    logger.debug(event)
+
+    for parameters in event.jobs:
+        if parameters.type is not None and parameters.type not in TARGETS:
+            raise ValueError(
+                f"Bad Request: {parameters.type} is not a valid job type")
+
+        if (parameters.priority is not None and
+                parameters.priority not in LANES):
+            raise ValueError(
+                f"Bad Request: {parameters.priority} is not a valid priority")
+
+    ids = [str(uuid4()) for _ in event.jobs]
+    key = None
+
+    if event.idempotency_key:
+        key = "#".join([
+            "idempotency",
+            sha256(
+                f"{event.caller}\n{event.idempotency_key}".encode()
+            ).hexdigest(),
+        ])
+        digest = sha256(
+            dumps([
+                parameters.dict(exclude_none=True)
+                for parameters in event.jobs
+            ]).encode()
+        ).hexdigest()
+        claimed_response = claim_idempotency_key(key, digest, ids)
+
+        if claimed_response is not None:
+            logger.info(f"Idempotency key {key} already claimed")
+
+            return claimed_response
+
+    try:
+        errors = submit(ids, event.jobs)
+    except Exception:
+        if key:
+            release_idempotency_key(key)
+
+        raise
+
+    if len(errors) == len(ids):
+        if key:
+            release_idempotency_key(key)
+
+        raise RuntimeError(f"{len(errors)} jobs not submitted")
+
+    failed_indexes = {error["index"] for error in errors}
+    accepted_ids = [
+        id
+        for index, id in enumerate(ids)
+        if index not in failed_indexes
+    ]
+
+    if key:
+        complete_idempotency_key(key, accepted_ids, errors)
+
+    if not errors:
+        return {
+            "ids": ids,
+        }
+
+    return {
+        "errors": errors,
+        "ids": accepted_ids,
+    }
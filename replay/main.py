@@ -0,0 +1,197 @@
+from argparse import (
+    ArgumentParser,
+)
+from boto3 import (
+    client,
+)
+from datetime import (
+    datetime,
+    timezone,
+)
+from time import (
+    sleep,
+    time,
+)
+from typing import (
+    Dict,
+    List,
+    Optional,
+)
+
+REPLAY_TTL = 604800
+TERMINAL_STATES = {
+    "CANCELLED",
+    "COMPLETED",
+    "FAILED",
+}
+cloudformation = client("cloudformation")
+dynamodb = client("dynamodb")
+events = client("events")
+
+
+def stack_outputs(stack_name: str) -> Dict[str, str]:
+    stack = cloudformation.describe_stacks(StackName=stack_name)["Stacks"][0]
+
+    return {
+        output["OutputKey"]: output["OutputValue"]
+        for output in stack.get("Outputs", list())
+    }
+
+
+def start_replay(
+    outputs: Dict[str, str],
+    name: str,
+    start: datetime,
+    end: datetime,
+    error_types: Optional[List[str]] = None,
+    rate: Optional[float] = None,
+) -> None:
+    dynamodb.put_item(
+        Item={
+            "error_types": {
+                "L": [
+                    {
+                        "S": error_type,
+                    }
+                    for error_type in error_types or list()
+                ],
+            },
+            "id": {
+                "S": f"replay#{name}",
+            },
+            "resubmitted": {
+                "N": "0",
+            },
+            "skipped": {
+                "N": "0",
+            },
+            "ttl": {
+                "N": str(int(time()) + REPLAY_TTL),
+            },
+            **({
+                "rate": {
+                    "N": str(rate),
+                },
+            } if rate is not None else dict()),
+        },
+        TableName=outputs["JobsTable"],
+    )
+    events.start_replay(
+        Description="Failed jobs replay",
+        Destination={
+            "Arn": outputs["JobsEventBus"],
+            "FilterArns": [
+                outputs["JobReplayRule"],
+            ],
+        },
+        EventEndTime=end,
+        EventSourceArn=outputs["FailedJobsArchive"],
+        EventStartTime=start,
+        ReplayName=name,
+    )
+
+
+def replay_progress(outputs: Dict[str, str], name: str) -> dict:
+    replay = events.describe_replay(ReplayName=name)
+    item = dynamodb.get_item(
+        ConsistentRead=True,
+        Key={
+            "id": {
+                "S": f"replay#{name}",
+            },
+        },
+        TableName=outputs["JobsTable"],
+    ).get("Item", dict())
+    start = replay["EventStartTime"].timestamp()
+    end = replay["EventEndTime"].timestamp()
+    last_replayed = replay.get("EventLastReplayedTime")
+    progress = 1.0 if replay["State"] == "COMPLETED" else 0.0
+
+    if last_replayed is not None and end > start:
+        progress = min(max((last_replayed.timestamp() - start) /
+                           (end - start), progress), 1.0)
+
+    return {
+        "progress": progress,
+        "resubmitted": int(item.get("resubmitted", dict()).get("N", "0")),
+        "skipped": int(item.get("skipped", dict()).get("N", "0")),
+        "state": replay["State"],
+    }
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    parser = ArgumentParser(
+        description="Replays the failed jobs of the failed jobs archive",
+    )
+
+    parser.add_argument(
+        "--end",
+        default=None,
+        help="end of the failure time range, in ISO 8601 (default now)",
+        type=datetime.fromisoformat,
+    )
+    parser.add_argument(
+        "--error-types",
+        default=None,
+        help="error types of the jobs to replay (default all)",
+        nargs="+",
+    )
+    parser.add_argument(
+        "--interval",
+        default=10.0,
+        help="seconds between progress reports",
+        type=float,
+    )
+    parser.add_argument(
+        "--name",
+        default=None,
+    )
+    parser.add_argument(
+        "--rate",
+        default=None,
+        help="jobs resubmitted per second (default the replay rate)",
+        type=float,
+    )
+    parser.add_argument(
+        "--stack-name",
+        default="AsynchronousEventProcessingAPIGatewayLambda",
+    )
+    parser.add_argument(
+        "--start",
+        help="start of the failure time range, in ISO 8601",
+        required=True,
+        type=datetime.fromisoformat,
+    )
+
+    arguments = parser.parse_args(arguments)
+    outputs = stack_outputs(arguments.stack_name)
+    name = arguments.name or f"failed-jobs-{int(time())}"
+
+    start_replay(
+        outputs,
+        name,
+        arguments.start,
+        arguments.end or datetime.now(timezone.utc),
+        error_types=arguments.error_types,
+        rate=arguments.rate,
+    )
+
+    print(f"{'state':>12} {'progress':>9} {'resubmitted':>12} "
+          f"{'skipped':>8}")
+
+    while True:
+        progress = replay_progress(outputs, name)
+
+        print(f"{progress['state']:>12} {progress['progress']:>9.1%} "
+              f"{progress['resubmitted']:>12} {progress['skipped']:>8}")
+
+        if progress["state"] in TERMINAL_STATES:
+            break
+
+        sleep(arguments.interval)
+
+    return 0 if progress["state"] == "COMPLETED" else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
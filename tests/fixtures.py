@@ -9,5 +9,9 @@ from pytest import (
 @fixture(scope="module")
 def context() -> LambdaContext:
     context = LambdaContext()
+    context._invoked_function_arn = ("arn:aws:lambda:us-east-1:"
+                                     "123456789012:function:"
+                                     "event_processing")
+    context.get_remaining_time_in_millis = lambda: 300000
 
     yield context
@@ -0,0 +1,98 @@
+from benchmark.main import (
+    VirtualClock,
+    duration,
+    main,
+    measure,
+    price_per_job,
+    regressions,
+    workloads,
+)
+from json import (
+    dumps,
+)
+from pathlib import (
+    Path,
+)
+from pytest import (
+    CaptureFixture,
+    approx,
+    raises,
+)
+
+
+def test_duration() -> None:
+    assert duration(0.1, 1769) == approx(0.1)  # nosec
+    assert duration(0.1, 3538) == approx(0.1)  # nosec
+    assert duration(0.1, 128, io_seconds=1) == approx(2.382, rel=1e-3)  # nosec
+
+
+def test_price_per_job() -> None:
+    assert price_per_job(1, 1024, "x86_64") == approx(  # nosec
+        0.0000168667)
+    assert price_per_job(1, 1024, "arm64") < price_per_job(  # nosec
+        1, 1024, "x86_64")
+    assert price_per_job(0.0001, 128, "x86_64") == approx(  # nosec
+        0.0000002 + 0.001 * 128 / 1024 * 0.0000166667)
+
+
+def test_workloads(capsys: CaptureFixture) -> None:
+    for function in workloads(results_size=64).values():
+        assert measure(function, repeat=3) >= 0  # nosec
+
+    main([
+        "tune",
+        "--architectures",
+        "arm64",
+        "--memory-sizes",
+        "128",
+        "--repeat",
+        "3",
+    ])
+
+    assert "arm64" in capsys.readouterr().out  # nosec
+
+
+def test_regressions(tmp_path: Path) -> None:
+    baseline_path = tmp_path.joinpath("baseline.json")
+    arguments = [
+        "run",
+        "--baseline",
+        str(baseline_path),
+        "--cold-repeat",
+        "0",
+        "--repeat",
+        "3",
+    ]
+
+    assert main(arguments) == 0  # nosec
+    assert "event_processing.handler" in baseline_path.read_text()  # nosec
+
+    baseline_path.write_text(dumps({
+        "event_processing.handler": 0.0,
+    }))
+
+    assert main(arguments) == 1  # nosec
+    assert regressions(  # nosec
+        {
+            "a": 1.4,
+            "b": 1.6,
+        },
+        {
+            "a": 1.0,
+            "b": 1.0,
+        },
+    ) == [
+        "b: 1.60x calibration, baseline 1.00x calibration",
+    ]
+
+
+def test_virtual_clock() -> None:
+    clock = VirtualClock(now=0)
+
+    clock.sleep(300)
+
+    with raises(ValueError):
+        clock.sleep(-1)
+
+    assert clock.time() == 300  # nosec
+    assert clock.sleeps == [300]  # nosec
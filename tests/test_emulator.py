@@ -0,0 +1,235 @@
+from emulator.main import (
+    Emulator,
+    ScaledClock,
+    generate_load,
+    percentiles,
+    render,
+    synthesize,
+)
+from json import (
+    dumps,
+    loads,
+)
+from pytest import (
+    MonkeyPatch,
+    fixture,
+)
+from typing import (
+    Any,
+    Optional,
+)
+
+
+@fixture(scope="module")
+def template() -> dict:
+    yield synthesize(reserved_concurrent_executions=2)
+
+
+def test_render() -> None:
+    rendered = render(
+        "\n".join([
+            "{",
+            "  \"caller\": \"$context.identity.caller\",",
+            "  \"key\": \"$util.escapeJavaScript($input.params('Key'))\",",
+            "  \"jobs\": [$input.body],",
+            ("  \"status\": \"$util.escapeJavaScript("
+             "$input.path('$.errorMessage').substring(11))\","),
+            "  \"id\": \"$input.path('$.ids[1]')\"",
+            "}",
+        ]),
+        body=dumps({
+            "errorMessage": "Not Ready: Running",
+            "ids": [
+                "1",
+                "2",
+            ],
+        }),
+        caller="caller",
+        parameters={
+            "header": {
+                "Key": "a\"b",
+            },
+        },
+    )
+
+    assert loads(rendered) == {  # nosec
+        "caller": "caller",
+        "id": "2",
+        "jobs": [
+            {
+                "errorMessage": "Not Ready: Running",
+                "ids": [
+                    "1",
+                    "2",
+                ],
+            },
+        ],
+        "key": "a\"b",
+        "status": "Running",
+    }
+
+
+def test_percentiles() -> None:
+    assert percentiles(list(range(1, 101))) == {  # nosec
+        "p50": 50,
+        "p95": 95,
+        "p99": 99,
+    }
+    assert percentiles(list()) == {  # nosec
+        "p50": None,
+        "p95": None,
+        "p99": None,
+    }
+
+
+def test_emulator(monkeypatch: MonkeyPatch, template: dict) -> None:
+    with Emulator(template, ScaledClock(0.001)) as emulator:
+        module = emulator.modules["EventProcessingFunction"]
+        job_handler = module.JOB_HANDLERS["sleep"]
+
+        def failing_job_handler(
+            parameters: Any,
+            elapsed: int = 0,
+            budget: Optional[float] = None,
+        ) -> str:
+            if parameters.seconds == 2:
+                raise RuntimeError("Job failed")
+
+            return job_handler(parameters, elapsed, budget)
+
+        monkeypatch.setitem(module.JOB_HANDLERS, "sleep", failing_job_handler)
+        status_code, _, body = emulator.request(
+            "POST",
+            "/jobs",
+            body=dumps({
+                "seconds": 1,
+            }),
+        )
+        id = loads(body)["id"]
+        _, _, failure_body = emulator.request(
+            "POST",
+            "/jobs",
+            body=dumps({
+                "seconds": 2,
+            }),
+        )
+        failure_id = loads(failure_body)["id"]
+
+        emulator.drain()
+
+        assert status_code == 200  # nosec
+        assert loads(emulator.request("GET", f"/jobs/{id}")[2])[  # nosec
+            "status"] == "Success"
+        assert loads(emulator.request(  # nosec
+            "GET",
+            f"/jobs/{failure_id}",
+            query={
+                "view": "status",
+            },
+        )[2])["status"] == "Failure"
+        assert emulator.request("GET", "/jobs/unknown")[0] == 404  # nosec
+        assert emulator.request(  # nosec
+            "GET",
+            "/jobs/unknown",
+            query={
+                "view": "unknown",
+            },
+        )[0] == 400
+        assert emulator.request("GET", "/unknown")[0] == 403  # nosec
+
+
+def test_generate_load(template: dict) -> None:
+    report = generate_load(
+        template,
+        rate=20,
+        duration=1,
+        clock=ScaledClock(0.001),
+        seed=1,
+    )
+
+    assert report["completed"] == report["submitted"] > 0  # nosec
+    assert report["statuses"] == {  # nosec
+        "Success": report["submitted"],
+    }
+    assert report["latency"]["p50"] >= 1  # nosec
+
+
+def test_emulator_targets() -> None:
+    template = synthesize(
+        job_types=[
+            {
+                "name": "Heavy",
+                "reserved_concurrent_executions": 1,
+            },
+        ],
+        priority_lanes=[
+            {
+                "name": "High",
+                "reserved_concurrent_executions": 2,
+            },
+        ],
+        reserved_concurrent_executions=2,
+    )
+
+    with Emulator(template, ScaledClock(0.001)) as emulator:
+        ids = [
+            loads(emulator.request(
+                "POST",
+                "/jobs",
+                body=dumps(parameters),
+            )[2])["id"]
+            for parameters in [
+                {
+                    "seconds": 1,
+                    "type": "Heavy",
+                },
+                {
+                    "priority": "High",
+                    "seconds": 1,
+                },
+            ]
+        ]
+
+        emulator.drain()
+
+        assert emulator.functions[  # nosec
+            "HeavyEventProcessingFunction"][
+            "reserved_concurrent_executions"] == 1
+        assert emulator.invocations == {  # nosec
+            "HeavyEventProcessingFunction": 1,
+            "HighEventProcessingFunction": 1,
+        }
+        assert [  # nosec
+            emulator.jobs[id]["status"]
+            for id in ids
+        ] == ["Success", "Success"]
+
+
+def test_emulator_pack() -> None:
+    template = synthesize(
+        pack_size=2,
+        reserved_concurrent_executions=2,
+    )
+
+    with Emulator(template, ScaledClock(0.001)) as emulator:
+        status_code, _, body = emulator.request(
+            "POST",
+            "/jobs/batch",
+            body=dumps([
+                {
+                    "seconds": seconds,
+                }
+                for seconds in [1, 1, 2]
+            ]),
+        )
+
+        emulator.drain()
+
+        assert status_code == 200  # nosec
+        assert emulator.invocations == {  # nosec
+            "EventProcessingFunction": 2,
+        }
+        assert [  # nosec
+            emulator.jobs[id]["status"]
+            for id in loads(body)["ids"]
+        ] == ["Success", "Success", "Success"]
@@ -2,12 +2,16 @@ from aws_lambda_powertools.utilities.typing import (
     LambdaContext,
 )
 from botocore.stub import (
+    ANY,
     Stubber,
 )
 from error_handling.main import (
     dynamodb,
     handler,
 )
+from job_items.main import (
+    encode_item,
+)
 from json import (
     dumps,
 )
@@ -28,15 +32,12 @@ def dynamodb_stub(event: dict) -> Stubber:
         "put_item",
         expected_params={
             "Item": {
-                "id": {
-                    "S": "1",
-                },
-                "parameters": {
-                    "S": dumps(parameters),
-                },
-                "status": {
-                    "S": "Failure",
-                },
+                **encode_item(
+                    id="1",
+                    parameters=parameters,
+                    status="Failure",
+                ),
+                "u": ANY,
             },
             "TableName": "jobs",
         },
@@ -66,4 +67,104 @@ def test_error_handling(
     event: dict,
 ) -> None:
     with dynamodb_stub:
-        handler(event, context)
+        response = handler(event, context)
+
+    assert response == {  # nosec
+        "id": "1",
+        "parameters": {
+            "seconds": 301,
+        },
+        "status": "Failure",
+    }
+
+
+def test_error_handling_timed_out(
+    context: LambdaContext,
+    event: dict,
+) -> None:
+    dynamodb_stub = Stubber(dynamodb)
+
+    dynamodb_stub.add_response(
+        "put_item",
+        expected_params={
+            "Item": {
+                **encode_item(
+                    id="1",
+                    parameters=event["requestPayload"]["parameters"],
+                    status="TimedOut",
+                ),
+                "u": ANY,
+            },
+            "TableName": "jobs",
+        },
+        service_response=dict(),
+    )
+
+    with dynamodb_stub:
+        response = handler(
+            {
+                **event,
+                "responsePayload": {
+                    "errorMessage": ("2023-01-01T00:00:00.000Z 1 "
+                                     "Task timed out after 300.00 seconds"),
+                },
+            },
+            context,
+        )
+
+    assert response["status"] == "TimedOut"  # nosec
+
+
+def test_error_handling_packed(
+    context: LambdaContext,
+    dynamodb_stub: Stubber,
+    event: dict,
+) -> None:
+    with dynamodb_stub:
+        response = handler(
+            {
+                "requestPayload": [
+                    event["requestPayload"],
+                ],
+            },
+            context,
+        )
+
+    assert response == [  # nosec
+        {
+            "id": "1",
+            "parameters": {
+                "seconds": 301,
+            },
+            "status": "Failure",
+        },
+    ]
+
+
+def test_error_handling_records(
+    context: LambdaContext,
+    dynamodb_stub: Stubber,
+    event: dict,
+) -> None:
+    event_records = {
+        "Records": [
+            {
+                "body": dumps(event["requestPayload"]["parameters"]),
+                "eventSource": "aws:sqs",
+                "messageAttributes": {
+                    "id": {
+                        "dataType": "String",
+                        "stringValue": event["requestPayload"]["id"],
+                    },
+                },
+                "messageId": "1",
+            },
+        ],
+    }
+
+    with dynamodb_stub:
+        response = handler(event_records, context)
+
+    assert response == {  # nosec
+        "batchItemFailures": [],
+    }
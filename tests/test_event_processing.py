@@ -1,24 +1,61 @@
+from aws_lambda_powertools.utilities.parser import (
+    ValidationError,
+)
 from aws_lambda_powertools.utilities.typing import (
     LambdaContext,
 )
 from botocore.stub import (
+    ANY,
     Stubber,
 )
+from benchmark.main import (
+    VirtualClock,
+)
+from concurrent.futures import (
+    ThreadPoolExecutor,
+)
 from event_processing.main import (
+    Checkpoint,
     Event,
+    JOB_HANDLERS,
     Parameters,
+    ResultsCache,
     dynamodb,
     handler,
+    lambda_,
+    logger,
+    s3,
 )
-from os import (
-    getenv,
+from job_items.main import (
+    encode_item,
+)
+from json import (
+    dumps,
+    loads,
 )
 from pytest import (
+    CaptureFixture,
+    LogCaptureFixture,
+    MonkeyPatch,
+    approx,
     fixture,
+    raises,
 )
 from tests.fixtures import (
     context,
 )
+from typing import (
+    Optional,
+)
+
+
+@fixture(autouse=True)
+def clock(monkeypatch: MonkeyPatch) -> VirtualClock:
+    clock = VirtualClock()
+
+    monkeypatch.setattr("event_processing.main.clock", clock)
+
+    yield clock
 
 
 @fixture
@@ -32,36 +69,167 @@ def dynamodb_stub(event_success: Event) -> Stubber:
         "put_item",
         expected_params={
             "Item": {
-                "id": {
-                    "S": "2",
-                },
+                **encode_item(
+                    id="2",
+                    results=f"{{\"message\": \"{message}\"}}",
+                    status="Success",
+                ),
+                "u": ANY,
+            },
+            "TableName": "jobs",
+        },
+        service_response=dict(),
+    )
+
+    yield dynamodb_stub
+
+
+@fixture
+def cached_dynamodb_stub(event_success: Event) -> Stubber:
+    cached_dynamodb_stub = Stubber(dynamodb)
+    parameters = event_success.parameters
+    seconds = parameters.seconds
+    message = f"I slept for {seconds} seconds"
+    results = f"{{\"message\": \"{message}\"}}"
+    item = {
+        **encode_item(
+            id="2",
+            results=results,
+            status="Success",
+        ),
+        "u": ANY,
+    }
+    key = {
+        "id": {
+            "S": ("fd839bdef3efc7f83657dc6dfd87ac89"
+                  "eda36d5756deb4cbfb8db4596c2de7a6"),
+        },
+    }
+
+    cached_dynamodb_stub.add_response(
+        "get_item",
+        expected_params={
+            "Key": key,
+            "TableName": "results",
+        },
+        service_response=dict(),
+    )
+    cached_dynamodb_stub.add_response(
+        "put_item",
+        expected_params={
+            "Item": {
+                **key,
                 "results": {
-                    "S": f"{{\"message\": \"{message}\"}}",
-                },
-                "status": {
-                    "S": "Success",
+                    "S": results,
                 },
+                "ttl": ANY,
+            },
+            "TableName": "results",
+        },
+        service_response=dict(),
+    )
+
+    for _ in range(2):
+        cached_dynamodb_stub.add_response(
+            "put_item",
+            expected_params={
+                "Item": item,
+                "TableName": "jobs",
+            },
+            service_response=dict(),
+        )
+
+    yield cached_dynamodb_stub
+
+
+@fixture
+def claim_check_dynamodb_stub() -> Stubber:
+    claim_check_dynamodb_stub = Stubber(dynamodb)
+
+    claim_check_dynamodb_stub.add_response(
+        "put_item",
+        expected_params={
+            "Item": {
+                **encode_item(
+                    id="2",
+                    results_location="results/2.json",
+                    status="Success",
+                ),
+                "u": ANY,
             },
             "TableName": "jobs",
         },
         service_response=dict(),
     )
 
-    yield dynamodb_stub
+    yield claim_check_dynamodb_stub
+
+
+@fixture
+def claim_check_s3_stub() -> Stubber:
+    claim_check_s3_stub = Stubber(s3)
+
+    claim_check_s3_stub.add_response(
+        "put_object",
+        expected_params={
+            "Body": b"{\"message\": \"I slept for 1 seconds\"}",
+            "Bucket": "results",
+            "ContentType": "application/json",
+            "Key": "results/2.json",
+        },
+        service_response=dict(),
+    )
+
+    yield claim_check_s3_stub
 
 
 @fixture
-def event_failure() -> Event:
+def event_failure(monkeypatch: MonkeyPatch) -> Event:
     event_failure = Event(
         id="1",
         parameters=Parameters(
-            seconds=301,
+            seconds=2,
         ),
     )
+    job_handler = JOB_HANDLERS["sleep"]
+
+    def failing_job_handler(
+        parameters: Parameters,
+        elapsed: int = 0,
+        budget: Optional[float] = None,
+    ) -> str:
+        if parameters == event_failure.parameters:
+            raise RuntimeError("Job failed")
+
+        return job_handler(parameters, elapsed, budget)
+
+    monkeypatch.setitem(JOB_HANDLERS, "sleep", failing_job_handler)
 
     yield event_failure
 
 
+@fixture
+def event_records(event_failure: Event, event_success: Event) -> dict:
+    event_records = {
+        "Records": [
+            {
+                "body": dumps(event.parameters.dict()),
+                "eventSource": "aws:sqs",
+                "messageAttributes": {
+                    "id": {
+                        "dataType": "String",
+                        "stringValue": event.id,
+                    },
+                },
+                "messageId": event.id,
+            }
+            for event in [event_failure, event_success]
+        ],
+    }
+
+    yield event_records
+
+
 @fixture
 def event_success() -> Event:
     event_success = Event(
@@ -78,16 +246,91 @@ def test_job_processing_failure(
     context: LambdaContext,
     event_failure: Event,
 ) -> None:
-    try:
-        parameters = event_failure.parameters
-        seconds = parameters.seconds
-        timeout = int(getenv("TIMEOUT"))
-
+    with raises(RuntimeError, match="^Job failed$"):
         handler(event_failure, context)
-    except ValueError as value_error:
-        error_message = value_error.args[0]
 
-        assert error_message == f"{seconds} major then {timeout}"  # nosec
+    with raises(ValidationError, match="greater than or equal to 0"):
+        handler(
+            {
+                "id": "1",
+                "parameters": {
+                    "seconds": -1,
+                },
+            },
+            context,
+        )
+
+
+def test_job_processing_continuation(
+    clock: VirtualClock,
+    context: LambdaContext,
+) -> None:
+    dynamodb_stub = Stubber(dynamodb)
+    lambda_stub = Stubber(lambda_)
+
+    dynamodb_stub.add_response(
+        "put_item",
+        expected_params={
+            "Item": {
+                **encode_item(
+                    checkpoint=590,
+                    created_at=1,
+                    id="3",
+                    parameters={
+                        "seconds": 900,
+                    },
+                    status="Running",
+                ),
+                "u": ANY,
+            },
+            "TableName": "jobs",
+        },
+        service_response=dict(),
+    )
+    lambda_stub.add_response(
+        "invoke",
+        expected_params={
+            "FunctionName": context.invoked_function_arn,
+            "InvocationType": "Event",
+            "Payload": dumps({
+                "elapsed": 590,
+                "id": "3",
+                "parameters": {
+                    "seconds": 900,
+                },
+                "submitted_at": 1,
+            }),
+        },
+        service_response=dict(),
+    )
+
+    with dynamodb_stub, lambda_stub:
+        response = handler(
+            {
+                "elapsed": 300,
+                "id": "3",
+                "parameters": {
+                    "seconds": 900,
+                },
+                "submitted_at": 1,
+            },
+            context,
+        )
+
+    assert clock.sleeps == [290]  # nosec
+    assert response == {  # nosec
+        "checkpoint": 590,
+        "id": "3",
+        "status": "Running",
+    }
+
+
+def test_job_processing_checkpoint_budget(clock: VirtualClock) -> None:
+    with raises(Checkpoint) as checkpoint:
+        JOB_HANDLERS["sleep"](Parameters(seconds=900), 300, -5)
+
+    assert checkpoint.value.elapsed == 300  # nosec
+    assert clock.sleeps == [0]  # nosec
 
 
 def test_job_processing_success(
@@ -95,5 +338,273 @@ def test_job_processing_success(
     dynamodb_stub: Stubber,
     event_success: Event,
 ) -> None:
+    with dynamodb_stub:
+        response = handler(event_success, context)
+
+    assert logger.get_correlation_id() == event_success.id  # nosec
+    assert response == {  # nosec
+        "id": event_success.id,
+        "results": {
+            "message": f"I slept for {event_success.parameters.seconds} "
+                       "seconds",
+        },
+        "status": "Success",
+    }
+
+
+def test_job_processing_metrics(
+    capsys: CaptureFixture,
+    clock: VirtualClock,
+    context: LambdaContext,
+    event_success: Event,
+) -> None:
+    dynamodb_stub = Stubber(dynamodb)
+    event_success.submitted_at = int(clock.time() * 1000) - 2000
+
+    dynamodb_stub.add_response(
+        "put_item",
+        expected_params={
+            "Item": {
+                **encode_item(
+                    created_at=event_success.submitted_at,
+                    id="2",
+                    results="{\"message\": \"I slept for 1 seconds\"}",
+                    status="Success",
+                ),
+                "u": ANY,
+            },
+            "TableName": "jobs",
+        },
+        service_response=dict(),
+    )
+
     with dynamodb_stub:
         handler(event_success, context)
+
+    metrics = loads(capsys.readouterr().out.splitlines()[-1])
+
+    assert {  # nosec
+        metric["Name"]
+        for metric in metrics["_aws"]["CloudWatchMetrics"][0]["Metrics"]
+    } == {
+        "JobsSucceeded",
+        "ProcessingDuration",
+        "QueueTime",
+        "WriteLatency",
+    }
+    assert metrics["ProcessingDuration"] == [1000]  # nosec
+    assert metrics["QueueTime"] == [approx(2000, abs=1)]  # nosec
+    assert metrics["Priority"] == "default"  # nosec
+    assert metrics["service"] == "event_processing"  # nosec
+
+
+def test_jobs_processing(
+    context: LambdaContext,
+    event_failure: Event,
+    event_success: Event,
+) -> None:
+    dynamodb_stub = Stubber(dynamodb)
+    message = f"I slept for {event_success.parameters.seconds} seconds"
+
+    dynamodb_stub.add_response(
+        "batch_write_item",
+        expected_params={
+            "RequestItems": {
+                "jobs": [
+                    {
+                        "PutRequest": {
+                            "Item": {
+                                **encode_item(
+                                    id=event_failure.id,
+                                    parameters={
+                                        "seconds": 2,
+                                    },
+                                    status="Failure",
+                                ),
+                                "u": ANY,
+                            },
+                        },
+                    },
+                    {
+                        "PutRequest": {
+                            "Item": {
+                                **encode_item(
+                                    id=event_success.id,
+                                    results=f"{{\"message\": \"{message}\"}}",
+                                    status="Success",
+                                ),
+                                "u": ANY,
+                            },
+                        },
+                    },
+                ],
+            },
+        },
+        service_response=dict(),
+    )
+
+    with dynamodb_stub:
+        response = handler(
+            [
+                event_failure.dict(exclude_none=True),
+                event_success.dict(exclude_none=True),
+                {
+                    "parameters": {
+                        "seconds": 1,
+                    },
+                },
+            ],
+            context,
+        )
+
+    dynamodb_stub.assert_no_pending_responses()
+
+    assert [job["status"] for job in response] == [  # nosec
+        "Failure",
+        "Success",
+        "Failure",
+    ]
+    assert response[0]["error"] == "Job failed"  # nosec
+    assert response[0]["errorType"] == "RuntimeError"  # nosec
+    assert response[1]["results"] == {  # nosec
+        "message": message,
+    }
+    assert response[2]["id"] is None  # nosec
+
+
+def test_jobs_processing_unwritten(
+    caplog: LogCaptureFixture,
+    context: LambdaContext,
+    event_failure: Event,
+    event_success: Event,
+) -> None:
+    dynamodb_stub = Stubber(dynamodb)
+
+    dynamodb_stub.add_client_error(
+        "batch_write_item",
+        expected_params={
+            "RequestItems": ANY,
+        },
+        service_error_code="ProvisionedThroughputExceededException",
+    )
+
+    with dynamodb_stub:
+        response = handler(
+            [
+                event_failure.dict(exclude_none=True),
+                event_success.dict(exclude_none=True),
+            ],
+            context,
+        )
+
+    dynamodb_stub.assert_no_pending_responses()
+
+    assert response == [  # nosec
+        {
+            "error": "Failure outcome not written",
+            "errorType": "RuntimeError",
+            "id": event_failure.id,
+            "status": "Failure",
+        },
+        {
+            "error": "Success outcome not written",
+            "errorType": "RuntimeError",
+            "id": event_success.id,
+            "status": "Failure",
+        },
+    ]
+    assert {  # nosec
+        (record.getMessage(), record.correlation_id)
+        for record in caplog.records
+        if hasattr(record, "correlation_id")
+    } >= {
+        (f"Job {event_failure.id} failed", event_failure.id),
+        (f"Job {event_success.id} outcome not written", event_success.id),
+    }
+
+
+def test_job_records_processing(
+    context: LambdaContext,
+    dynamodb_stub: Stubber,
+    event_failure: Event,
+    event_records: dict,
+) -> None:
+    with dynamodb_stub:
+        response = handler(event_records, context)
+
+    assert response == {  # nosec
+        "batchItemFailures": [
+            {
+                "itemIdentifier": event_failure.id,
+            },
+        ],
+    }
+
+
+def test_job_processing_cached(
+    cached_dynamodb_stub: Stubber,
+    context: LambdaContext,
+    event_success: Event,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    results_cache = ResultsCache(size=1)
+
+    monkeypatch.setattr(
+        "event_processing.main.RESULTS_CACHE_TABLE_NAME", "results")
+    monkeypatch.setattr(
+        "event_processing.main.results_cache", results_cache)
+
+    with cached_dynamodb_stub:
+        handler(event_success, context)
+        handler(event_success, context)
+
+    assert results_cache.hits == 1  # nosec
+    assert results_cache.misses == 1  # nosec
+
+
+def test_job_processing_claim_check(
+    claim_check_dynamodb_stub: Stubber,
+    claim_check_s3_stub: Stubber,
+    context: LambdaContext,
+    event_success: Event,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        "event_processing.main.RESULTS_BUCKET_NAME", "results")
+    monkeypatch.setattr(
+        "event_processing.main.RESULTS_SIZE_THRESHOLD", 16)
+
+    with claim_check_dynamodb_stub, claim_check_s3_stub:
+        handler(event_success, context)
+
+
+def test_results_cache_eviction() -> None:
+    fifo_results_cache = ResultsCache(policy="fifo", size=2)
+    lru_results_cache = ResultsCache(policy="lru", size=2)
+
+    for results_cache in [fifo_results_cache, lru_results_cache]:
+        results_cache.put("a", "1")
+        results_cache.put("b", "2")
+        results_cache.get("a")
+        results_cache.put("c", "3")
+
+    assert fifo_results_cache.get("a") is None  # nosec
+    assert lru_results_cache.get("b") is None  # nosec
+    assert lru_results_cache.get("a") == "1"  # nosec
+
+
+def test_results_cache_threads() -> None:
+    results_cache = ResultsCache(size=4)
+
+    def use_results_cache(worker: int) -> None:
+        for index in range(2000):
+            key = str((worker + index) % 8)
+
+            if results_cache.get(key) is None:
+                results_cache.put(key, key)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        list(executor.map(use_results_cache, range(8)))
+
+    assert results_cache.hits + results_cache.misses == 16000  # nosec
+    assert results_cache.evictions < results_cache.misses  # nosec
@@ -1,15 +1,31 @@
 from infrastructure.main import (
     InfrastructureStack,
 )
+from infrastructure.event_processing.main import (
+    JOB_HANDLERS,
+)
+from event_processing.main import (
+    JOB_HANDLERS as FUNCTION_JOB_HANDLERS,
+)
 from aws_cdk import (
     App,
 )
+from aws_cdk.aws_dynamodb import (
+    BillingMode,
+)
+from aws_cdk.aws_lambda import (
+    Architecture,
+)
 from aws_cdk.assertions import (
     Match,
     Template,
 )
+from json import (
+    dumps,
+)
 from pytest import (
     fixture,
+    raises,
 )
 
 
@@ -26,6 +42,37 @@ def template() -> Template:
     yield template
 
 
+@fixture
+def options_template() -> Template:
+    app = App()
+    stack = InfrastructureStack(
+        app,
+        "AsynchronousEventProcessingAPIGatewayLambda",
+        api_cache_enabled=True,
+        batch_size=50,
+        billing_mode=BillingMode.PAY_PER_REQUEST,
+        function_settings={
+            "event_processing": {
+                "architecture": Architecture.ARM_64,
+                "ephemeral_storage_size": 1024,
+                "memory_size": 1769,
+            },
+        },
+        max_batching_window=5,
+        max_concurrency=20,
+        metrics_dimensions={
+            "Environment": "test",
+        },
+        queue_enabled=True,
+        results_cache_enabled=True,
+        results_cache_policy="fifo",
+        description="Asynchronous Event Processing with API Gateway and Lambda"
+    )
+    options_template = Template.from_stack(stack)
+
+    yield options_template
+
+
 def test_jobs_api_is_setup(template: Template) -> None:
     template.has_resource("AWS::ApiGateway::Method", {
         "Properties": {
@@ -36,7 +83,80 @@ def test_jobs_api_is_setup(template: Template) -> None:
     template.has_resource("AWS::ApiGateway::Method", {
         "Properties": {
             "AuthorizationType": "AWS_IAM",
+            "HttpMethod": "GET",
+            "RequestParameters": {
+                "method.request.querystring.cursor": False,
+                "method.request.querystring.ids": False,
+                "method.request.querystring.limit": False,
+                "method.request.querystring.since": False,
+                "method.request.querystring.status": False,
+            },
+        },
+    })
+    template.has_resource("AWS::ApiGateway::Method", {
+        "Properties": {
+            "AuthorizationType": "AWS_IAM",
+            "HttpMethod": "POST",
+            "RequestParameters": {
+                "method.request.header.Idempotency-Key": False,
+            },
+        },
+    })
+    template.has_resource("AWS::ApiGateway::Method", {
+        "Properties": Match.object_like({
             "HttpMethod": "POST",
+            "Integration": Match.object_like({
+                "IntegrationResponses": Match.array_with([
+                    Match.object_like({
+                        "ResponseParameters": {
+                            "method.response.header.Retry-After": "'5'",
+                        },
+                        "SelectionPattern": "Conflict: .*",
+                        "StatusCode": "409",
+                    }),
+                ]),
+            }),
+            "MethodResponses": Match.array_with([
+                Match.object_like({
+                    "ResponseParameters": Match.object_like({
+                        "method.response.header.Retry-After": True,
+                    }),
+                    "StatusCode": "409",
+                }),
+            ]),
+        }),
+    })
+    template.has_resource("AWS::ApiGateway::Model", {
+        "Properties": {
+            "Name": "JobsBatchRequest",
+            "Schema": Match.object_like({
+                "items": Match.object_like({
+                    "additionalProperties": False,
+                    "required": [
+                        "seconds",
+                    ],
+                }),
+                "maxItems": 100,
+                "minItems": 1,
+                "type": "array",
+            }),
+        },
+    })
+    template.has_resource("AWS::ApiGateway::Model", {
+        "Properties": {
+            "Name": "JobsRequest",
+            "Schema": Match.object_like({
+                "additionalProperties": False,
+                "required": [
+                    "seconds",
+                ],
+                "type": "object",
+            }),
+        },
+    })
+    template.has_resource("AWS::ApiGateway::Resource", {
+        "Properties": {
+            "PathPart": "batch",
         },
     })
     template.has_resource("AWS::ApiGateway::Resource", {
@@ -146,21 +266,171 @@ def test_jobs_functions_are_setup(template: Template) -> None:
     })
     template.has_resource("AWS::Lambda::Function", {
         "Properties": {
+            "Environment": {
+                "Variables": Match.object_like({
+                    "CHECKPOINT_MARGIN": "10",
+                    "MAX_WORKERS": "8",
+                    "METRICS_DIMENSIONS": "{}",
+                    "METRICS_NAMESPACE": "AsynchronousEventProcessing",
+                }),
+            },
             "Timeout": 300,
+            "TracingConfig": {
+                "Mode": "Active",
+            },
         },
     })
+    template.has_resource("AWS::IAM::Policy", {
+        "Properties": Match.object_like({
+            "PolicyDocument": Match.object_like({
+                "Statement": [
+                    Match.object_like({
+                        "Action": "lambda:InvokeFunction",
+                        "Resource": {
+                            "Fn::GetAtt": [
+                                Match.string_like_regexp(
+                                    "EventProcessingFunction"),
+                                "Arn",
+                            ],
+                        },
+                    }),
+                ],
+            }),
+            "PolicyName": Match.string_like_regexp(
+                "EventProcessingFunctionPolicy"),
+        }),
+    })
     template.has_resource("AWS::Lambda::Function", {
         "Properties": {
             "Timeout": 5,
         },
     })
-    template.resource_count_is("AWS::Events::EventBus", 1)
+    template.has_resource("AWS::Lambda::Function", {
+        "Properties": {
+            "Environment": {
+                "Variables": Match.object_like({
+                    "FUNCTION_NAME": Match.any_value(),
+                    "PACK_SIZE": "1",
+                }),
+            },
+            "Timeout": 29,
+        },
+    })
+    template.has_resource("AWS::Lambda::EventInvokeConfig", {
+        "Properties": Match.object_like({
+            "DestinationConfig": {
+                "OnFailure": Match.any_value(),
+                "OnSuccess": {
+                    "Destination": {
+                        "Fn::GetAtt": [
+                            Match.string_like_regexp("JobsEventBus"),
+                            "Arn",
+                        ],
+                    },
+                },
+            },
+        }),
+    })
+    template.resource_count_is("AWS::Events::EventBus", 2)
     template.resource_count_is("AWS::Lambda::EventInvokeConfig", 2)
+    template.resource_count_is("AWS::Lambda::LayerVersion", 2)
+    template.resource_count_is("AWS::Lambda::EventSourceMapping", 1)
+    template.resource_count_is("AWS::SQS::Queue", 0)
+
+
+def test_jobs_options_are_disabled(template: Template) -> None:
+    template.resource_count_is("AWS::DynamoDB::Table", 1)
+
+
+def test_results_bucket_is_setup(template: Template) -> None:
+    template.has_resource("AWS::ApiGateway::Method", {
+        "Properties": {
+            "HttpMethod": "GET",
+            "Integration": Match.object_like({
+                "Type": "AWS",
+                "Uri": {
+                    "Fn::Join": [
+                        "",
+                        Match.array_with([
+                            ":lambda:path/2015-03-31/functions/",
+                        ]),
+                    ],
+                },
+            }),
+            "RequestParameters": {
+                "method.request.querystring.view": False,
+                "method.request.querystring.wait": False,
+            },
+            "ResourceId": {
+                "Ref": Match.string_like_regexp("jobId"),
+            },
+        },
+    })
+    template.has_resource("AWS::Lambda::Function", {
+        "Properties": {
+            "Environment": {
+                "Variables": Match.object_like({
+                    "RESULTS_BUCKET_NAME": Match.any_value(),
+                    "RESULTS_SIZE_THRESHOLD": "4096",
+                }),
+            },
+        },
+    })
+    template.has_resource("AWS::Lambda::Function", {
+        "Properties": {
+            "Environment": {
+                "Variables": Match.object_like({
+                    "MAX_WAIT": "25",
+                }),
+            },
+            "Timeout": 29,
+        },
+    })
+    template.has_resource("AWS::S3::Bucket", {
+        "DeletionPolicy": "Delete",
+        "Properties": Match.object_like({
+            "PublicAccessBlockConfiguration": {
+                "BlockPublicAcls": True,
+                "BlockPublicPolicy": True,
+                "IgnorePublicAcls": True,
+                "RestrictPublicBuckets": True,
+            },
+        }),
+    })
 
 
 def test_jobs_table_is_setup(template: Template) -> None:
     template.has_resource("AWS::DynamoDB::Table", {
         "DeletionPolicy": "Delete",
+        "Properties": Match.object_like({
+            "GlobalSecondaryIndexes": [
+                Match.object_like({
+                    "IndexName": "StatusIndex",
+                    "KeySchema": [
+                        {
+                            "AttributeName": "g",
+                            "KeyType": "HASH",
+                        },
+                        {
+                            "AttributeName": "t",
+                            "KeyType": "RANGE",
+                        },
+                    ],
+                    "Projection": {
+                        "NonKeyAttributes": [
+                            "s",
+                            "u",
+                            "v",
+                        ],
+                        "ProjectionType": "INCLUDE",
+                    },
+                }),
+            ],
+            "TimeToLiveSpecification": {
+                "AttributeName": "ttl",
+                "Enabled": True,
+            },
+        }),
         "UpdateReplacePolicy": "Delete",
     })
     template.has_resource("AWS::KMS::Alias", {
@@ -175,3 +445,937 @@ def test_jobs_table_is_setup(template: Template) -> None:
         },
         "UpdateReplacePolicy": "Delete",
     })
+
+
+def test_jobs_archive_is_setup(template: Template) -> None:
+    template.has_resource("AWS::DynamoDB::Table", {
+        "Properties": Match.object_like({
+            "StreamSpecification": {
+                "StreamViewType": "NEW_AND_OLD_IMAGES",
+            },
+        }),
+    })
+    template.has_resource("AWS::Glue::Table", {
+        "Properties": Match.object_like({
+            "TableInput": Match.object_like({
+                "PartitionKeys": [
+                    {
+                        "Name": "date",
+                        "Type": "string",
+                    },
+                ],
+                "StorageDescriptor": Match.object_like({
+                    "Columns": Match.array_with([
+                        {
+                            "Name": "created_at",
+                            "Type": "bigint",
+                        },
+                    ]),
+                }),
+            }),
+        }),
+    })
+    template.has_resource("AWS::KinesisFirehose::DeliveryStream", {
+        "Properties": Match.object_like({
+            "ExtendedS3DestinationConfiguration": Match.object_like({
+                "BufferingHints": {
+                    "IntervalInSeconds": 900,
+                    "SizeInMBs": 64,
+                },
+                "Prefix": "jobs/date=!{timestamp:yyyy-MM-dd}/",
+            }),
+        }),
+    })
+    template.has_resource("AWS::Lambda::EventSourceMapping", {
+        "Properties": Match.object_like({
+            "FilterCriteria": {
+                "Filters": [
+                    {
+                        "Pattern": Match.string_like_regexp("REMOVE"),
+                    },
+                ],
+            },
+            "StartingPosition": "TRIM_HORIZON",
+        }),
+    })
+    template.has_resource("AWS::Lambda::Function", {
+        "Properties": {
+            "Environment": {
+                "Variables": Match.object_like({
+                    "JOB_TTL": "2592000",
+                }),
+            },
+        },
+    })
+    template.has_resource("AWS::Lambda::Function", {
+        "Properties": Match.object_like({
+            "Environment": {
+                "Variables": Match.object_like({
+                    "ARCHIVE_BUCKET_NAME": Match.any_value(),
+                    "DELIVERY_STREAM_NAME": Match.any_value(),
+                    "RESULTS_BUCKET_NAME": Match.any_value(),
+                }),
+            },
+        }),
+    })
+    template.has_resource("AWS::S3::Bucket", {
+        "Properties": Match.object_like({
+            "LifecycleConfiguration": {
+                "Rules": [
+                    {
+                        "ExpirationInDays": 37,
+                        "Status": "Enabled",
+                    },
+                ],
+            },
+        }),
+    })
+    template.has_resource("AWS::S3::Bucket", {
+        "Properties": Match.object_like({
+            "LifecycleConfiguration": {
+                "Rules": [
+                    {
+                        "Status": "Enabled",
+                        "Transitions": [
+                            {
+                                "StorageClass": "GLACIER_IR",
+                                "TransitionInDays": 90,
+                            },
+                        ],
+                    },
+                ],
+            },
+        }),
+    })
+
+
+def test_jobs_table_scaling_is_setup(template: Template) -> None:
+    scalable_target = "AWS::ApplicationAutoScaling::ScalableTarget"
+    scaling_policy = "AWS::ApplicationAutoScaling::ScalingPolicy"
+
+    for capacity in ["Read", "Write"]:
+        template.has_resource(scalable_target, {
+            "Properties": Match.object_like({
+                "MaxCapacity": 100,
+                "MinCapacity": 5,
+                "ScalableDimension": f"dynamodb:table:{capacity}CapacityUnits",
+            }),
+        })
+        template.has_resource(scalable_target, {
+            "Properties": Match.object_like({
+                "ResourceId": {
+                    "Fn::Join": [
+                        "",
+                        Match.array_with([
+                            "/index/StatusIndex",
+                        ]),
+                    ],
+                },
+                "ScalableDimension": f"dynamodb:index:{capacity}CapacityUnits",
+            }),
+        })
+        template.has_resource(scaling_policy, {
+            "Properties": Match.object_like({
+                "PolicyType": "TargetTrackingScaling",
+                "TargetTrackingScalingPolicyConfiguration": {
+                    "PredefinedMetricSpecification": {
+                        "PredefinedMetricType": (f"DynamoDB{capacity}"
+                                                 "CapacityUtilization"),
+                    },
+                    "TargetValue": 70,
+                },
+            }),
+        })
+    template.resource_count_is(scalable_target, 4)
+    template.resource_count_is(scaling_policy, 4)
+
+
+def test_jobs_table_is_on_demand(options_template: Template) -> None:
+    options_template.has_resource("AWS::DynamoDB::Table", {
+        "Properties": Match.object_like({
+            "BillingMode": "PAY_PER_REQUEST",
+            "StreamSpecification": Match.any_value(),
+        }),
+    })
+    options_template.resource_count_is(
+        "AWS::ApplicationAutoScaling::ScalableTarget", 0)
+
+
+def test_jobs_api_cache_is_setup(options_template: Template) -> None:
+    options_template.has_resource("AWS::ApiGateway::Method", {
+        "Properties": Match.object_like({
+            "HttpMethod": "GET",
+            "Integration": Match.object_like({
+                "CacheKeyParameters": [
+                    "method.request.path.jobId",
+                    "method.request.querystring.view",
+                ],
+                "IntegrationResponses": Match.array_with([
+                    Match.object_like({
+                        "ResponseParameters": {
+                            "method.response.header.Retry-After": "'5'",
+                        },
+                        "SelectionPattern": "Not Ready: .*",
+                        "StatusCode": "202",
+                    }),
+                ]),
+            }),
+            "MethodResponses": Match.array_with([
+                Match.object_like({
+                    "ResponseParameters": Match.object_like({
+                        "method.response.header.Retry-After": True,
+                    }),
+                    "StatusCode": "202",
+                }),
+            ]),
+        }),
+    })
+
+    methods = options_template.find_resources("AWS::ApiGateway::Method")
+    not_ready_status_codes = [
+        integration_response["StatusCode"]
+        for method in methods.values()
+        for integration_response in method["Properties"].get(
+            "Integration", dict()).get("IntegrationResponses", list())
+        if integration_response.get("SelectionPattern") == "Not Ready: .*"
+    ]
+
+    assert not_ready_status_codes  # nosec
+    assert "200" not in not_ready_status_codes  # nosec
+    options_template.has_resource("AWS::ApiGateway::Stage", {
+        "Properties": Match.object_like({
+            "CacheClusterEnabled": True,
+            "CacheClusterSize": "0.5",
+            "MethodSettings": Match.array_with([
+                Match.object_like({
+                    "CacheDataEncrypted": True,
+                    "CacheTtlInSeconds": 300,
+                    "CachingEnabled": True,
+                    "HttpMethod": "GET",
+                    "ResourcePath": "/~1jobs~1{jobId}",
+                }),
+            ]),
+        }),
+    })
+    options_template.has_resource("AWS::Lambda::Function", {
+        "Properties": {
+            "Environment": {
+                "Variables": Match.object_like({
+                    "CACHE_ENABLED": "true",
+                }),
+            },
+        },
+    })
+
+
+def test_webhooks_are_setup() -> None:
+    app = App()
+    stack = InfrastructureStack(
+        app,
+        "AsynchronousEventProcessingAPIGatewayLambda",
+        webhooks=[
+            {
+                "api_key_secret_name": "webhook",
+                "endpoint": "https://example.com/jobs",
+                "name": "Example",
+                "rate_limit": 5,
+                "statuses": [
+                    "Success",
+                ],
+            },
+        ],
+    )
+    template = Template.from_stack(stack)
+
+    template.has_resource("AWS::Events::ApiDestination", {
+        "Properties": Match.object_like({
+            "HttpMethod": "POST",
+            "InvocationEndpoint": "https://example.com/jobs",
+            "InvocationRateLimitPerSecond": 5,
+        }),
+    })
+    template.has_resource("AWS::Events::Rule", {
+        "Properties": Match.object_like({
+            "EventPattern": {
+                "detail": {
+                    "responsePayload": {
+                        "status": [
+                            "Success",
+                        ],
+                    },
+                },
+                "detail-type": [
+                    "Lambda Function Invocation Result - Success",
+                ],
+            },
+            "Targets": [
+                Match.object_like({
+                    "DeadLetterConfig": Match.any_value(),
+                    "InputPath": "$.detail.responsePayload",
+                }),
+            ],
+        }),
+    })
+    template.resource_count_is("AWS::Events::Connection", 1)
+
+    with raises(ValueError, match="jobs queue"):
+        InfrastructureStack(
+            app,
+            "WebhooksQueue",
+            queue_enabled=True,
+            webhooks=[
+                {
+                    "api_key_secret_name": "webhook",
+                    "endpoint": "https://example.com/jobs",
+                    "name": "Example",
+                    "rate_limit": 5,
+                    "statuses": [
+                        "Success",
+                    ],
+                },
+            ],
+        )
+
+
+def test_functions_tuning_is_setup(options_template: Template) -> None:
+    options_template.has_resource("AWS::Lambda::Function", {
+        "Properties": Match.object_like({
+            "Architectures": [
+                "arm64",
+            ],
+            "EphemeralStorage": {
+                "Size": 1024,
+            },
+            "Layers": [
+                Match.any_value(),
+                {
+                    "Ref": Match.string_like_regexp("PowertoolsLayerArm64"),
+                },
+            ],
+            "MemorySize": 1769,
+        }),
+    })
+    options_template.has_resource("AWS::Lambda::Function", {
+        "Properties": Match.object_like({
+            "Architectures": [
+                "x86_64",
+            ],
+            "MemorySize": 128,
+        }),
+    })
+    options_template.has_resource("AWS::Lambda::LayerVersion", {
+        "Properties": Match.object_like({
+            "CompatibleArchitectures": [
+                "arm64",
+            ],
+        }),
+    })
+    options_template.resource_count_is("AWS::Lambda::LayerVersion", 3)
+
+    with raises(ValueError, match="^memory is not a valid function setting$"):
+        InfrastructureStack(
+            App(),
+            "FunctionSettings",
+            function_settings={
+                "job_lookup": {
+                    "memory": 256,
+                },
+            },
+        )
+
+
+def test_metrics_are_setup(options_template: Template) -> None:
+    options_template.has_resource("AWS::Lambda::Function", {
+        "Properties": {
+            "Environment": {
+                "Variables": Match.object_like({
+                    "METRICS_DIMENSIONS": "{\"Environment\": \"test\"}",
+                }),
+            },
+        },
+    })
+
+
+def test_jobs_queue_is_setup(options_template: Template) -> None:
+    options_template.has_resource("AWS::Lambda::Function", {
+        "Properties": {
+            "Environment": {
+                "Variables": Match.object_like({
+                    "QUEUE_URL": Match.any_value(),
+                }),
+            },
+        },
+    })
+    options_template.has_resource("AWS::Lambda::EventSourceMapping", {
+        "Properties": {
+            "BatchSize": 50,
+            "FunctionResponseTypes": [
+                "ReportBatchItemFailures",
+            ],
+            "MaximumBatchingWindowInSeconds": 5,
+            "ScalingConfig": {
+                "MaximumConcurrency": 20,
+            },
+        },
+    })
+    options_template.has_resource("AWS::SQS::Queue", {
+        "Properties": {
+            "MessageRetentionPeriod": 21600,
+            "RedrivePolicy": {
+                "deadLetterTargetArn": Match.any_value(),
+                "maxReceiveCount": 1,
+            },
+            "SqsManagedSseEnabled": True,
+            "VisibilityTimeout": 1800,
+        },
+    })
+    options_template.resource_count_is("AWS::Lambda::EventSourceMapping", 3)
+    options_template.resource_count_is("AWS::SQS::Queue", 2)
+
+
+def test_results_cache_is_setup(options_template: Template) -> None:
+    options_template.has_resource("AWS::DynamoDB::Table", {
+        "Properties": Match.object_like({
+            "BillingMode": "PAY_PER_REQUEST",
+            "TimeToLiveSpecification": {
+                "AttributeName": "ttl",
+                "Enabled": True,
+            },
+        }),
+    })
+    options_template.has_resource("AWS::Lambda::Function", {
+        "Properties": {
+            "Environment": {
+                "Variables": Match.object_like({
+                    "RESULTS_CACHE_POLICY": "fifo",
+                    "RESULTS_CACHE_SIZE": "128",
+                    "RESULTS_CACHE_TABLE_NAME": Match.any_value(),
+                    "RESULTS_CACHE_TTL": "3600",
+                }),
+            },
+        },
+    })
+    options_template.resource_count_is("AWS::DynamoDB::Table", 2)
+
+
+def test_job_types_are_setup() -> None:
+    app = App()
+    stack = InfrastructureStack(
+        app,
+        "AsynchronousEventProcessingAPIGatewayLambda",
+        job_types=[
+            {
+                "memory_size": 1024,
+                "name": "Heavy",
+                "reserved_concurrent_executions": 10,
+                "timeout": 900,
+            },
+        ],
+    )
+    template = Template.from_stack(stack)
+
+    template.has_resource("AWS::Lambda::Function", {
+        "Properties": Match.object_like({
+            "Environment": {
+                "Variables": Match.object_like({
+                    "JOB_HANDLER": "sleep",
+                    "JOB_TYPE": "Heavy",
+                }),
+            },
+            "MemorySize": 1024,
+            "ReservedConcurrentExecutions": 10,
+            "Timeout": 900,
+        }),
+    })
+    template.has_resource("AWS::Lambda::Function", {
+        "Properties": Match.object_like({
+            "Environment": {
+                "Variables": Match.object_like({
+                    "TARGETS": Match.any_value(),
+                }),
+            },
+        }),
+    })
+    template.has_resource("AWS::ApiGateway::Model", {
+        "Properties": Match.object_like({
+            "Schema": Match.object_like({
+                "properties": Match.object_like({
+                    "type": {
+                        "enum": [
+                            "Heavy",
+                        ],
+                        "type": "string",
+                    },
+                }),
+            }),
+        }),
+    })
+    template.resource_count_is("AWS::Lambda::EventInvokeConfig", 3)
+
+    with raises(ValueError, match="jobs queue"):
+        InfrastructureStack(
+            app,
+            "JobTypesQueue",
+            job_types=[
+                {
+                    "name": "Heavy",
+                },
+            ],
+            queue_enabled=True,
+        )
+
+    with raises(ValueError, match="^slep is not a valid job handler$"):
+        InfrastructureStack(
+            app,
+            "JobTypesHandler",
+            job_types=[
+                {
+                    "handler": "slep",
+                    "name": "Heavy",
+                },
+            ],
+        )
+
+    assert JOB_HANDLERS == list(FUNCTION_JOB_HANDLERS)  # nosec
+
+    with raises(ValueError, match="checkpoint margin"):
+        InfrastructureStack(
+            app,
+            "JobTypesTimeout",
+            checkpoint_margin=10,
+            job_types=[
+                {
+                    "name": "Heavy",
+                    "timeout": 10,
+                },
+            ],
+        )
+
+
+def test_priority_lanes_are_setup() -> None:
+    app = App()
+    stack = InfrastructureStack(
+        app,
+        "AsynchronousEventProcessingAPIGatewayLambda",
+        job_types=[
+            {
+                "name": "Heavy",
+                "reserved_concurrent_executions": 10,
+            },
+        ],
+        priority_lanes=[
+            {
+                "max_event_age": 300,
+                "name": "High",
+                "reserved_concurrent_executions": 20,
+            },
+        ],
+    )
+    template = Template.from_stack(stack)
+
+    for job_type, reserved_concurrent_executions in [
+        ("default", 18),
+        ("Heavy", 1),
+    ]:
+        template.has_resource("AWS::Lambda::Function", {
+            "Properties": Match.object_like({
+                "Environment": {
+                    "Variables": Match.object_like({
+                        "JOB_TYPE": job_type,
+                        "PRIORITY": "High",
+                    }),
+                },
+                "ReservedConcurrentExecutions": reserved_concurrent_executions,
+            }),
+        })
+
+    template.has_resource("AWS::Lambda::EventInvokeConfig", {
+        "Properties": Match.object_like({
+            "MaximumEventAgeInSeconds": 300,
+        }),
+    })
+    template.has_resource("AWS::Lambda::Function", {
+        "Properties": Match.object_like({
+            "Environment": {
+                "Variables": Match.object_like({
+                    "LANES": Match.any_value(),
+                }),
+            },
+        }),
+    })
+    template.has_resource("AWS::ApiGateway::Model", {
+        "Properties": Match.object_like({
+            "Schema": Match.object_like({
+                "properties": Match.object_like({
+                    "priority": {
+                        "enum": [
+                            "High",
+                        ],
+                        "type": "string",
+                    },
+                }),
+            }),
+        }),
+    })
+    template.resource_count_is("AWS::Lambda::EventInvokeConfig", 5)
+
+    with raises(ValueError, match="account concurrency limit"):
+        InfrastructureStack(
+            app,
+            "PriorityLanesConcurrency",
+            job_types=[
+                {
+                    "name": name,
+                }
+                for name in ["Heavy", "Light"]
+            ],
+            priority_lanes=[
+                {
+                    "name": name,
+                }
+                for name in ["High", "Low"]
+            ],
+        )
+
+
+def test_usage_plans_are_setup() -> None:
+    app = App()
+    stack = InfrastructureStack(
+        app,
+        "AsynchronousEventProcessingAPIGatewayLambda",
+        api_key_required_methods=[
+            "job_id",
+            "jobs",
+        ],
+        api_usage_plans=[
+            {
+                "api_keys": [
+                    "Tenant",
+                ],
+                "burst_limit": 20,
+                "job_id_burst_limit": 50,
+                "job_id_rate_limit": 100,
+                "jobs_burst_limit": 5,
+                "jobs_rate_limit": 10,
+                "name": "Standard",
+                "quota_limit": 10000,
+                "rate_limit": 40,
+            },
+        ],
+    )
+    template = Template.from_stack(stack)
+
+    template.has_resource("AWS::ApiGateway::UsagePlan", {
+        "Properties": Match.object_like({
+            "ApiStages": [
+                Match.object_like({
+                    "Throttle": {
+                        "/jobs/POST": {
+                            "BurstLimit": 5,
+                            "RateLimit": 10,
+                        },
+                        "/jobs/{jobId}/GET": {
+                            "BurstLimit": 50,
+                            "RateLimit": 100,
+                        },
+                    },
+                }),
+            ],
+            "Quota": {
+                "Limit": 10000,
+                "Period": "DAY",
+            },
+            "Throttle": {
+                "BurstLimit": 20,
+                "RateLimit": 40,
+            },
+            "UsagePlanName": "Standard",
+        }),
+    })
+    template.has_resource("AWS::ApiGateway::ApiKey", {
+        "Properties": Match.object_like({
+            "Name": "Tenant",
+        }),
+    })
+    template.resource_count_is("AWS::ApiGateway::UsagePlanKey", 1)
+
+    for response_type, retry_after in [
+        ("QUOTA_EXCEEDED", "'3600'"),
+        ("THROTTLED", "'1'"),
+    ]:
+        template.has_resource("AWS::ApiGateway::GatewayResponse", {
+            "Properties": Match.object_like({
+                "ResponseParameters": {
+                    "gatewayresponse.header.Retry-After": retry_after,
+                },
+                "ResponseType": response_type,
+                "StatusCode": "429",
+            }),
+        })
+
+    assert sorted(  # nosec
+        method["Properties"]["HttpMethod"]
+        for method in template.find_resources(
+            "AWS::ApiGateway::Method").values()
+        if method["Properties"].get("ApiKeyRequired")
+    ) == ["GET", "POST"]
+
+    with raises(ValueError, match="usage plans"):
+        InfrastructureStack(
+            app,
+            "ApiKeyRequiredMethods",
+            api_key_required_methods=[
+                "jobs",
+            ],
+        )
+
+    with raises(ValueError, match="^POST /job is not a valid jobs API"):
+        InfrastructureStack(
+            app,
+            "ApiKeyRequiredUnknownMethods",
+            api_key_required_methods=[
+                "POST /job",
+            ],
+            api_usage_plans=[
+                {
+                    "api_keys": [
+                        "Tenant",
+                    ],
+                    "name": "Tenant",
+                },
+            ],
+        )
+
+
+def test_job_replay_is_setup() -> None:
+    app = App()
+    stack = InfrastructureStack(
+        app,
+        "AsynchronousEventProcessingAPIGatewayLambda",
+        replay_batch_size=5,
+        replay_enabled=True,
+        replay_max_concurrency=3,
+        replay_rate=1.5,
+    )
+    template = Template.from_stack(stack)
+
+    failed_jobs_event_pattern = {
+        "detail": {
+            "$or": [
+                {
+                    "requestPayload": {
+                        "requestContext": {
+                            "functionArn": [
+                                {
+                                    "exists": True,
+                                },
+                            ],
+                        },
+                    },
+                    "responsePayload": {
+                        "status": [
+                            "Failure",
+                            "TimedOut",
+                        ],
+                    },
+                },
+                {
+                    "requestPayload": {
+                        "id": [
+                            {
+                                "exists": True,
+                            },
+                        ],
+                    },
+                    "responsePayload": {
+                        "status": [
+                            "Failure",
+                        ],
+                    },
+                },
+            ],
+        },
+        "detail-type": [
+            "Lambda Function Invocation Result - Success",
+        ],
+    }
+
+    template.has_resource("AWS::Events::Archive", {
+        "Properties": Match.object_like({
+            "EventPattern": failed_jobs_event_pattern,
+            "SourceArn": {
+                "Fn::GetAtt": [
+                    Match.string_like_regexp("ProcessingJobsEventBus"),
+                    "Arn",
+                ],
+            },
+        }),
+    })
+    template.has_resource("AWS::Events::Rule", {
+        "Properties": Match.object_like({
+            "EventBusName": {
+                "Ref": Match.string_like_regexp("ProcessingJobsEventBus"),
+            },
+            "EventPattern": {
+                **failed_jobs_event_pattern,
+                "replay-name": [
+                    {
+                        "exists": True,
+                    },
+                ],
+            },
+            "Targets": [
+                Match.object_like({
+                    "Arn": {
+                        "Fn::GetAtt": [
+                            Match.string_like_regexp("JobReplayQueue"),
+                            "Arn",
+                        ],
+                    },
+                }),
+            ],
+        }),
+    })
+    template.has_resource("AWS::Lambda::EventSourceMapping", {
+        "Properties": Match.object_like({
+            "BatchSize": 5,
+            "ScalingConfig": {
+                "MaximumConcurrency": 3,
+            },
+        }),
+    })
+    template.has_resource("AWS::Lambda::Function", {
+        "Properties": Match.object_like({
+            "Environment": {
+                "Variables": Match.object_like({
+                    "REPLAY_CONCURRENCY": "3",
+                    "REPLAY_RATE": "1.5",
+                }),
+            },
+        }),
+    })
+
+    for output in [
+        "FailedJobsArchive",
+        "JobReplayRule",
+        "JobsEventBus",
+        "JobsTable",
+    ]:
+        template.has_output(output, Match.any_value())
+
+    template.resource_count_is("AWS::SQS::Queue", 2)
+
+    with raises(ValueError, match="maximum concurrency"):
+        InfrastructureStack(
+            app,
+            "JobReplayConcurrency",
+            replay_enabled=True,
+            replay_max_concurrency=1,
+        )
+
+    with raises(ValueError, match="job replay timeout"):
+        InfrastructureStack(
+            app,
+            "JobReplayTimeout",
+            replay_batch_size=10,
+            replay_enabled=True,
+            replay_rate=0.1,
+        )
+
+    with raises(ValueError, match="jobs queue"):
+        InfrastructureStack(
+            app,
+            "JobReplayQueue",
+            queue_enabled=True,
+            replay_enabled=True,
+        )
+
+
+def test_job_stats_are_setup() -> None:
+    app = App()
+    stack = InfrastructureStack(
+        app,
+        "AsynchronousEventProcessingAPIGatewayLambda",
+        stats_enabled=True,
+        stats_ttl=86400,
+    )
+    template = Template.from_stack(stack)
+
+    template.has_resource("AWS::DynamoDB::Table", {
+        "Properties": Match.object_like({
+            "BillingMode": "PAY_PER_REQUEST",
+            "KeySchema": [
+                {
+                    "AttributeName": "d",
+                    "KeyType": "HASH",
+                },
+                {
+                    "AttributeName": "m",
+                    "KeyType": "RANGE",
+                },
+            ],
+            "TimeToLiveSpecification": {
+                "AttributeName": "ttl",
+                "Enabled": True,
+            },
+        }),
+    })
+    template.has_resource("AWS::Lambda::EventSourceMapping", {
+        "Properties": Match.object_like({
+            "EventSourceArn": {
+                "Fn::GetAtt": [
+                    Match.string_like_regexp("JobsTable"),
+                    "StreamArn",
+                ],
+            },
+            "FilterCriteria": {
+                "Filters": [
+                    {
+                        "Pattern": dumps({
+                            "eventName": [
+                                "INSERT",
+                                "MODIFY",
+                            ],
+                        }, separators=(",", ":")),
+                    },
+                ],
+            },
+            "DestinationConfig": {
+                "OnFailure": {
+                    "Destination": {
+                        "Fn::GetAtt": [
+                            Match.string_like_regexp(
+                                "JobStatsDeadLetterQueue"),
+                            "Arn",
+                        ],
+                    },
+                },
+            },
+            "MaximumRecordAgeInSeconds": 3600,
+            "MaximumRetryAttempts": 2,
+            "StartingPosition": "TRIM_HORIZON",
+        }),
+    })
+    template.has_resource("AWS::Lambda::Function", {
+        "Properties": Match.object_like({
+            "Environment": {
+                "Variables": Match.object_like({
+                    "STATS_TTL": "86400",
+                }),
+            },
+        }),
+    })
+    template.has_resource("AWS::ApiGateway::Resource", {
+        "Properties": Match.object_like({
+            "PathPart": "stats",
+        }),
+    })
+    template.has_resource("AWS::ApiGateway::Method", {
+        "Properties": Match.object_like({
+            "AuthorizationType": "AWS_IAM",
+            "HttpMethod": "GET",
+            "ResourceId": {
+                "Ref": Match.string_like_regexp("jobsstats"),
+            },
+        }),
+    })
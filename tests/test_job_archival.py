@@ -0,0 +1,196 @@
+from aws_lambda_powertools.utilities.typing import (
+    LambdaContext,
+)
+from botocore.stub import (
+    Stubber,
+)
+from job_archival.main import (
+    archive_record,
+    archive_results,
+    firehose,
+    handler,
+    s3,
+)
+from json import (
+    dumps,
+)
+from pytest import (
+    MonkeyPatch,
+    fixture,
+)
+from tests.fixtures import (
+    context,
+)
+
+
+@fixture
+def event() -> dict:
+    event = {
+        "Records": [
+            {
+                "dynamodb": {
+                    "OldImage": {
+                        "id": {
+                            "S": "1",
+                        },
+                        "parameters": {
+                            "S": dumps({
+                                "seconds": 301,
+                            }),
+                        },
+                        "status": {
+                            "S": "Failure",
+                        },
+                    },
+                },
+                "eventName": "REMOVE",
+            },
+            {
+                "dynamodb": {
+                    "OldImage": {
+                        "id": {
+                            "S": "idempotency#2",
+                        },
+                        "ttl": {
+                            "N": "1",
+                        },
+                    },
+                },
+                "eventName": "REMOVE",
+            },
+        ],
+    }
+
+    yield event
+
+
+@fixture
+def firehose_stub() -> Stubber:
+    firehose_stub = Stubber(firehose)
+    records = [
+        archive_record({
+            "id": "1",
+            "parameters": {
+                "seconds": 301,
+            },
+            "status": "Failure",
+        }),
+    ]
+
+    firehose_stub.add_response(
+        "put_record_batch",
+        expected_params={
+            "DeliveryStreamName": "jobs",
+            "Records": records,
+        },
+        service_response={
+            "FailedPutCount": 1,
+            "RequestResponses": [
+                {
+                    "ErrorCode": "ServiceUnavailableException",
+                    "ErrorMessage": "Slow down.",
+                },
+            ],
+        },
+    )
+    firehose_stub.add_response(
+        "put_record_batch",
+        expected_params={
+            "DeliveryStreamName": "jobs",
+            "Records": records,
+        },
+        service_response={
+            "FailedPutCount": 0,
+            "RequestResponses": [
+                {
+                    "RecordId": "1",
+                },
+            ],
+        },
+    )
+
+    yield firehose_stub
+
+
+def test_job_archival(
+    context: LambdaContext,
+    event: dict,
+    firehose_stub: Stubber,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    monkeypatch.setattr("job_archival.main.DELIVERY_STREAM_NAME", "jobs")
+
+    with firehose_stub:
+        handler(event, context)
+
+        firehose_stub.assert_no_pending_responses()
+
+
+def test_archive_record() -> None:
+    record = archive_record({
+        "id": "1",
+        "results": {
+            "message": "I slept for 1 seconds",
+        },
+        "createdAt": 0,
+        "status": "Success",
+        "updatedAt": 1,
+    })
+
+    assert record["Data"].endswith(b"\n")  # nosec
+    assert b'"created_at": 0' in record["Data"]  # nosec
+    assert b'"updated_at": 1' in record["Data"]  # nosec
+
+
+def test_archive_results(monkeypatch: MonkeyPatch) -> None:
+    s3_stub = Stubber(s3)
+
+    monkeypatch.setattr("job_archival.main.ARCHIVE_BUCKET_NAME", "archive")
+    monkeypatch.setattr("job_archival.main.RESULTS_BUCKET_NAME", "results")
+
+    for id in ["1", "2"]:
+        expected_params = {
+            "Bucket": "archive",
+            "CopySource": {
+                "Bucket": "results",
+                "Key": f"results/{id}.json",
+            },
+            "Key": f"results/{id}.json",
+        }
+
+        if id == "1":
+            s3_stub.add_response(
+                "copy_object",
+                expected_params=expected_params,
+                service_response=dict(),
+            )
+        else:
+            s3_stub.add_client_error(
+                "copy_object",
+                expected_params=expected_params,
+                service_error_code="NoSuchKey",
+            )
+
+    with s3_stub:
+        jobs = [
+            archive_results({
+                "id": id,
+                "resultsLocation": f"results/{id}.json",
+                "status": "Success",
+            })
+            for id in ["1", "2"]
+        ]
+
+    s3_stub.assert_no_pending_responses()
+
+    assert [  # nosec
+        job["resultsLocation"]
+        for job in jobs
+    ] == ["s3://archive/results/1.json", "results/2.json"]
+    assert archive_results({  # nosec
+        "id": "3",
+        "status": "Failure",
+    }) == {
+        "id": "3",
+        "status": "Failure",
+    }
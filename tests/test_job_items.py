@@ -0,0 +1,107 @@
+from base64 import (
+    b64encode,
+)
+from job_items.main import (
+    decode_item,
+    decode_stream_item,
+    encode_item,
+    status_key,
+)
+from json import (
+    dumps,
+)
+
+
+def test_item_decoding() -> None:
+    item = {
+        "id": {
+            "S": "1",
+        },
+        "parameters": {
+            "S": dumps({
+                "seconds": 301,
+            }),
+        },
+        "status": {
+            "S": "Failure",
+        },
+    }
+
+    assert decode_item(item) == {  # nosec
+        "id": "1",
+        "parameters": {
+            "seconds": 301,
+        },
+        "status": "Failure",
+    }
+
+
+def test_item_encoding() -> None:
+    results = dumps({
+        "message": "I slept for 1 seconds",
+    })
+    item = encode_item(
+        id="2",
+        parameters={
+            "seconds": 1,
+        },
+        results=results,
+        status="Success",
+    )
+    job = decode_item(item)
+
+    assert set(item) == {"id", "p", "r", "s", "u", "v"}  # nosec
+    assert job.pop("updatedAt") > 0  # nosec
+    assert job == {  # nosec
+        "id": "2",
+        "parameters": {
+            "seconds": 1,
+        },
+        "results": {
+            "message": "I slept for 1 seconds",
+        },
+        "status": "Success",
+    }
+
+
+def test_item_status_key() -> None:
+    item = encode_item(
+        created_at=1,
+        id="2",
+        status="Pending",
+    )
+
+    assert item["g"]["S"] == status_key("2", "Pending")  # nosec
+    assert status_key("2", "Pending").startswith("Pending#")  # nosec
+    assert decode_item(item)["createdAt"] == 1  # nosec
+
+
+def test_stream_item_decoding() -> None:
+    item = encode_item(
+        id="3",
+        parameters={
+            "seconds": 1,
+        },
+        status="Failure",
+        ttl=60,
+    )
+    image = {
+        name: {
+            type: b64encode(value).decode()
+            if type == "B"
+            else value
+            for type, value in attribute.items()
+        }
+        for name, attribute in item.items()
+    }
+    job = decode_stream_item(image)
+
+    assert int(item["ttl"]["N"]) > 0  # nosec
+    assert job.pop("updatedAt") > 0  # nosec
+    assert job == {  # nosec
+        "id": "3",
+        "parameters": {
+            "seconds": 1,
+        },
+        "status": "Failure",
+    }
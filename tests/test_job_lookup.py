@@ -0,0 +1,466 @@
+from aws_lambda_powertools.utilities.typing import (
+    LambdaContext,
+)
+from botocore.stub import (
+    Stubber,
+)
+from job_items.main import (
+    STATUS_ATTRIBUTES,
+    encode_item,
+)
+from job_lookup.main import (
+    dynamodb,
+    handler,
+    s3,
+)
+from json import (
+    loads,
+)
+from pytest import (
+    MonkeyPatch,
+    fixture,
+    raises,
+)
+from tests.fixtures import (
+    context,
+)
+
+
+def request_items(ids: list) -> dict:
+    return {
+        "jobs": {
+            "ExpressionAttributeNames": STATUS_ATTRIBUTES,
+            "Keys": [
+                {
+                    "id": {
+                        "S": id,
+                    },
+                }
+                for id in ids
+            ],
+            "ProjectionExpression": "#id, #s, #status, #u, #v",
+        },
+    }
+
+
+@fixture
+def dynamodb_stub() -> Stubber:
+    dynamodb_stub = Stubber(dynamodb)
+
+    dynamodb_stub.add_response(
+        "batch_get_item",
+        expected_params={
+            "RequestItems": request_items(["1", "2", "3"]),
+        },
+        service_response={
+            "Responses": {
+                "jobs": [
+                    {
+                        "id": {
+                            "S": "1",
+                        },
+                        "status": {
+                            "S": "Success",
+                        },
+                    },
+                ],
+            },
+            "UnprocessedKeys": request_items(["2"]),
+        },
+    )
+    dynamodb_stub.add_response(
+        "batch_get_item",
+        expected_params={
+            "RequestItems": request_items(["2"]),
+        },
+        service_response={
+            "Responses": {
+                "jobs": [
+                    {
+                        "id": {
+                            "S": "2",
+                        },
+                        "s": {
+                            "S": "Failure",
+                        },
+                        "v": {
+                            "N": "2",
+                        },
+                    },
+                ],
+            },
+        },
+    )
+
+    yield dynamodb_stub
+
+
+@fixture
+def job_dynamodb_stub() -> Stubber:
+    job_dynamodb_stub = Stubber(dynamodb)
+
+    job_dynamodb_stub.add_response(
+        "get_item",
+        expected_params={
+            "Key": {
+                "id": {
+                    "S": "1",
+                },
+            },
+            "TableName": "jobs",
+        },
+        service_response={
+            "Item": {
+                **encode_item(
+                    id="1",
+                    results_location="results/1.json",
+                    status="Success",
+                ),
+                "u": {
+                    "N": "1",
+                },
+            },
+        },
+    )
+    job_dynamodb_stub.add_response(
+        "get_item",
+        expected_params={
+            "ExpressionAttributeNames": STATUS_ATTRIBUTES,
+            "Key": {
+                "id": {
+                    "S": "2",
+                },
+            },
+            "ProjectionExpression": "#id, #s, #status, #u, #v",
+            "TableName": "jobs",
+        },
+        service_response=dict(),
+    )
+
+    yield job_dynamodb_stub
+
+
+def test_job_id_lookup(
+    context: LambdaContext,
+    job_dynamodb_stub: Stubber,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        s3,
+        "generate_presigned_url",
+        lambda operation, ExpiresIn, Params: "/".join([
+            "https://results.s3.amazonaws.com",
+            Params["Key"],
+        ]),
+    )
+
+    with job_dynamodb_stub:
+        response = handler({"id": "1"}, context)
+
+        with raises(LookupError, match="^Not Found: "):
+            handler({"id": "2", "view": "status"}, context)
+
+    assert response == {  # nosec
+        "resultsUrl": "https://results.s3.amazonaws.com/results/1.json",
+        "status": "Success",
+        "updatedAt": 1,
+    }
+
+
+def test_job_id_lookup_not_ready(
+    context: LambdaContext,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    dynamodb_stub = Stubber(dynamodb)
+
+    dynamodb_stub.add_response(
+        "get_item",
+        expected_params={
+            "Key": {
+                "id": {
+                    "S": "1",
+                },
+            },
+            "TableName": "jobs",
+        },
+        service_response={
+            "Item": encode_item(
+                id="1",
+                parameters={
+                    "seconds": 1,
+                },
+                status="Pending",
+            ),
+        },
+    )
+    monkeypatch.setattr("job_lookup.main.CACHE_ENABLED", True)
+
+    with dynamodb_stub, raises(RuntimeError, match="^Not Ready: ") as error:
+        handler({"id": "1"}, context)
+
+    assert loads(str(error.value)[11:])["status"] == "Pending"  # nosec
+
+
+def test_job_id_lookup_wait(
+    context: LambdaContext,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    dynamodb_stub = Stubber(dynamodb)
+    delays = list()
+
+    for status in ["Pending", "Pending", "Success"]:
+        dynamodb_stub.add_response(
+            "get_item",
+            expected_params={
+                "ExpressionAttributeNames": STATUS_ATTRIBUTES,
+                "Key": {
+                    "id": {
+                        "S": "1",
+                    },
+                },
+                "ProjectionExpression": "#id, #s, #status, #u, #v",
+                "TableName": "jobs",
+            },
+            service_response={
+                "Item": {
+                    **encode_item(
+                        id="1",
+                        status=status,
+                    ),
+                    "u": {
+                        "N": "1",
+                    },
+                },
+            },
+        )
+    monkeypatch.setattr("job_lookup.main.sleep", delays.append)
+
+    with dynamodb_stub:
+        response = handler(
+            {
+                "id": "1",
+                "view": "status",
+                "wait": "60",
+            },
+            context,
+        )
+
+        with raises(ValueError, match="^Bad Request: "):
+            handler({"id": "1", "wait": "-1"}, context)
+
+        dynamodb_stub.assert_no_pending_responses()
+
+    assert delays == [0.25, 0.5]  # nosec
+    assert response == {  # nosec
+        "status": "Success",
+        "updatedAt": 1,
+    }
+
+
+def test_job_lookup(
+    context: LambdaContext,
+    dynamodb_stub: Stubber,
+) -> None:
+    with dynamodb_stub:
+        response = handler({"ids": "1, 2,3,1,"}, context)
+
+    assert response == {  # nosec
+        "jobs": [
+            {
+                "id": "1",
+                "status": "Success",
+            },
+            {
+                "id": "2",
+                "status": "Failure",
+            },
+            {
+                "id": "3",
+                "status": None,
+            },
+        ],
+    }
+
+
+def test_job_lookup_non_job_items(context: LambdaContext) -> None:
+    dynamodb_stub = Stubber(dynamodb)
+    item = {
+        "d": {
+            "S": "digest",
+        },
+        "id": {
+            "S": "idempotency#key",
+        },
+        "ids": {
+            "L": [
+                {
+                    "S": "1",
+                },
+            ],
+        },
+    }
+
+    dynamodb_stub.add_response(
+        "get_item",
+        expected_params={
+            "Key": {
+                "id": {
+                    "S": "idempotency#key",
+                },
+            },
+            "TableName": "jobs",
+        },
+        service_response={
+            "Item": item,
+        },
+    )
+    dynamodb_stub.add_response(
+        "batch_get_item",
+        expected_params={
+            "RequestItems": request_items(["idempotency#key"]),
+        },
+        service_response={
+            "Responses": {
+                "jobs": [
+                    {
+                        "id": item["id"],
+                    },
+                ],
+            },
+        },
+    )
+
+    with dynamodb_stub:
+        with raises(LookupError, match="^Not Found: "):
+            handler({"id": "idempotency#key"}, context)
+
+        response = handler({"ids": "idempotency#key"}, context)
+
+    assert response == {  # nosec
+        "jobs": [
+            {
+                "id": "idempotency#key",
+                "status": None,
+            },
+        ],
+    }
+
+
+def test_job_lookup_too_many_ids(context: LambdaContext) -> None:
+    ids = ",".join(str(id) for id in range(101))
+
+    with raises(ValueError, match="^Bad Request: "):
+        handler({"ids": ids}, context)
+
+
+class StatusIndex:
+    def __init__(self, items: list) -> None:
+        self.items = sorted(items, key=lambda item: (
+            int(item["t"]["N"]),
+            item["id"]["S"],
+        ))
+
+    def query(self, **kwargs) -> dict:
+        values = kwargs["ExpressionAttributeValues"]
+        start_key = kwargs.get("ExclusiveStartKey")
+        items = [
+            item
+            for item in self.items
+            if item["g"] == values[":g"] and
+            int(item["t"]["N"]) >= int(values[":since"]["N"]) and
+            (start_key is None or (
+                int(item["t"]["N"]),
+                item["id"]["S"],
+            ) > (
+                int(start_key["t"]["N"]),
+                start_key["id"]["S"],
+            ))
+        ]
+        response = {
+            "Items": items[:kwargs["Limit"]],
+        }
+
+        if len(items) > kwargs["Limit"]:
+            response["LastEvaluatedKey"] = {
+                name: items[kwargs["Limit"] - 1][name]
+                for name in ["g", "id", "t"]
+            }
+
+        return response
+
+
+def test_job_status_lookup(
+    context: LambdaContext,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    monkeypatch.setattr("job_lookup.main.STATUS_SHARDS", 2)
+    monkeypatch.setattr("job_lookup.main.dynamodb", StatusIndex([
+        {
+            "g": {
+                "S": f"Failure#{shard}",
+            },
+            "id": {
+                "S": id,
+            },
+            "s": {
+                "S": "Failure",
+            },
+            "t": {
+                "N": str(created_at),
+            },
+            "v": {
+                "N": "2",
+            },
+        }
+        for id, shard, created_at in [
+            ("a", 0, 1),
+            ("b", 1, 2),
+            ("c", 1, 3),
+            ("d", 0, 4),
+            ("e", 0, 0),
+        ]
+    ]))
+
+    response = handler(
+        {
+            "ids": "",
+            "limit": "2",
+            "since": "1",
+            "status": "Failure",
+        },
+        context,
+    )
+    next_response = handler(
+        {
+            "cursor": response["cursor"],
+            "limit": "2",
+        },
+        context,
+    )
+
+    assert [job["id"] for job in response["jobs"]] == ["a", "b"]  # nosec
+    assert response["jobs"][0] == {  # nosec
+        "createdAt": 1,
+        "id": "a",
+        "status": "Failure",
+    }
+    assert [job["id"] for job in next_response["jobs"]] == [  # nosec
+        "c",
+        "d",
+    ]
+    assert "cursor" not in next_response  # nosec
+
+    for event in [
+        {
+            "status": "Unknown",
+        },
+        {
+            "cursor": "unknown",
+        },
+        {
+            "limit": "0",
+            "status": "Failure",
+        },
+    ]:
+        with raises(ValueError, match="^Bad Request: "):
+            handler(event, context)
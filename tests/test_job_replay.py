@@ -0,0 +1,348 @@
+from aws_lambda_powertools.utilities.typing import (
+    LambdaContext,
+)
+from botocore.stub import (
+    ANY,
+    Stubber,
+)
+from job_items.main import (
+    encode_item,
+)
+from job_replay.main import (
+    dynamodb,
+    handler,
+    lambda_,
+)
+from json import (
+    dumps,
+    loads,
+)
+from pytest import (
+    MonkeyPatch,
+    fixture,
+)
+from tests.fixtures import (
+    context,
+)
+from time import (
+    monotonic,
+)
+
+
+@fixture
+def event() -> dict:
+    event = {
+        "Records": [
+            {
+                "body": dumps({
+                    "detail": {
+                        "requestPayload": {
+                            "requestContext": {
+                                "functionArn": ("arn:aws:lambda:us-east-1:"
+                                                "123456789012:function:"
+                                                "event_processing:$LATEST"),
+                            },
+                            "requestPayload": {
+                                "id": str(index),
+                                "parameters": {
+                                    "seconds": 1,
+                                },
+                            },
+                            "responsePayload": {
+                                "errorType": error_type,
+                            },
+                        },
+                        "responsePayload": {
+                            "id": str(index),
+                            "parameters": {
+                                "seconds": 1,
+                            },
+                            "status": "Failure",
+                        },
+                    },
+                    "detail-type": ("Lambda Function Invocation Result - "
+                                    "Success"),
+                    "replay-name": "outage",
+                }),
+                "eventSource": "aws:sqs",
+                "messageId": str(index),
+            }
+            for index, error_type in enumerate([
+                "ValueError",
+                "Sandbox.Timedout",
+            ])
+        ],
+    }
+
+    yield event
+
+
+def test_job_replay(
+    context: LambdaContext,
+    event: dict,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    dynamodb_stub = Stubber(dynamodb)
+    lambda_stub = Stubber(lambda_)
+    sleeps = list()
+
+    monkeypatch.setattr("job_replay.main.pacing", {
+        "last": monotonic(),
+    })
+    monkeypatch.setattr("job_replay.main.replays", dict())
+    monkeypatch.setattr("job_replay.main.sleep", sleeps.append)
+    dynamodb_stub.add_response(
+        "get_item",
+        expected_params={
+            "ConsistentRead": True,
+            "ExpressionAttributeNames": ANY,
+            "Key": {
+                "id": {
+                    "S": "replay#outage",
+                },
+            },
+            "ProjectionExpression": ANY,
+            "TableName": "jobs",
+        },
+        service_response={
+            "Item": {
+                "error_types": {
+                    "L": [
+                        {
+                            "S": "ValueError",
+                        },
+                    ],
+                },
+                "rate": {
+                    "N": "4",
+                },
+            },
+        },
+    )
+    dynamodb_stub.add_response(
+        "put_item",
+        expected_params={
+            "Item": {
+                **encode_item(
+                    id="0",
+                    parameters={
+                        "seconds": 1,
+                    },
+                    status="Pending",
+                ),
+                "u": ANY,
+            },
+            "TableName": "jobs",
+        },
+        service_response=dict(),
+    )
+
+    for counter in ["resubmitted", "skipped"]:
+        dynamodb_stub.add_response(
+            "update_item",
+            expected_params={
+                "ExpressionAttributeNames": {
+                    "#counter": counter,
+                },
+                "ExpressionAttributeValues": ANY,
+                "Key": {
+                    "id": {
+                        "S": "replay#outage",
+                    },
+                },
+                "TableName": "jobs",
+                "UpdateExpression": "ADD #counter :one",
+            },
+            service_response=dict(),
+        )
+
+    lambda_stub.add_response(
+        "invoke",
+        expected_params={
+            "FunctionName": ("arn:aws:lambda:us-east-1:123456789012:"
+                             "function:event_processing:$LATEST"),
+            "InvocationType": "Event",
+            "Payload": dumps({
+                "id": "0",
+                "parameters": {
+                    "seconds": 1,
+                },
+            }),
+        },
+        service_response={
+            "StatusCode": 202,
+        },
+    )
+
+    with dynamodb_stub, lambda_stub:
+        response = handler(event, context)
+
+    dynamodb_stub.assert_no_pending_responses()
+    lambda_stub.assert_no_pending_responses()
+
+    assert response == {  # nosec
+        "batchItemFailures": list(),
+    }
+    assert len(sleeps) == 1  # nosec
+    assert 0 < sleeps[0] <= 0.5  # nosec
+
+
+def test_job_replay_deadline(event: dict, monkeypatch: MonkeyPatch) -> None:
+    context = LambdaContext()
+    dynamodb_stub = Stubber(dynamodb)
+    lambda_stub = Stubber(lambda_)
+    remaining_times = iter([10000, 1000])
+    sleeps = list()
+
+    for record in event["Records"]:
+        body = loads(record["body"])
+        body.pop("replay-name")
+        record["body"] = dumps(body)
+
+    context.get_remaining_time_in_millis = lambda: next(remaining_times)
+    monkeypatch.setattr("job_replay.main.pacing", {
+        "last": 0.0,
+    })
+    monkeypatch.setattr("job_replay.main.sleep", sleeps.append)
+    dynamodb_stub.add_response(
+        "put_item",
+        expected_params={
+            "Item": ANY,
+            "TableName": "jobs",
+        },
+        service_response=dict(),
+    )
+    lambda_stub.add_response(
+        "invoke",
+        expected_params={
+            "FunctionName": ANY,
+            "InvocationType": "Event",
+            "Payload": ANY,
+        },
+        service_response={
+            "StatusCode": 202,
+        },
+    )
+
+    with dynamodb_stub, lambda_stub:
+        response = handler(event, context)
+
+    dynamodb_stub.assert_no_pending_responses()
+    lambda_stub.assert_no_pending_responses()
+
+    assert response == {  # nosec
+        "batchItemFailures": [
+            {
+                "itemIdentifier": "1",
+            },
+        ],
+    }
+    assert sleeps == [0]  # nosec
+
+
+def test_job_replay_pack(
+    context: LambdaContext,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    dynamodb_stub = Stubber(dynamodb)
+    lambda_stub = Stubber(lambda_)
+    jobs = [
+        {
+            "id": id,
+            "parameters": {
+                "seconds": 1,
+            },
+        }
+        for id in ["0", "1", "2"]
+    ]
+
+    monkeypatch.setattr("job_replay.main.pacing", {
+        "last": 0.0,
+    })
+    monkeypatch.setattr("job_replay.main.sleep", lambda _: None)
+
+    for id in ["0", "2"]:
+        dynamodb_stub.add_response(
+            "put_item",
+            expected_params={
+                "Item": {
+                    **encode_item(
+                        id=id,
+                        parameters={
+                            "seconds": 1,
+                        },
+                        status="Pending",
+                    ),
+                    "u": ANY,
+                },
+                "TableName": "jobs",
+            },
+            service_response=dict(),
+        )
+
+    lambda_stub.add_response(
+        "invoke",
+        expected_params={
+            "FunctionName": ("arn:aws:lambda:us-east-1:123456789012:"
+                             "function:event_processing:$LATEST"),
+            "InvocationType": "Event",
+            "Payload": dumps([
+                jobs[0],
+                jobs[2],
+            ]),
+        },
+        service_response={
+            "StatusCode": 202,
+        },
+    )
+
+    with dynamodb_stub, lambda_stub:
+        response = handler(
+            {
+                "Records": [
+                    {
+                        "body": dumps({
+                            "detail": {
+                                "requestContext": {
+                                    "functionArn": (
+                                        "arn:aws:lambda:us-east-1:"
+                                        "123456789012:function:"
+                                        "event_processing:$LATEST"),
+                                },
+                                "requestPayload": jobs,
+                                "responsePayload": [
+                                    {
+                                        "error": "failed",
+                                        "errorType": "ValueError",
+                                        "id": "0",
+                                        "status": "Failure",
+                                    },
+                                    {
+                                        "id": "1",
+                                        "status": "Success",
+                                    },
+                                    {
+                                        "error": "failed",
+                                        "errorType": "KeyError",
+                                        "id": "2",
+                                        "status": "Failure",
+                                    },
+                                ],
+                            },
+                            "detail-type": ("Lambda Function Invocation "
+                                            "Result - Success"),
+                        }),
+                        "eventSource": "aws:sqs",
+                        "messageId": "0",
+                    },
+                ],
+            },
+            context,
+        )
+
+    dynamodb_stub.assert_no_pending_responses()
+    lambda_stub.assert_no_pending_responses()
+
+    assert response == {  # nosec
+        "batchItemFailures": list(),
+    }
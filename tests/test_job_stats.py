@@ -0,0 +1,319 @@
+from aws_lambda_powertools.utilities.typing import (
+    LambdaContext,
+)
+from botocore.stub import (
+    ANY,
+    Stubber,
+)
+from job_stats.main import (
+    dynamodb,
+    handler,
+)
+from pytest import (
+    fixture,
+    raises,
+)
+from tests.fixtures import (
+    context,
+)
+
+
+@fixture
+def event() -> dict:
+    event = {
+        "Records": [
+            {
+                "dynamodb": {
+                    "ApproximateCreationDateTime": 1672531200,
+                    "NewImage": {
+                        "id": {
+                            "S": id,
+                        },
+                        "s": {
+                            "S": new_status,
+                        },
+                        "t": {
+                            "N": "1672531200000",
+                        },
+                        "u": {
+                            "N": updated_at,
+                        },
+                        "v": {
+                            "N": "2",
+                        },
+                    },
+                    **({
+                        "OldImage": {
+                            "s": {
+                                "S": old_status,
+                            },
+                        },
+                    } if old_status else dict()),
+                },
+                "eventID": str(index),
+                "eventName": "MODIFY" if old_status else "INSERT",
+            }
+            for index, (id, old_status, new_status, updated_at) in enumerate([
+                ("0", None, "Pending", "1672531200000"),
+                ("0", "Pending", "Success", "1672531203000"),
+                ("1", "Pending", "Failure", "1672531265000"),
+                ("1", "Failure", "Failure", "1672531266000"),
+            ])
+        ],
+    }
+
+    yield event
+
+
+def test_job_stats_update(context: LambdaContext, event: dict) -> None:
+    dynamodb_stub = Stubber(dynamodb)
+
+    dynamodb_stub.add_response(
+        "transact_write_items",
+        expected_params={
+            "ClientRequestToken": ANY,
+            "TransactItems": [
+                {
+                    "Put": {
+                        "ConditionExpression": "attribute_not_exists(#d)",
+                        "ExpressionAttributeNames": {
+                            "#d": "d",
+                        },
+                        "Item": {
+                            "d": {
+                                "S": ANY,
+                            },
+                            "m": {
+                                "N": "0",
+                            },
+                            "ttl": ANY,
+                        },
+                        "TableName": "stats",
+                    },
+                },
+                *[
+                    {
+                        "Update": {
+                            "ExpressionAttributeNames": {
+                                "#ttl": "ttl",
+                                **{
+                                    f"#{name}": name
+                                    for name in names
+                                },
+                            },
+                            "ExpressionAttributeValues": {
+                                ":ttl": {
+                                    "N": str(int(minute) // 1000 + 7776000),
+                                },
+                                **{
+                                    f":{name}": {
+                                        "N": value,
+                                    }
+                                    for name, value in names.items()
+                                },
+                            },
+                            "Key": {
+                                "d": {
+                                    "S": "2023-01-01",
+                                },
+                                "m": {
+                                    "N": minute,
+                                },
+                            },
+                            "TableName": "stats",
+                            "UpdateExpression": ("SET #ttl = :ttl ADD " +
+                                                 ", ".join(
+                                                     f"#{name} :{name}"
+                                                     for name in sorted(names)
+                                                 )),
+                        },
+                    }
+                    for minute, names in [
+                        ("1672531200000", {
+                            "c_Pending": "1",
+                            "c_Success": "1",
+                            "h_12": "1",
+                            "n": "1",
+                            "sum": "3000",
+                        }),
+                        ("1672531260000", {
+                            "c_Failure": "1",
+                            "h_16": "1",
+                            "n": "1",
+                            "sum": "65000",
+                        }),
+                    ]
+                ],
+            ],
+        },
+        service_response=dict(),
+    )
+
+    with dynamodb_stub:
+        response = handler(event, context)
+
+    dynamodb_stub.assert_no_pending_responses()
+
+    assert response is None  # nosec
+
+
+def test_job_stats_update_counted(
+    context: LambdaContext,
+    event: dict,
+) -> None:
+    dynamodb_stub = Stubber(dynamodb)
+
+    dynamodb_stub.add_client_error(
+        "transact_write_items",
+        expected_params={
+            "ClientRequestToken": ANY,
+            "TransactItems": ANY,
+        },
+        modeled_fields={
+            "CancellationReasons": [
+                {
+                    "Code": "ConditionalCheckFailed",
+                },
+                {
+                    "Code": "None",
+                },
+                {
+                    "Code": "None",
+                },
+            ],
+        },
+        service_error_code="TransactionCanceledException",
+    )
+    dynamodb_stub.add_client_error(
+        "transact_write_items",
+        expected_params={
+            "ClientRequestToken": ANY,
+            "TransactItems": ANY,
+        },
+        modeled_fields={
+            "CancellationReasons": [
+                {
+                    "Code": "None",
+                },
+                {
+                    "Code": "TransactionConflict",
+                },
+                {
+                    "Code": "None",
+                },
+            ],
+        },
+        service_error_code="TransactionCanceledException",
+    )
+
+    with dynamodb_stub:
+        assert handler(event, context) is None  # nosec
+
+        with raises(dynamodb.exceptions.TransactionCanceledException):
+            handler(event, context)
+
+    dynamodb_stub.assert_no_pending_responses()
+
+
+def test_job_stats_lookup(context: LambdaContext) -> None:
+    dynamodb_stub = Stubber(dynamodb)
+
+    dynamodb_stub.add_response(
+        "query",
+        expected_params={
+            "ExpressionAttributeNames": {
+                "#d": "d",
+                "#m": "m",
+            },
+            "ExpressionAttributeValues": {
+                ":d": {
+                    "S": "2023-01-01",
+                },
+                ":since": {
+                    "N": "1672531200000",
+                },
+                ":until": {
+                    "N": "1672534800000",
+                },
+            },
+            "KeyConditionExpression": ("#d = :d AND "
+                                       "#m BETWEEN :since AND :until"),
+            "TableName": "stats",
+        },
+        service_response={
+            "Items": [
+                {
+                    "c_Failure": {
+                        "N": str(failures),
+                    },
+                    "c_Success": {
+                        "N": "2",
+                    },
+                    "d": {
+                        "S": "2023-01-01",
+                    },
+                    "h_12": {
+                        "N": "2",
+                    },
+                    "h_16": {
+                        "N": str(failures),
+                    },
+                    "m": {
+                        "N": minute,
+                    },
+                    "n": {
+                        "N": str(2 + failures),
+                    },
+                    "sum": {
+                        "N": str(6000 + 65000 * failures),
+                    },
+                }
+                for minute, failures in [
+                    ("1672531200000", 0),
+                    ("1672531260000", 1),
+                ]
+            ],
+        },
+    )
+
+    with dynamodb_stub:
+        response = handler({
+            "since": "1672531200000",
+            "until": "1672534800000",
+        }, context)
+
+    dynamodb_stub.assert_no_pending_responses()
+
+    assert response["counts"] == {  # nosec
+        "Failure": 1,
+        "Success": 4,
+    }
+    assert response["durations"] == {  # nosec
+        "count": 5,
+        "histogram": {
+            "4096": 4,
+            "65536": 1,
+        },
+        "p50": 4096,
+        "p95": 65536,
+        "p99": 65536,
+        "sum": 77000,
+    }
+    assert [  # nosec
+        minute["minute"]
+        for minute in response["minutes"]
+    ] == [1672531200000, 1672531260000]
+
+
+def test_job_stats_invalid_range(context: LambdaContext) -> None:
+    with raises(ValueError, match="Bad Request"):
+        handler({
+            "since": "1672534800000",
+            "until": "1672531200000",
+        }, context)
+
+    with raises(ValueError, match="Bad Request"):
+        handler({
+            "since": "yesterday",
+            "until": "",
+        }, context)
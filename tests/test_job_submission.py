@@ -0,0 +1,781 @@
+from aws_lambda_powertools.utilities.typing import (
+    LambdaContext,
+)
+from botocore.stub import (
+    ANY,
+    Stubber,
+)
+from job_submission.main import (
+    Parameters,
+    dynamodb,
+    handler,
+    lambda_,
+    pack,
+    sqs,
+)
+from job_items.main import (
+    encode_item,
+)
+from json import (
+    dumps,
+)
+from pytest import (
+    MonkeyPatch,
+    fixture,
+    raises,
+)
+from tests.fixtures import (
+    context,
+)
+
+
+@fixture
+def dynamodb_stub(event: dict) -> Stubber:
+    dynamodb_stub = Stubber(dynamodb)
+    unprocessed_put_requests = [
+        {
+            "PutRequest": {
+                "Item": encode_item(
+                    id="1",
+                    parameters=event["jobs"][0],
+                    status="Pending",
+                ),
+            },
+        },
+    ]
+    put_requests = [
+        {
+            "PutRequest": {
+                "Item": {
+                    **encode_item(
+                        id="",
+                        parameters=parameters,
+                        status="Pending",
+                    ),
+                    "g": ANY,
+                    "id": ANY,
+                    "t": ANY,
+                    "u": ANY,
+                },
+            },
+        }
+        for parameters in event["jobs"]
+    ]
+
+    dynamodb_stub.add_response(
+        "batch_write_item",
+        expected_params={
+            "RequestItems": {
+                "jobs": put_requests[:25],
+            },
+        },
+        service_response={
+            "UnprocessedItems": {
+                "jobs": unprocessed_put_requests,
+            },
+        },
+    )
+    dynamodb_stub.add_response(
+        "batch_write_item",
+        expected_params={
+            "RequestItems": {
+                "jobs": unprocessed_put_requests,
+            },
+        },
+        service_response=dict(),
+    )
+    dynamodb_stub.add_response(
+        "batch_write_item",
+        expected_params={
+            "RequestItems": {
+                "jobs": put_requests[25:],
+            },
+        },
+        service_response=dict(),
+    )
+
+    yield dynamodb_stub
+
+
+@fixture
+def event() -> dict:
+    event = {
+        "jobs": [
+            {
+                "seconds": seconds,
+            }
+            for seconds in range(1, 31)
+        ],
+    }
+
+    yield event
+
+
+@fixture
+def idempotent_event() -> dict:
+    idempotent_event = {
+        "caller": "AROAEXAMPLE:caller",
+        "idempotency_key": "key",
+        "jobs": [
+            {
+                "seconds": 1,
+            },
+        ],
+    }
+
+    yield idempotent_event
+
+
+@fixture
+def idempotent_item() -> dict:
+    idempotent_item = {
+        "digest": {
+            "S": ("1deffa3a31ba02cf55c247814566abb3"
+                  "92dd3c32ddd691ae9a4c4418a9e71923"),
+        },
+        "id": {
+            "S": "idempotency#1",
+        },
+        "ids": {
+            "L": [
+                {
+                    "S": "1",
+                },
+            ],
+        },
+        "state": {
+            "S": "completed",
+        },
+        "ttl": {
+            "N": "0",
+        },
+    }
+
+    yield idempotent_item
+
+
+@fixture
+def idempotent_dynamodb_stub(idempotent_item: dict) -> Stubber:
+    idempotent_dynamodb_stub = Stubber(dynamodb)
+
+    idempotent_dynamodb_stub.add_client_error(
+        "put_item",
+        expected_params={
+            "ConditionExpression": ("attribute_not_exists(#id) "
+                                    "OR #ttl < :now"),
+            "ExpressionAttributeNames": {
+                "#id": "id",
+                "#ttl": "ttl",
+            },
+            "ExpressionAttributeValues": ANY,
+            "Item": ANY,
+            "TableName": "jobs",
+        },
+        service_error_code="ConditionalCheckFailedException",
+    )
+    idempotent_dynamodb_stub.add_response(
+        "get_item",
+        expected_params={
+            "ConsistentRead": True,
+            "Key": ANY,
+            "TableName": "jobs",
+        },
+        service_response={
+            "Item": idempotent_item,
+        },
+    )
+
+    yield idempotent_dynamodb_stub
+
+
+@fixture
+def lambda_stub(event: dict) -> Stubber:
+    lambda_stub = Stubber(lambda_)
+
+    for _ in event["jobs"]:
+        lambda_stub.add_response(
+            "invoke",
+            expected_params={
+                "FunctionName": "event_processing",
+                "InvocationType": "Event",
+                "Payload": ANY,
+            },
+            service_response={
+                "StatusCode": 202,
+            },
+        )
+
+    yield lambda_stub
+
+
+@fixture
+def sqs_stub(event: dict) -> Stubber:
+    sqs_stub = Stubber(sqs)
+    entries = [
+        {
+            "Id": str(index),
+            "MessageAttributes": {
+                "id": {
+                    "DataType": "String",
+                    "StringValue": ANY,
+                },
+                "submitted_at": {
+                    "DataType": "Number",
+                    "StringValue": ANY,
+                },
+            },
+            "MessageBody": dumps(parameters),
+        }
+        for index, parameters in enumerate(event["jobs"])
+    ]
+
+    for start in range(0, len(entries), 10):
+        sqs_stub.add_response(
+            "send_message_batch",
+            expected_params={
+                "Entries": entries[start:start + 10],
+                "QueueUrl": "jobs",
+            },
+            service_response={
+                "Failed": [
+                    {
+                        "Code": "ServiceUnavailable",
+                        "Id": "0",
+                        "SenderFault": False,
+                    },
+                ] if start == 0 else [],
+                "Successful": [],
+            },
+        )
+
+    sqs_stub.add_response(
+        "send_message_batch",
+        expected_params={
+            "Entries": entries[:1],
+            "QueueUrl": "jobs",
+        },
+        service_response={
+            "Failed": [],
+            "Successful": [],
+        },
+    )
+
+    yield sqs_stub
+
+
+def test_job_submission(
+    context: LambdaContext,
+    dynamodb_stub: Stubber,
+    event: dict,
+    lambda_stub: Stubber,
+) -> None:
+    with dynamodb_stub, lambda_stub:
+        response = handler(event, context)
+
+    ids = response["ids"]
+
+    assert len(ids) == len(event["jobs"])  # nosec
+    assert len(set(ids)) == len(ids)  # nosec
+
+
+def test_job_submission_queue(
+    context: LambdaContext,
+    dynamodb_stub: Stubber,
+    event: dict,
+    monkeypatch: MonkeyPatch,
+    sqs_stub: Stubber,
+) -> None:
+    monkeypatch.setattr("job_submission.main.QUEUE_URL", "jobs")
+
+    with dynamodb_stub, sqs_stub:
+        response = handler(event, context)
+
+    assert len(response["ids"]) == len(event["jobs"])  # nosec
+
+
+def test_job_submission_idempotency_key_claimed(
+    context: LambdaContext,
+    idempotent_dynamodb_stub: Stubber,
+    idempotent_event: dict,
+) -> None:
+    with idempotent_dynamodb_stub:
+        response = handler(idempotent_event, context)
+
+    assert response == {  # nosec
+        "ids": [
+            "1",
+        ],
+    }
+
+
+def test_job_submission_idempotency_key_reused(
+    context: LambdaContext,
+    idempotent_dynamodb_stub: Stubber,
+    idempotent_event: dict,
+) -> None:
+    idempotent_event["jobs"][0]["seconds"] = 2
+
+    with idempotent_dynamodb_stub, raises(ValueError, match="^Bad Request: "):
+        handler(idempotent_event, context)
+
+
+def test_job_submission_idempotency_key_in_progress(
+    context: LambdaContext,
+    idempotent_dynamodb_stub: Stubber,
+    idempotent_event: dict,
+    idempotent_item: dict,
+) -> None:
+    idempotent_item["state"]["S"] = "in_progress"
+
+    with idempotent_dynamodb_stub, raises(RuntimeError, match="^Conflict: "):
+        handler(idempotent_event, context)
+
+
+def test_job_submission_job_type(
+    context: LambdaContext,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    dynamodb_stub = Stubber(dynamodb)
+    lambda_stub = Stubber(lambda_)
+    parameters = {
+        "seconds": 1,
+        "type": "heavy",
+    }
+
+    monkeypatch.setattr(
+        "job_submission.main.TARGETS",
+        {
+            "heavy": "heavy_event_processing",
+        },
+    )
+    dynamodb_stub.add_response(
+        "batch_write_item",
+        expected_params={
+            "RequestItems": {
+                "jobs": [
+                    {
+                        "PutRequest": {
+                            "Item": {
+                                **encode_item(
+                                    id="",
+                                    parameters=parameters,
+                                    status="Pending",
+                                ),
+                                "g": ANY,
+                                "id": ANY,
+                                "t": ANY,
+                                "u": ANY,
+                            },
+                        },
+                    },
+                ],
+            },
+        },
+        service_response=dict(),
+    )
+    lambda_stub.add_response(
+        "invoke",
+        expected_params={
+            "FunctionName": "heavy_event_processing",
+            "InvocationType": "Event",
+            "Payload": ANY,
+        },
+        service_response={
+            "StatusCode": 202,
+        },
+    )
+
+    with dynamodb_stub, lambda_stub:
+        handler(
+            {
+                "jobs": [
+                    parameters,
+                ],
+            },
+            context,
+        )
+
+    with raises(ValueError, match="^Bad Request: light "):
+        handler(
+            {
+                "jobs": [
+                    {
+                        "seconds": 1,
+                        "type": "light",
+                    },
+                ],
+            },
+            context,
+        )
+
+
+def test_job_submission_priority(
+    context: LambdaContext,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    dynamodb_stub = Stubber(dynamodb)
+    lambda_stub = Stubber(lambda_)
+    jobs = [
+        {
+            "priority": "high",
+            "seconds": 1,
+        },
+        {
+            "priority": "high",
+            "seconds": 1,
+            "type": "heavy",
+        },
+    ]
+
+    monkeypatch.setattr(
+        "job_submission.main.LANES",
+        {
+            "high": {
+                "": "high_event_processing",
+                "heavy": "heavy_high_event_processing",
+            },
+        },
+    )
+    monkeypatch.setattr(
+        "job_submission.main.MAX_WORKERS",
+        1,
+    )
+    monkeypatch.setattr(
+        "job_submission.main.TARGETS",
+        {
+            "heavy": "heavy_event_processing",
+        },
+    )
+    dynamodb_stub.add_response(
+        "batch_write_item",
+        expected_params={
+            "RequestItems": {
+                "jobs": [
+                    {
+                        "PutRequest": {
+                            "Item": {
+                                **encode_item(
+                                    id="",
+                                    parameters=parameters,
+                                    status="Pending",
+                                ),
+                                "g": ANY,
+                                "id": ANY,
+                                "t": ANY,
+                                "u": ANY,
+                            },
+                        },
+                    }
+                    for parameters in jobs
+                ],
+            },
+        },
+        service_response=dict(),
+    )
+
+    for function_name in [
+        "high_event_processing",
+        "heavy_high_event_processing",
+    ]:
+        lambda_stub.add_response(
+            "invoke",
+            expected_params={
+                "FunctionName": function_name,
+                "InvocationType": "Event",
+                "Payload": ANY,
+            },
+            service_response={
+                "StatusCode": 202,
+            },
+        )
+
+    with dynamodb_stub, lambda_stub:
+        handler(
+            {
+                "jobs": jobs,
+            },
+            context,
+        )
+
+    with raises(ValueError, match="^Bad Request: low "):
+        handler(
+            {
+                "jobs": [
+                    {
+                        "priority": "low",
+                        "seconds": 1,
+                    },
+                ],
+            },
+            context,
+        )
+
+
+def test_job_submission_pack(
+    context: LambdaContext,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    dynamodb_stub = Stubber(dynamodb)
+    lambda_stub = Stubber(lambda_)
+    jobs = [
+        {
+            "seconds": 1,
+        },
+        {
+            "seconds": 2,
+        },
+    ]
+
+    monkeypatch.setattr(
+        "job_submission.main.PACK_SIZE",
+        2,
+    )
+    monkeypatch.setattr(
+        "job_submission.main.TARGETS",
+        {
+            "heavy": "heavy_event_processing",
+        },
+    )
+    dynamodb_stub.add_response(
+        "batch_write_item",
+        expected_params={
+            "RequestItems": {
+                "jobs": [
+                    {
+                        "PutRequest": {
+                            "Item": {
+                                **encode_item(
+                                    id="",
+                                    parameters=parameters,
+                                    status="Pending",
+                                ),
+                                "g": ANY,
+                                "id": ANY,
+                                "t": ANY,
+                                "u": ANY,
+                            },
+                        },
+                    }
+                    for parameters in jobs
+                ],
+            },
+        },
+        service_response=dict(),
+    )
+    lambda_stub.add_response(
+        "invoke",
+        expected_params={
+            "FunctionName": "event_processing",
+            "InvocationType": "Event",
+            "Payload": ANY,
+        },
+        service_response={
+            "StatusCode": 202,
+        },
+    )
+
+    with dynamodb_stub, lambda_stub:
+        handler(
+            {
+                "jobs": jobs,
+            },
+            context,
+        )
+
+    lambda_stub.assert_no_pending_responses()
+
+    assert [  # nosec
+        [id for id, _ in jobs]
+        for jobs in pack(
+            ["1", "2", "3", "4"],
+            [
+                Parameters(seconds=1),
+                Parameters(seconds=1, type="heavy"),
+                Parameters(seconds=1),
+                Parameters(seconds=1),
+            ],
+        )
+    ] == [
+        ["1", "3"],
+        ["4"],
+        ["2"],
+    ]
+
+
+def test_job_submission_partial_failure(
+    context: LambdaContext,
+    idempotent_event: dict,
+    monkeypatch: MonkeyPatch,
+) -> None:
+    dynamodb_stub = Stubber(dynamodb)
+    lambda_stub = Stubber(lambda_)
+
+    idempotent_event["jobs"].append({
+        "seconds": 2,
+    })
+    monkeypatch.setattr(
+        "job_submission.main.MAX_WORKERS",
+        1,
+    )
+    dynamodb_stub.add_response(
+        "put_item",
+        expected_params={
+            "ConditionExpression": ANY,
+            "ExpressionAttributeNames": ANY,
+            "ExpressionAttributeValues": ANY,
+            "Item": ANY,
+            "TableName": "jobs",
+        },
+        service_response=dict(),
+    )
+    dynamodb_stub.add_response(
+        "batch_write_item",
+        expected_params={
+            "RequestItems": ANY,
+        },
+        service_response=dict(),
+    )
+    lambda_stub.add_response(
+        "invoke",
+        expected_params={
+            "FunctionName": "event_processing",
+            "InvocationType": "Event",
+            "Payload": ANY,
+        },
+        service_response={
+            "StatusCode": 202,
+        },
+    )
+    lambda_stub.add_client_error(
+        "invoke",
+        expected_params={
+            "FunctionName": "event_processing",
+            "InvocationType": "Event",
+            "Payload": ANY,
+        },
+        service_error_code="TooManyRequestsException",
+    )
+    dynamodb_stub.add_response(
+        "batch_write_item",
+        expected_params={
+            "RequestItems": {
+                "jobs": [
+                    {
+                        "DeleteRequest": {
+                            "Key": {
+                                "id": ANY,
+                            },
+                        },
+                    },
+                ],
+            },
+        },
+        service_response=dict(),
+    )
+    dynamodb_stub.add_response(
+        "update_item",
+        expected_params={
+            "ExpressionAttributeNames": {
+                "#errors": "errors",
+                "#ids": "ids",
+                "#state": "state",
+            },
+            "ExpressionAttributeValues": {
+                ":errors": {
+                    "L": [
+                        {
+                            "M": {
+                                "index": {
+                                    "N": "1",
+                                },
+                                "message": {
+                                    "S": "Job not dispatched",
+                                },
+                            },
+                        },
+                    ],
+                },
+                ":ids": ANY,
+                ":state": {
+                    "S": "completed",
+                },
+            },
+            "Key": ANY,
+            "TableName": "jobs",
+            "UpdateExpression": ("SET #errors = :errors, #ids = :ids, "
+                                 "#state = :state"),
+        },
+        service_response=dict(),
+    )
+
+    with dynamodb_stub, lambda_stub:
+        response = handler(idempotent_event, context)
+
+    dynamodb_stub.assert_no_pending_responses()
+
+    assert len(response["ids"]) == 1  # nosec
+    assert response["errors"] == [  # nosec
+        {
+            "index": 1,
+            "message": "Job not dispatched",
+        },
+    ]
+
+
+def test_job_submission_failure(
+    context: LambdaContext,
+    idempotent_event: dict,
+) -> None:
+    dynamodb_stub = Stubber(dynamodb)
+    lambda_stub = Stubber(lambda_)
+
+    dynamodb_stub.add_response(
+        "put_item",
+        expected_params={
+            "ConditionExpression": ANY,
+            "ExpressionAttributeNames": ANY,
+            "ExpressionAttributeValues": ANY,
+            "Item": ANY,
+            "TableName": "jobs",
+        },
+        service_response=dict(),
+    )
+    dynamodb_stub.add_response(
+        "batch_write_item",
+        expected_params={
+            "RequestItems": ANY,
+        },
+        service_response=dict(),
+    )
+    lambda_stub.add_client_error(
+        "invoke",
+        expected_params={
+            "FunctionName": "event_processing",
+            "InvocationType": "Event",
+            "Payload": ANY,
+        },
+        service_error_code="TooManyRequestsException",
+    )
+    dynamodb_stub.add_response(
+        "batch_write_item",
+        expected_params={
+            "RequestItems": ANY,
+        },
+        service_response=dict(),
+    )
+    dynamodb_stub.add_response(
+        "delete_item",
+        expected_params={
+            "Key": ANY,
+            "TableName": "jobs",
+        },
+        service_response=dict(),
+    )
+
+    with dynamodb_stub, lambda_stub, raises(
+        RuntimeError,
+        match="^1 jobs not submitted$",
+    ):
+        handler(idempotent_event, context)
+
+    dynamodb_stub.assert_no_pending_responses()
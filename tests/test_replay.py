@@ -0,0 +1,162 @@
+from botocore.stub import (
+    ANY,
+    Stubber,
+)
+from datetime import (
+    datetime,
+    timezone,
+)
+from pytest import (
+    CaptureFixture,
+    MonkeyPatch,
+)
+from replay.main import (
+    cloudformation,
+    dynamodb,
+    events,
+    main,
+)
+
+
+def test_replay(capsys: CaptureFixture, monkeypatch: MonkeyPatch) -> None:
+    cloudformation_stub = Stubber(cloudformation)
+    dynamodb_stub = Stubber(dynamodb)
+    events_stub = Stubber(events)
+    start = datetime(2023, 1, 1, tzinfo=timezone.utc)
+    end = datetime(2023, 1, 1, 1, tzinfo=timezone.utc)
+    sleeps = list()
+
+    monkeypatch.setattr("replay.main.sleep", sleeps.append)
+    cloudformation_stub.add_response(
+        "describe_stacks",
+        expected_params={
+            "StackName": "AsynchronousEventProcessingAPIGatewayLambda",
+        },
+        service_response={
+            "Stacks": [
+                {
+                    "CreationTime": start,
+                    "Outputs": [
+                        {
+                            "OutputKey": key,
+                            "OutputValue": key.lower(),
+                        }
+                        for key in [
+                            "FailedJobsArchive",
+                            "JobReplayRule",
+                            "JobsEventBus",
+                            "JobsTable",
+                        ]
+                    ],
+                    "StackName": "AsynchronousEventProcessingAPIGatewayLambda",
+                    "StackStatus": "CREATE_COMPLETE",
+                },
+            ],
+        },
+    )
+    dynamodb_stub.add_response(
+        "put_item",
+        expected_params={
+            "Item": {
+                "error_types": {
+                    "L": [
+                        {
+                            "S": "ValueError",
+                        },
+                    ],
+                },
+                "id": {
+                    "S": "replay#outage",
+                },
+                "rate": {
+                    "N": "5.0",
+                },
+                "resubmitted": {
+                    "N": "0",
+                },
+                "skipped": {
+                    "N": "0",
+                },
+                "ttl": ANY,
+            },
+            "TableName": "jobstable",
+        },
+        service_response=dict(),
+    )
+    events_stub.add_response(
+        "start_replay",
+        expected_params={
+            "Description": ANY,
+            "Destination": {
+                "Arn": "jobseventbus",
+                "FilterArns": [
+                    "jobreplayrule",
+                ],
+            },
+            "EventEndTime": end,
+            "EventSourceArn": "failedjobsarchive",
+            "EventStartTime": start,
+            "ReplayName": "outage",
+        },
+        service_response=dict(),
+    )
+
+    for state, last_replayed, resubmitted in [
+        ("RUNNING", datetime(2023, 1, 1, 0, 30, tzinfo=timezone.utc), "3"),
+        ("COMPLETED", end, "7"),
+    ]:
+        events_stub.add_response(
+            "describe_replay",
+            expected_params={
+                "ReplayName": "outage",
+            },
+            service_response={
+                "EventEndTime": end,
+                "EventLastReplayedTime": last_replayed,
+                "EventStartTime": start,
+                "State": state,
+            },
+        )
+        dynamodb_stub.add_response(
+            "get_item",
+            expected_params={
+                "ConsistentRead": True,
+                "Key": {
+                    "id": {
+                        "S": "replay#outage",
+                    },
+                },
+                "TableName": "jobstable",
+            },
+            service_response={
+                "Item": {
+                    "resubmitted": {
+                        "N": resubmitted,
+                    },
+                    "skipped": {
+                        "N": "1",
+                    },
+                },
+            },
+        )
+
+    with cloudformation_stub, dynamodb_stub, events_stub:
+        code = main([
+            "--end",
+            end.isoformat(),
+            "--error-types",
+            "ValueError",
+            "--name",
+            "outage",
+            "--rate",
+            "5",
+            "--start",
+            start.isoformat(),
+        ])
+
+    lines = capsys.readouterr().out.splitlines()
+
+    assert code == 0  # nosec
+    assert sleeps == [10.0]  # nosec
+    assert lines[1].split() == ["RUNNING", "50.0%", "3", "1"]  # nosec
+    assert lines[2].split() == ["COMPLETED", "100.0%", "7", "1"]  # nosec